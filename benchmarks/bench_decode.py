@@ -0,0 +1,111 @@
+"""Measure Last.fm response decoding: full stdlib decode vs. decode-and-compact.
+
+Bodies come from the stand-in's realistic payloads. "full" is the previous
+path (``json.loads`` of the whole body, the whole dict serialised into the
+cache); "compact" is the current one (``lastfm_records.loads``, then
+``compact_payload`` before caching). Reports CPU per response, cached bytes
+per response and peak memory while holding every decoded response.
+
+Usage:
+    uv run python benchmarks/bench_decode.py --responses 20000
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from lastfm_standin import DEFAULT_SEARCH_LIMIT, album_details, search_results, track_details
+
+from lyriclabel.lastfm_records import (
+    JSON_BACKEND,
+    compact_payload,
+    loads,
+    parse_album_info,
+    parse_search,
+    parse_track_info,
+)
+from lyriclabel.meta_fetcher import SEARCH_RESULT_LIMIT
+
+
+def _cache_dump(payload: dict[str, Any]) -> str:
+    # Same serialisation as ResponseCache.put.
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+def _bodies(responses: int, search_limit: int) -> list[tuple[str, bytes]]:
+    bodies = []
+    for index in range(responses):
+        artist, title = f"Artist {index % 500}", f"Title {index}"
+        kind = index % 3
+        if kind == 0:
+            bodies.append(("track.search", search_results(artist, title, search_limit)))
+        elif kind == 1:
+            bodies.append(("track.getInfo", track_details(artist, title)))
+        else:
+            bodies.append(("album.getInfo", album_details(artist, f"Album {index % 97}")))
+    return [(method, json.dumps(payload).encode("utf-8")) for method, payload in bodies]
+
+
+def _parse(method: str, payload: dict[str, Any]) -> object:
+    if method == "track.search":
+        return parse_search(payload)
+    if method == "track.getInfo":
+        return parse_track_info(payload)
+    return parse_album_info(payload, artist="", album="")
+
+
+def _full(method: str, body: bytes) -> tuple[dict[str, Any], int]:
+    payload = json.loads(body)
+    return payload, len(_cache_dump(payload))
+
+
+def _compact(method: str, body: bytes) -> tuple[dict[str, Any], int]:
+    payload = compact_payload(method, loads(body))
+    return payload, len(_cache_dump(payload))
+
+
+def _run(
+    bodies: list[tuple[str, bytes]],
+    decode: Callable[[str, bytes], tuple[dict[str, Any], int]],
+) -> None:
+    held: list[dict[str, Any]] = []
+    cached_bytes = 0
+    tracemalloc.start()
+    started = time.process_time()
+    for method, body in bodies:
+        payload, size = decode(method, body)
+        _parse(method, payload)
+        held.append(payload)
+        cached_bytes += size
+    cpu = time.process_time() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"  {cpu / len(bodies) * 1e6:8.1f} us/response  "
+        f"cached {cached_bytes / len(bodies):8.0f} B/response  "
+        f"peak held {peak / 1e6:7.1f} MB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--responses", type=int, default=20_000)
+    args = parser.parse_args()
+
+    print(f"JSON backend: {JSON_BACKEND}")
+    # The previous search request sent no limit, so Last.fm returned its default page.
+    for label, limit, decode in (
+        (f"full, search limit {DEFAULT_SEARCH_LIMIT}", DEFAULT_SEARCH_LIMIT, _full),
+        (f"compact, search limit {SEARCH_RESULT_LIMIT}", SEARCH_RESULT_LIMIT, _compact),
+    ):
+        bodies = _bodies(args.responses, limit)
+        body_bytes = sum(len(body) for _, body in bodies)
+        print(f"{label}: bodies {body_bytes / len(bodies):.0f} B/response")
+        _run(bodies, decode)
+
+
+if __name__ == "__main__":
+    main()
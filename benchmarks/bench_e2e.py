@@ -0,0 +1,210 @@
+"""Offline end-to-end benchmark: synthetic corpus + local Last.fm stand-in + run_async.
+
+Usage:
+    uv run python benchmarks/bench_e2e.py --files 2000 --concurrency 16 --latency-ms 80
+    uv run python benchmarks/bench_e2e.py --files 2000 --rate-429 0.01 --adaptive-concurrency --json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import socket
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import Any
+
+from lastfm_standin import StandinConfig, serve
+from make_corpus import build_corpus
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def _wait_for(url: str, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            urllib.request.urlopen(url, timeout=1).read()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_lyriclabel(args: argparse.Namespace, corpus: str, state_dir: str) -> dict[str, Any]:
+    # Imported late so the stand-in's LASTFM_BASE_URL / LASTFM_API_KEY are set first.
+    import lyriclabel.main as cli
+    import lyriclabel.processing as processing
+    from lyriclabel.cache import ResponseCache
+    from lyriclabel.keys import KeyPool
+    from lyriclabel.logging_config import configure_logging
+    from lyriclabel.meta_fetcher import FetchContext
+    from lyriclabel.pipeline import StageStats, WriterPool
+    from lyriclabel.ratelimit import RequestThrottle
+    from lyriclabel.transport import HttpSettings
+
+    configure_logging(quiet=True, log_file=os.path.join(state_dir, "bench.log"))
+    # Injected 429s produce expected warnings; keep the console for the report.
+    for handler in logging.getLogger("lyriclabel").handlers:
+        if not isinstance(handler, logging.FileHandler):
+            handler.setLevel(logging.ERROR)
+    latencies: list[float] = []
+    original_process_file = processing.process_file
+
+    async def timed_process_file(*call_args: Any, **call_kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return await original_process_file(*call_args, **call_kwargs)
+        finally:
+            latencies.append(time.perf_counter() - started)
+
+    processing.process_file = timed_process_file  # type: ignore[assignment]
+    context = FetchContext(
+        throttle=RequestThrottle(
+            max_concurrency=args.concurrency,
+            max_rps=args.max_rps,
+            adaptive=args.adaptive_concurrency,
+        )
+    )
+    if args.api_keys > 1:
+        context.keys = KeyPool(
+            [f"benchmark-{number}" for number in range(1, args.api_keys + 1)],
+            max_rps_per_key=args.max_rps_per_key,
+        )
+    if args.cache:
+        context.cache = ResponseCache(os.path.join(state_dir, "cache"))
+    writer = WriterPool(args.write_workers)
+    network_stage = StageStats("network")
+    started = time.perf_counter()
+    try:
+        _, status_counts = asyncio.run(
+            cli.run_async(
+                corpus,
+                quiet_mode=True,
+                concurrency=args.concurrency,
+                dry_run=args.dry_run,
+                context=context,
+                writer=writer,
+                network_stage=network_stage,
+                http_settings=HttpSettings(pool_size=args.concurrency),
+            )
+        )
+    finally:
+        elapsed = time.perf_counter() - started
+        processing.process_file = original_process_file  # type: ignore[assignment]
+        writer.close()
+        if context.cache is not None:
+            context.cache.close()
+
+    latencies.sort()
+    return {
+        "files": len(latencies),
+        "elapsed_seconds": round(elapsed, 3),
+        "files_per_second": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency_p50_ms": round(_percentile(latencies, 0.50) * 1000, 1),
+        "latency_p95_ms": round(_percentile(latencies, 0.95) * 1000, 1),
+        "latency_p99_ms": round(_percentile(latencies, 0.99) * 1000, 1),
+        "errors": status_counts.get("errors", 0),
+        "statuses": dict(status_counts),
+        "lyriclabel": {**context.stats(), **network_stage.stats(), **writer.stage.stats()},
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--size-kb", type=int, default=64)
+    parser.add_argument("--tagged", type=float, default=0.0)
+    parser.add_argument("--partial", type=float, default=0.2)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--write-workers", type=int, default=2)
+    parser.add_argument("--max-rps", type=float, default=None)
+    parser.add_argument("--max-rps-per-key", type=float, default=None)
+    parser.add_argument("--api-keys", type=int, default=1, help="Rotate across this many keys")
+    parser.add_argument("--adaptive-concurrency", action="store_true")
+    parser.add_argument("--cache", action="store_true", help="Enable a fresh response cache")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--burst-429", type=int, default=5)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--key-rps", type=float, default=0.0, help="Stand-in per-key budget")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    config = StandinConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_429=args.rate_429,
+        burst_429=args.burst_429,
+        retry_after=args.retry_after,
+        rate_5xx=args.rate_5xx,
+        key_rps=args.key_rps,
+    )
+    port = _free_port()
+    server = multiprocessing.Process(target=serve, args=(config, port), daemon=True)
+    server.start()
+    base = f"http://127.0.0.1:{port}"
+    try:
+        _wait_for(f"{base}/stats")
+        with tempfile.TemporaryDirectory(prefix="lyriclabel-e2e-") as workdir:
+            corpus = os.path.join(workdir, "corpus")
+            build_corpus(
+                corpus,
+                files=args.files,
+                size_kb=args.size_kb,
+                tagged=args.tagged,
+                partial=args.partial,
+            )
+            os.environ["LASTFM_BASE_URL"] = f"{base}/2.0/"
+            os.environ["LASTFM_API_KEY"] = "benchmark"
+            report = _run_lyriclabel(args, corpus, workdir)
+        with urllib.request.urlopen(f"{base}/stats", timeout=5) as response:
+            report["standin"] = json.loads(response.read())
+    finally:
+        server.terminate()
+        server.join()
+
+    if args.json:
+        print(json.dumps(report, indent=2, sort_keys=True))
+        return 0
+    print(f"files            {report['files']} in {report['elapsed_seconds']} s")
+    print(f"throughput       {report['files_per_second']} files/sec")
+    print(
+        "latency          "
+        f"p50 {report['latency_p50_ms']} ms  p95 {report['latency_p95_ms']} ms  "
+        f"p99 {report['latency_p99_ms']} ms"
+    )
+    print(f"requests         {report['standin']}")
+    print(f"statuses         {report['statuses']}")
+    print(f"peak RSS         {report['peak_rss_mb']} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,102 @@
+"""Compare the fast ID3 reader with the mutagen read path on a synthetic corpus.
+
+Usage:
+    uv run python benchmarks/bench_id3_read.py --files 2000 --artwork-kb 200
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from collections.abc import Callable
+
+from mutagen.id3 import APIC, ID3, ID3NoHeaderError, TALB, TCON, TDRC, TIT2, TPE1
+from mutagen.mp3 import MP3
+
+from lyriclabel.id3_reader import read_tag_fields
+from lyriclabel.meta_edit import _extract_existing_tags
+
+# One silent MPEG-1 Layer III frame (128 kbps, 44.1 kHz).
+_MPEG_FRAME = bytes([0xFF, 0xFB, 0x90, 0x64]) + b"\x00" * 413
+
+
+def _build_corpus(directory: str, count: int, artwork_kb: int, audio_frames: int) -> list[str]:
+    rng = random.Random(1234)
+    artwork = os.urandom(artwork_kb * 1024)
+    frames = [
+        (TIT2, "Song"),
+        (TPE1, "Artist"),
+        (TALB, "Album"),
+        (TCON, "Rock"),
+        (TDRC, "2001"),
+    ]
+    paths: list[str] = []
+    for index in range(count):
+        path = os.path.join(directory, f"{index:06d}.mp3")
+        with open(path, "wb") as handle:
+            handle.write(_MPEG_FRAME * audio_frames)
+        paths.append(path)
+        if index % 10 == 0:
+            continue  # untagged
+        tags = ID3()
+        for frame_cls, text in frames:
+            if rng.random() < 0.85:
+                tags.add(frame_cls(encoding=rng.choice((0, 1, 3)), text=f"{text} {index}"))
+        if artwork_kb and index % 3 == 0:
+            tags.add(APIC(encoding=3, mime="image/jpeg", type=3, desc="", data=artwork))
+        tags.save(path, v2_version=rng.choice((3, 4)))
+    return paths
+
+
+def _mutagen_mp3(path: str) -> dict[str, str | None] | None:
+    return _extract_existing_tags(MP3(path, ID3=ID3))
+
+
+def _mutagen_id3(path: str) -> dict[str, str | None] | None:
+    try:
+        return _extract_existing_tags(ID3(path))
+    except ID3NoHeaderError:
+        return None
+
+
+def _time(label: str, reader: Callable[[str], object], paths: list[str], rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for path in paths:
+            reader(path)
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<28} {len(paths) / best:>10,.0f} files/sec  ({best * 1000:.1f} ms)")
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--artwork-kb", type=int, default=200)
+    parser.add_argument("--audio-frames", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="lyriclabel-bench-") as directory:
+        paths = _build_corpus(directory, args.files, args.artwork_kb, args.audio_frames)
+
+        fallbacks = 0
+        for path in paths:
+            fields = read_tag_fields(path)
+            if fields is None:
+                fallbacks += 1
+            elif fields != _mutagen_mp3(path):
+                raise SystemExit(f"mismatch for {path}: {fields} != {_mutagen_mp3(path)}")
+        print(f"parity ok on {len(paths)} files ({fallbacks} fall back to mutagen)")
+
+        baseline = _time("mutagen MP3 + ID3", _mutagen_mp3, paths, args.rounds)
+        _time("mutagen ID3 only", _mutagen_id3, paths, args.rounds)
+        fast_seconds = _time("lyriclabel.id3_reader", read_tag_fields, paths, args.rounds)
+        print(f"speedup vs current path: {baseline / fast_seconds:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
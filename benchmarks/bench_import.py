@@ -0,0 +1,102 @@
+"""Measure CLI startup cost and fail when it exceeds a budget.
+
+Each scenario runs ``--repeat`` times in a fresh interpreter; the best wall
+time, minus that of a bare ``python -c pass``, is compared against
+``--budget-ms``. The script also checks that the modules the CLI defers
+(aiohttp, mutagen, python-dotenv, multiprocessing, the Last.fm client) are
+still not loaded by ``import lyriclabel.main`` or ``lyriclabel --help``.
+Exits 1 on any failure, so it can gate CI.
+
+Usage:
+    uv run python benchmarks/bench_import.py
+    uv run python benchmarks/bench_import.py --budget-ms 80 --repeat 15
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+_REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFERRED_MODULES = (
+    "aiohttp",
+    "mutagen",
+    "dotenv",
+    "multiprocessing",
+    "lyriclabel.meta_fetcher",
+    "lyriclabel.meta_edit",
+    "lyriclabel.processing",
+)
+# Prints which deferred modules the given statement loaded, as JSON.
+_PROBE = """
+import contextlib, io, json, sys
+with contextlib.suppress(SystemExit), contextlib.redirect_stdout(io.StringIO()):
+    {statement}
+print(json.dumps([name for name in {deferred!r} if name in sys.modules]))
+"""
+
+
+def _scenarios(log_file: str) -> dict[str, str]:
+    missing = os.path.join(tempfile.gettempdir(), "lyriclabel-bench-import-missing")
+    return {
+        "import lyriclabel.main": "import lyriclabel.main",
+        "lyriclabel --help": "from lyriclabel.main import main; main(['--help'])",
+        "lyriclabel <missing path>": (
+            f"from lyriclabel.main import main; main([{missing!r}, '--quiet', "
+            f"'--log-file', {log_file!r}])"
+        ),
+    }
+
+
+def _run(statement: str) -> tuple[float, str]:
+    python_path = os.pathsep.join(filter(None, [_REPO, os.getenv("PYTHONPATH")]))
+    env = {**os.environ, "PYTHONPATH": python_path}
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", statement], capture_output=True, text=True, env=env, check=False
+    )
+    elapsed = time.perf_counter() - started
+    if completed.returncode != 0:
+        raise RuntimeError(f"{statement!r} failed:\n{completed.stderr}")
+    return elapsed, completed.stdout
+
+
+def _best(statement: str, repeat: int) -> float:
+    return min(_run(statement)[0] for _ in range(repeat))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=9)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=100.0,
+        help="Allowed time above interpreter startup, per scenario (default: 100)",
+    )
+    args = parser.parse_args()
+
+    baseline = _best("pass", args.repeat)
+    print(f"{'python -c pass':<28} {baseline * 1000:7.1f} ms (baseline)")
+    failures = []
+    with tempfile.TemporaryDirectory(prefix="lyriclabel-import-") as workdir:
+        for label, statement in _scenarios(os.path.join(workdir, "bench.log")).items():
+            cost = (_best(statement, args.repeat) - baseline) * 1000
+            _, output = _run(_PROBE.format(statement=statement, deferred=DEFERRED_MODULES))
+            loaded = json.loads(output.splitlines()[-1])
+            verdict = "ok" if cost <= args.budget_ms and not loaded else "FAIL"
+            if loaded:
+                verdict += f"  loaded: {', '.join(loaded)}"
+            print(f"{label:<28} {cost:7.1f} ms  {verdict}")
+            if cost > args.budget_ms or loaded:
+                failures.append(label)
+    if failures:
+        print(f"over the {args.budget_ms:g} ms budget or loading deferred modules: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Measure local index build time, size and lookup latency on a synthetic catalog.
+
+Writes a CSV catalog of ``--rows`` tracks, builds the index from it, then
+looks up parsed filenames: half present in the catalog, half not, a quarter
+without an artist. Lookups should stay in the microseconds so the index is
+never the bottleneck next to tag reads and writes.
+
+Usage:
+    uv run python benchmarks/bench_local_index.py --rows 1000000 --lookups 200000
+"""
+
+import argparse
+import csv
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from lyriclabel.local_index import LocalIndex, build_index
+from lyriclabel.parser import parse_filename
+
+_WORDS = [
+    "love", "night", "fire", "heart", "road", "dream", "light", "rain",
+    "home", "gold", "river", "summer", "ghost", "city", "time", "wild",
+]
+
+
+def _title(rng: random.Random, index: int) -> str:
+    words = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(1, 4))).title()
+    return f"{words} {index}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory(prefix="lyriclabel-index-") as workdir:
+        catalog = Path(workdir) / "catalog.csv"
+        rows = []
+        with catalog.open("w", encoding="utf-8", newline="") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(["artist", "title", "album", "genre", "year"])
+            for number in range(args.rows):
+                artist, title = f"Artist {number % 20_000} feat. Guest", _title(rng, number)
+                writer.writerow([artist, title, f"Album {number % 7}", "rock", 1970 + number % 50])
+                if number < args.lookups:
+                    rows.append((artist, title))
+
+        started = time.perf_counter()
+        stats = build_index([catalog], Path(workdir) / "index.sqlite3")
+        build_seconds = time.perf_counter() - started
+        size = (Path(workdir) / "index.sqlite3").stat().st_size
+        print(
+            f"build            {stats['entries']} entries in {build_seconds:.2f} s "
+            f"({stats['entries'] / build_seconds:,.0f} rows/s), {size / 1e6:.1f} MB "
+            f"({size / max(1, stats['entries']):.0f} B/entry)"
+        )
+
+        names = []
+        for lookup in range(args.lookups):
+            artist, title = rows[lookup % len(rows)]
+            if lookup % 2:
+                title = f"{title} Missing"
+            names.append(f"{title}.mp3" if lookup % 4 == 0 else f"{artist} - {title}.mp3")
+        parsed = [parse_filename(name) for name in names]
+
+        index = LocalIndex(Path(workdir) / "index.sqlite3")
+        started = time.perf_counter()
+        for item in parsed:
+            index.lookup(item)
+        lookup_seconds = time.perf_counter() - started
+        index.close()
+        print(
+            f"lookup           {len(parsed)} in {lookup_seconds:.2f} s "
+            f"({lookup_seconds / len(parsed) * 1e6:.1f} us/lookup)  {index.stats()}"
+        )
+
+
+if __name__ == "__main__":
+    main()
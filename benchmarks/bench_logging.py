@@ -0,0 +1,175 @@
+"""Measure logging cost on the event-loop thread per processed file.
+
+Each synthetic "file" waits a simulated network latency, then emits the
+records a non-quiet run logs for one track (processing, search, 10 candidates,
+write complete). Compares synchronous handlers (the previous design) with the
+queued setup, reporting time spent in log calls per file and event-loop lag.
+``--slow-log-ms`` adds a delay to every log file flush to mimic slow storage.
+
+Usage:
+    uv run python benchmarks/bench_logging.py --files 5000 --concurrency 64
+    uv run python benchmarks/bench_logging.py --files 2000 --slow-log-ms 2
+"""
+
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from lyriclabel import logging_config
+from lyriclabel.logging_config import (
+    JsonFormatter,
+    configure_logging,
+    get_logger,
+    logging_stats,
+    shutdown_logging,
+)
+
+logger = get_logger("bench")
+
+
+def _slow_down(handler: logging.Handler, delay_seconds: float) -> None:
+    if not delay_seconds or not isinstance(handler, logging.FileHandler):
+        return
+    flush = handler.flush
+
+    def slow_flush() -> None:
+        time.sleep(delay_seconds)
+        flush()
+
+    handler.flush = slow_flush  # type: ignore[method-assign]
+
+
+def _configure_direct(log_path: Path, delay_seconds: float) -> None:
+    """The pre-queue setup: format and write on the calling thread."""
+    shutdown_logging()
+    root = logging.getLogger("lyriclabel")
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.setLevel(logging.DEBUG)
+    root.propagate = False
+    file_handler = RotatingFileHandler(log_path, maxBytes=5 * 1024 * 1024, backupCount=5)
+    file_handler.setFormatter(JsonFormatter(datefmt="%Y-%m-%dT%H:%M:%S"))
+    _slow_down(file_handler, delay_seconds)
+    root.addHandler(file_handler)
+
+
+def _configure_queued(log_path: Path, delay_seconds: float, **options: object) -> None:
+    configure_logging(quiet=True, log_file=str(log_path), **options)  # type: ignore[arg-type]
+    if logging_config._listener is not None:
+        for handler in logging_config._listener.handlers:
+            _slow_down(handler, delay_seconds)
+
+
+def _log_one_file(index: int) -> None:
+    file_path = f"/music/Artist {index % 97}/Album/{index:05d} - Title {index}.mp3"
+    logger.info("processing file", extra={"file_path": file_path})
+    logger.info(
+        "searching for song",
+        extra={"search_title": f"Title {index}", "artist": "Artist", "raw_filename": file_path},
+    )
+    logger.info("search results found", extra={"raw_filename": file_path, "result_count": 10})
+    if logger.isEnabledFor(logging.DEBUG):
+        for candidate in range(1, 11):
+            logger.debug(
+                "search result candidate",
+                extra={"index": candidate, "artist": "Artist", "track": f"Title {index}"},
+            )
+    logger.info(
+        "metadata write complete",
+        extra={
+            "file_path": file_path,
+            "dry_run": False,
+            "planned_changes": {"Title": {"old": None, "new": f"Title {index}"}},
+            "save_mode": "in_place",
+            "bytes_written": 4096,
+        },
+    )
+
+
+async def _drive(files: int, concurrency: int, latency: float) -> tuple[list[float], list[float]]:
+    per_file: list[float] = []
+    lags: list[float] = []
+    next_index = iter(range(files))
+    tick = 0.005
+
+    async def worker() -> None:
+        for index in next_index:
+            await asyncio.sleep(latency)
+            started = time.perf_counter()
+            _log_one_file(index)
+            per_file.append(time.perf_counter() - started)
+
+    async def monitor() -> None:
+        while True:
+            expected = time.perf_counter() + tick
+            await asyncio.sleep(tick)
+            lags.append(max(0.0, time.perf_counter() - expected))
+
+    monitor_task = asyncio.create_task(monitor())
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    monitor_task.cancel()
+    return per_file, lags
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[int(fraction * (len(ordered) - 1))] if ordered else 0.0
+
+
+def _run(label: str, args: argparse.Namespace) -> None:
+    started = time.perf_counter()
+    per_file, lags = asyncio.run(
+        _drive(args.files, args.concurrency, args.latency_ms / 1000)
+    )
+    loop_seconds = time.perf_counter() - started
+    dropped = logging_stats()["log_records_dropped"]
+    shutdown_logging()  # waits for the listener to drain the queue
+    drain_seconds = time.perf_counter() - started - loop_seconds
+    print(
+        f"{label:<20} {sum(per_file) / len(per_file) * 1e6:8.1f} us/file "
+        f"(p99 {_percentile(per_file, 0.99) * 1e6:8.1f})  "
+        f"loop lag p99 {_percentile(lags, 0.99) * 1000:6.2f} ms max {max(lags, default=0) * 1000:7.2f} ms  "
+        f"run {loop_seconds:5.2f} s + drain {drain_seconds:4.2f} s  dropped {dropped}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=5_000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Simulated network time per file")
+    parser.add_argument("--slow-log-ms", type=float, default=0.0, help="Delay added to each log flush")
+    parser.add_argument("--drop-queue-size", type=int, default=1_000)
+    args = parser.parse_args()
+    delay = args.slow_log_ms / 1000
+
+    with tempfile.TemporaryDirectory(prefix="lyriclabel-log-") as workdir:
+        directory = Path(workdir)
+        _configure_direct(directory / "direct.log", delay)
+        _run("direct (sync)", args)
+
+        _configure_queued(directory / "block.log", delay)
+        _run("queued, block", args)
+
+        _configure_queued(
+            directory / "drop.log",
+            delay,
+            queue_size=args.drop_queue_size,
+            overflow="drop",
+        )
+        _run("queued, drop", args)
+
+        _configure_queued(directory / "info.log", delay, file_level=logging.INFO)
+        _run("queued, file INFO", args)
+
+        root = logging.getLogger("lyriclabel")
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+
+
+if __name__ == "__main__":
+    main()
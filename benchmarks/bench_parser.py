@@ -0,0 +1,130 @@
+"""Measure filename parsing throughput and peak memory on synthetic names.
+
+Known filenames are checked against their expected (artist, title, track_no)
+split first; the script exits 1 if any parse differs.
+
+Usage:
+    uv run python benchmarks/bench_parser.py --names 3000000
+"""
+
+import argparse
+import random
+import resource
+import sys
+import time
+from collections.abc import Iterator
+from itertools import islice
+
+from lyriclabel.parser import normalize_for_search, parse_filename, parse_filenames
+
+_ARTISTS = [
+    "Daft Punk", "Simon & Garfunkel", "Blink-182", "Earth, Wind & Fire",
+    "The Beatles", "Beyoncé", "AC_DC", "Florence and the Machine",
+    "Guns N' Roses", "Sigur Rós", "Run-DMC", "Crosby, Stills, Nash & Young",
+]
+_WORDS = [
+    "love", "night", "fire", "heart", "road", "dream", "light", "rain",
+    "home", "gold", "river", "summer", "ghost", "city", "time", "wild",
+]
+
+# filename -> expected (artist, title, track_no)
+_CHECKS = {
+    "Daft Punk - One More Time.mp3": ("Daft Punk", "One More Time", None),
+    "Blink-182 - Adam's Song.mp3": ("Blink-182", "Adam's Song", None),
+    "311 - Amber.mp3": ("311", "Amber", None),
+    "112 - Cupid.mp3": ("112", "Cupid", None),
+    "10.000 Maniacs - Because the Night.mp3": ("10.000 Maniacs", "Because the Night", None),
+    "20-20 - Title.mp3": ("20-20", "Title", None),
+    "4.0 - Title.mp3": ("4.0", "Title", None),
+    "3 Doors Down - Kryptonite.mp3": ("3 Doors Down", "Kryptonite", None),
+    "10 Years - Wasteland.mp3": ("10 Years", "Wasteland", None),
+    "01 - Title.mp3": (None, "Title", "01"),
+    "01 - Artist - Title.mp3": ("Artist", "Title", "01"),
+    "7 - Daft Punk - One More Time.mp3": ("Daft Punk", "One More Time", "7"),
+    "1. Artist - Title.mp3": ("Artist", "Title", "1"),
+    "05-Intro.mp3": (None, "Intro", "05"),
+}
+
+
+def _check_parses() -> list[str]:
+    failures = []
+    for name, expected in _CHECKS.items():
+        parsed = parse_filename(name)
+        actual = (parsed.artist, parsed.title, parsed.track_no)
+        if actual != expected:
+            failures.append(f"{name!r}: expected {expected}, got {actual}")
+    return failures
+
+
+def _synthetic_names(count: int, artist_pool: int, seed: int) -> Iterator[str]:
+    rng = random.Random(seed)
+    artists = [
+        f"{rng.choice(_ARTISTS)}{'' if index < len(_ARTISTS) else f' {index}'}"
+        for index in range(artist_pool)
+    ]
+    for _ in range(count):
+        title = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(1, 5))).title()
+        style = rng.random()
+        if style < 0.5:
+            name = f"{rng.choice(artists)} - {title}"
+        elif style < 0.7:
+            name = f"{rng.randint(1, 20):02d} - {title}"
+        elif style < 0.8:
+            name = f"{rng.choice(artists)} - {title} (feat. {rng.choice(artists)})"
+        elif style < 0.9:
+            name = f"{rng.choice(artists)}_{title}"
+        else:
+            name = title
+        yield name + (".mp3.mp3" if rng.random() < 0.02 else ".mp3")
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run(label: str, names: Iterator[str], batch: bool, chunk_size: int) -> None:
+    normalize_for_search.cache_clear()
+    elapsed = 0.0
+    count = 0
+    # Names are materialized a chunk at a time so generation stays out of the timing.
+    while chunk := list(islice(names, chunk_size)):
+        started = time.perf_counter()
+        if batch:
+            for _ in parse_filenames(chunk):
+                pass
+        else:
+            for name in chunk:
+                parse_filename(name)
+        elapsed += time.perf_counter() - started
+        count += len(chunk)
+    info = normalize_for_search.cache_info()
+    hit_rate = info.hits / max(1, info.hits + info.misses)
+    print(
+        f"{label:<22} {count / elapsed:>12,.0f} names/sec  "
+        f"memo hit rate {hit_rate:.1%}  peak RSS {_peak_rss_mb():.1f} MB"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--names", type=int, default=3_000_000)
+    parser.add_argument("--artists", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    args = parser.parse_args()
+
+    failures = _check_parses()
+    for failure in failures:
+        print(f"parse mismatch {failure}")
+    if failures:
+        return 1
+    for label, batch in (("parse_filename loop", False), ("parse_filenames", True)):
+        names = _synthetic_names(args.names, args.artists, args.seed)
+        _run(label, names, batch, args.chunk_size)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
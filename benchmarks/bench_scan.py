@@ -0,0 +1,109 @@
+"""Measure library discovery: the previous os.walk scan vs. the parallel scandir scanner.
+
+Builds a synthetic ``Artist/Album/NN - Title.mp3`` tree of empty files (a
+share of them hardlinked or symlinked into a second directory), or scans an
+existing ``--root`` such as an NFS/SMB mount, where parallel listing pays
+off most. ``--latency-ms`` emulates such a mount by delaying every directory
+listing. Each scan runs ``--repeat`` times and the best is reported, so the
+page cache is warm for every variant.
+
+Usage:
+    uv run python benchmarks/bench_scan.py --artists 200 --albums 10 --tracks 12
+    uv run python benchmarks/bench_scan.py --latency-ms 2 --threads 1,8,32
+    uv run python benchmarks/bench_scan.py --root /mnt/nas/music --threads 1,8,32
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from collections.abc import Callable
+
+from lyriclabel.scanner import LibraryScanner
+
+
+def _build_tree(root: str, artists: int, albums: int, tracks: int, links: float) -> None:
+    linked = os.path.join(root, "Playlists")
+    os.makedirs(linked)
+    every = round(1 / links) if links else 0
+    for artist in range(artists):
+        for album in range(albums):
+            directory = os.path.join(root, f"Artist {artist}", f"Album {album}")
+            os.makedirs(directory)
+            for track in range(tracks):
+                path = os.path.join(directory, f"{track + 1:02d} - Title {track}.mp3")
+                open(path, "wb").close()
+                number = (artist * albums + album) * tracks + track
+                if every and number % every == 0:
+                    alias = os.path.join(linked, f"{number}.mp3")
+                    if number % 2:
+                        os.link(path, alias)
+                    else:
+                        os.symlink(path, alias)
+
+
+def _delay_listings(latency: float) -> None:
+    # os.walk and the scanner both list through os.scandir.
+    scandir = os.scandir
+
+    def delayed(path: str) -> "os._ScandirIterator[str]":
+        time.sleep(latency)
+        return scandir(path)
+
+    os.scandir = delayed  # type: ignore[assignment]
+
+
+def _walk(root: str) -> int:
+    # The scan before the scanner: os.walk, abspath per entry, no dedupe.
+    files = 0
+    for directory, _, filenames in os.walk(os.path.abspath(root)):
+        files += sum(
+            1
+            for filename in filenames
+            if os.path.abspath(os.path.join(directory, filename)).lower().endswith(".mp3")
+        )
+    return files
+
+
+def _scan(threads: int) -> Callable[[str], int]:
+    def scan(root: str) -> int:
+        return sum(len(batch) for batch in LibraryScanner(root, threads=threads).batches())
+
+    return scan
+
+
+def _best(label: str, scan: Callable[[str], int], root: str, repeat: int) -> None:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        files = scan(root)
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<22} {files:>9} files  {best:7.3f} s  {files / best:>12,.0f} files/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--root", default=None, help="Scan this tree instead of a synthetic one")
+    parser.add_argument("--artists", type=int, default=200)
+    parser.add_argument("--albums", type=int, default=10)
+    parser.add_argument("--tracks", type=int, default=12)
+    parser.add_argument("--links", type=float, default=0.05, help="Share of files also linked")
+    parser.add_argument("--threads", default="1,8", help="Comma-separated scanner thread counts")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay per directory listing")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="lyriclabel-scan-") as workdir:
+        root = args.root
+        if root is None:
+            root = workdir
+            _build_tree(root, args.artists, args.albums, args.tracks, args.links)
+        if args.latency_ms:
+            _delay_listings(args.latency_ms / 1000)
+        _best("os.walk", _walk, root, args.repeat)
+        for threads in (int(value) for value in args.threads.split(",")):
+            _best(f"scanner, {threads} threads", _scan(threads), root, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
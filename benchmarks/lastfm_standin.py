@@ -0,0 +1,264 @@
+"""Local stand-in for the Last.fm API with configurable latency and faults.
+
+Serves ``track.search``, ``track.getInfo`` and ``album.getInfo`` with
+deterministic payloads shaped like Last.fm's, including the images, wiki text
+and tag lists LyricLabel does not read, so decoding cost is realistic.
+``track.search`` honours ``limit`` (default 30). ``--key-rps`` gives each
+API key its own request budget, as Last.fm does. Also serves ``/stats`` with
+request counters (including per key). Usage:
+    uv run python benchmarks/lastfm_standin.py --port 8765 --latency-ms 80 --rate-429 0.01
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+
+from aiohttp import web
+
+
+@dataclass
+class StandinConfig:
+    latency_ms: float = 50.0
+    jitter_ms: float = 20.0
+    rate_429: float = 0.0
+    burst_429: int = 5
+    retry_after: float = 1.0
+    rate_5xx: float = 0.0
+    miss_rate: float = 0.05
+    # Per-API-key request budget; a key over it gets a 429 (0 disables).
+    key_rps: float = 0.0
+    seed: int = 1
+
+
+def _stable_int(*parts: str) -> int:
+    return zlib.crc32("|".join(parts).casefold().encode("utf-8"))
+
+
+_GENRES = ("rock", "pop", "jazz", "soul", "indie", "electronic", "folk", "metal", "blues", "punk")
+_LOREM = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua. "
+)
+DEFAULT_SEARCH_LIMIT = 30
+
+
+def _url(*parts: str) -> str:
+    return "https://www.last.fm/music/" + "/".join(part.replace(" ", "+") for part in parts)
+
+
+def _mbid(seed: int) -> str:
+    digits = f"{seed:08x}{seed * 2654435761 % 2**64:016x}"[:32]
+    return f"{digits[:8]}-{digits[8:12]}-{digits[12:16]}-{digits[16:20]}-{digits[20:32]}"
+
+
+def _images(seed: int) -> list[dict]:
+    return [
+        {"#text": f"https://lastfm.freetls.fastly.net/i/u/{size}/{seed:032x}.png", "size": name}
+        for size, name in (
+            ("34s", "small"),
+            ("64s", "medium"),
+            ("174s", "large"),
+            ("300x300", "extralarge"),
+        )
+    ]
+
+
+def _tags(seed: int, count: int) -> list[dict]:
+    names = [_GENRES[(seed + offset) % len(_GENRES)] for offset in range(count)]
+    return [{"name": name, "url": _url("+tag", name)} for name in names]
+
+
+def _wiki(seed: int, subject: str) -> dict:
+    return {
+        "published": f"{1 + seed % 28:02d} Jan {1970 + seed % 50}, 12:00",
+        "summary": f"{subject} is a recording. " + _LOREM * 3,
+        "content": f"{subject} is a recording. " + _LOREM * 30,
+    }
+
+
+def _search_match(name: str, artist: str, seed: int) -> dict:
+    return {
+        "name": name,
+        "artist": artist,
+        "url": _url(artist, "_", name),
+        "streamable": "0",
+        "listeners": str(seed % 100_000),
+        "image": _images(seed),
+        "mbid": _mbid(seed),
+    }
+
+
+def search_results(artist: str, track: str, limit: int) -> dict:
+    seed = _stable_int(artist, track)
+    matches = [_search_match(track, artist, seed)]
+    matches += [
+        _search_match(f"{track} ({variant} {index})", artist, seed + index)
+        for index, variant in zip(range(1, limit), ("Live", "Remastered", "Demo", "Edit") * limit)
+    ]
+    return {
+        "results": {
+            "opensearch:Query": {"#text": "", "role": "request", "startPage": "1"},
+            "opensearch:totalResults": str(len(matches) * 7),
+            "opensearch:startIndex": "0",
+            "opensearch:itemsPerPage": str(limit),
+            "trackmatches": {"track": matches[:limit]},
+            "@attr": {},
+        }
+    }
+
+
+def track_details(artist: str, track: str) -> dict:
+    seed = _stable_int(artist, track)
+    album = f"{artist} Album {seed % 7}"
+    return {
+        "track": {
+            "name": track,
+            "mbid": _mbid(seed),
+            "url": _url(artist, "_", track),
+            "duration": str(180_000 + seed % 120_000),
+            "streamable": {"#text": "0", "fulltrack": "0"},
+            "listeners": str(seed % 1_000_000),
+            "playcount": str(seed % 10_000_000),
+            "artist": {"name": artist, "mbid": _mbid(seed + 1), "url": _url(artist)},
+            "album": {
+                "artist": artist,
+                "title": album,
+                "mbid": _mbid(seed + 2),
+                "url": _url(artist, album),
+                "image": _images(seed),
+                "@attr": {"position": str(1 + seed % 12)},
+            },
+            "toptags": {"tag": _tags(seed, 5)},
+            "wiki": _wiki(seed, track),
+        }
+    }
+
+
+def album_details(artist: str, album: str) -> dict:
+    seed = _stable_int(artist, album)
+    tracks = [
+        {
+            "streamable": {"fulltrack": "0", "#text": "0"},
+            "duration": 180 + rank * 7,
+            "url": _url(artist, album, f"Track {rank}"),
+            "name": f"Track {rank}",
+            "@attr": {"rank": rank},
+            "artist": {"url": _url(artist), "name": artist, "mbid": _mbid(seed + 1)},
+        }
+        for rank in range(1, 13)
+    ]
+    return {
+        "album": {
+            "artist": artist,
+            "mbid": _mbid(seed),
+            "tags": {"tag": [{"name": "rock", "url": _url("+tag", "rock")}, *_tags(seed, 4)]},
+            "playcount": str(seed % 10_000_000),
+            "image": _images(seed),
+            "tracks": {"track": tracks},
+            "url": _url(artist, album),
+            "name": album,
+            "listeners": str(seed % 1_000_000),
+            "wiki": {**_wiki(seed, album), "published": "01 Jan 2001, 00:00"},
+        }
+    }
+
+
+def build_app(config: StandinConfig) -> web.Application:
+    rng = random.Random(config.seed)
+    stats: Counter[str] = Counter()
+    burst_remaining = 0
+    key_buckets: dict[str, tuple[float, float]] = {}
+
+    def key_over_budget(key: str) -> bool:
+        now = time.monotonic()
+        tokens, refilled_at = key_buckets.get(key, (config.key_rps, now))
+        tokens = min(config.key_rps, tokens + (now - refilled_at) * config.key_rps)
+        over = tokens < 1
+        key_buckets[key] = (tokens if over else tokens - 1, now)
+        return over
+
+    async def api(request: web.Request) -> web.Response:
+        nonlocal burst_remaining
+        method = request.query.get("method", "")
+        api_key = request.query.get("api_key", "")
+        stats["requests"] += 1
+        stats[method] += 1
+        stats[f"key:{api_key}"] += 1
+        await asyncio.sleep(
+            max(0.0, config.latency_ms + rng.uniform(-1, 1) * config.jitter_ms) / 1000
+        )
+
+        if burst_remaining == 0 and rng.random() < config.rate_429:
+            burst_remaining = config.burst_429
+        if burst_remaining > 0:
+            burst_remaining -= 1
+            stats["status_429"] += 1
+            return web.Response(status=429, headers={"Retry-After": str(config.retry_after)})
+        if config.key_rps and key_over_budget(api_key):
+            stats["status_429_key"] += 1
+            return web.Response(status=429, headers={"Retry-After": str(config.retry_after)})
+        if rng.random() < config.rate_5xx:
+            stats["status_5xx"] += 1
+            return web.Response(status=503)
+
+        query = request.query
+        if method == "track.search":
+            track = query.get("track", "")
+            if _stable_int(track) % 1000 < config.miss_rate * 1000:
+                return web.json_response({"results": {"trackmatches": {"track": []}}})
+            artist = query.get("artist") or f"Artist {_stable_int(track) % 500}"
+            limit = query.get("limit", "")
+            limit_value = int(limit) if limit.isdigit() else DEFAULT_SEARCH_LIMIT
+            return web.json_response(search_results(artist, track, limit_value))
+        if method == "track.getInfo":
+            return web.json_response(track_details(query.get("artist", ""), query.get("track", "")))
+        if method == "album.getInfo":
+            return web.json_response(album_details(query.get("artist", ""), query.get("album", "")))
+        return web.json_response({"error": 3, "message": "Invalid Method"})
+
+    async def stats_view(request: web.Request) -> web.Response:
+        return web.json_response(dict(stats))
+
+    app = web.Application()
+    app.router.add_get("/2.0/", api)
+    app.router.add_get("/stats", stats_view)
+    return app
+
+
+def serve(config: StandinConfig, port: int) -> None:
+    web.run_app(build_app(config), host="127.0.0.1", port=port, print=None)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--burst-429", type=int, default=5)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--miss-rate", type=float, default=0.05)
+    parser.add_argument("--key-rps", type=float, default=0.0, help="Per-key requests/sec before 429")
+    args = parser.parse_args()
+    config = StandinConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_429=args.rate_429,
+        burst_429=args.burst_429,
+        retry_after=args.retry_after,
+        rate_5xx=args.rate_5xx,
+        miss_rate=args.miss_rate,
+        key_rps=args.key_rps,
+    )
+    print(f"Last.fm stand-in on http://127.0.0.1:{args.port}/2.0/")
+    serve(config, args.port)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
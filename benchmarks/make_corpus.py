@@ -0,0 +1,107 @@
+"""Generate a synthetic MP3 library for offline benchmarks.
+
+Usage:
+    uv run python benchmarks/make_corpus.py /tmp/corpus --files 5000 --tagged 0.3
+"""
+
+import argparse
+import os
+import random
+
+from mutagen.id3 import ID3, TALB, TCON, TDRC, TIT2, TPE1
+
+# One silent MPEG-1 Layer III frame (128 kbps, 44.1 kHz).
+MPEG_FRAME = bytes([0xFF, 0xFB, 0x90, 0x64]) + b"\x00" * 413
+FILENAME_STYLES = ("artist-title", "track-title", "unstructured")
+_WORDS = [
+    "love", "night", "fire", "heart", "road", "dream", "light", "rain",
+    "home", "gold", "river", "summer", "ghost", "city", "time", "wild",
+]
+
+
+def build_corpus(
+    root: str,
+    *,
+    files: int,
+    size_kb: int = 64,
+    tagged: float = 0.0,
+    partial: float = 0.2,
+    styles: tuple[str, ...] = FILENAME_STYLES,
+    tracks_per_album: int = 10,
+    seed: int = 42,
+) -> list[str]:
+    """Write ``files`` MP3s under ``root`` as ``Artist N/Album M/<name>.mp3``.
+
+    ``tagged`` is the share of files with all five managed tags, ``partial``
+    the share with some of them; the rest are untagged.
+    """
+    rng = random.Random(seed)
+    frame_count = max(1, size_kb * 1024 // len(MPEG_FRAME))
+    audio = MPEG_FRAME * frame_count
+    paths: list[str] = []
+    for index in range(files):
+        album_index = index // tracks_per_album
+        artist = f"Artist {album_index // 3}"
+        album = f"Album {album_index}"
+        track_no = index % tracks_per_album + 1
+        title = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(1, 4))).title()
+        style = rng.choice(styles)
+        if style == "artist-title":
+            name = f"{artist} - {title}"
+        elif style == "track-title":
+            name = f"{track_no:02d} - {title}"
+        else:
+            name = f"{title} {index}"
+
+        directory = os.path.join(root, artist, album)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{name}.mp3")
+        with open(path, "wb") as handle:
+            handle.write(audio)
+        paths.append(path)
+
+        roll = rng.random()
+        if roll >= tagged + partial:
+            continue
+        frames = [
+            TIT2(encoding=3, text=title),
+            TPE1(encoding=3, text=artist),
+            TALB(encoding=3, text=album),
+            TCON(encoding=3, text="Rock"),
+            TDRC(encoding=3, text="2001"),
+        ]
+        if roll >= tagged:
+            frames = rng.sample(frames, rng.randint(1, 4))
+        tags = ID3()
+        for frame in frames:
+            tags.add(frame)
+        tags.save(path)
+    return paths
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root")
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--size-kb", type=int, default=64)
+    parser.add_argument("--tagged", type=float, default=0.0)
+    parser.add_argument("--partial", type=float, default=0.2)
+    parser.add_argument("--styles", default=",".join(FILENAME_STYLES))
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    paths = build_corpus(
+        args.root,
+        files=args.files,
+        size_kb=args.size_kb,
+        tagged=args.tagged,
+        partial=args.partial,
+        styles=tuple(args.styles.split(",")),
+        seed=args.seed,
+    )
+    print(f"wrote {len(paths)} files under {args.root}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
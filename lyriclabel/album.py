@@ -0,0 +1,115 @@
+import asyncio
+import os
+from collections import Counter, OrderedDict
+
+import aiohttp
+
+from lyriclabel.lastfm_records import AlbumInfo, AlbumTrack
+from lyriclabel.logging_config import get_logger
+from lyriclabel.meta_fetcher import FetchContext, fetch_album_metadata_async
+from lyriclabel.parser import ParsedFilename, parse_filename, search_key
+
+# Single-file groups gain nothing from album.getInfo; per-track lookup is as cheap.
+_MIN_GROUP_SIZE = 2
+# Albums kept in memory; the pipeline walks one directory at a time.
+_MAX_CACHED_ALBUMS = 256
+
+logger = get_logger("album")
+
+AlbumKey = tuple[str, str, str]
+
+
+def _album_key(filepath: str, parsed: ParsedFilename) -> AlbumKey | None:
+    """Group by directory and artist, assuming an ``Artist/Album/NN - Title.mp3`` layout."""
+    directory = os.path.dirname(filepath)
+    album = os.path.basename(directory)
+    artist = parsed.artist or os.path.basename(os.path.dirname(directory))
+    if not album or not artist:
+        return None
+    return directory, artist, album
+
+
+class AlbumResolver:
+    """Resolves files through one ``album.getInfo`` per directory/artist group.
+
+    The pipeline registers each directory batch as it is discovered so group
+    sizes are known up front. Lookups are shared per group; files the album
+    track list cannot match return ``None`` and fall back to per-track lookups.
+    """
+
+    def __init__(self) -> None:
+        self.lookups = 0
+        self.matched = 0
+        self.unmatched = 0
+        self._group_sizes: Counter[AlbumKey] = Counter()
+        self._albums: OrderedDict[AlbumKey, asyncio.Future[AlbumInfo | None]] = OrderedDict()
+
+    def register(self, file_paths: list[str]) -> None:
+        for file_path in file_paths:
+            key = _album_key(file_path, parse_filename(os.path.basename(file_path)))
+            if key is not None:
+                self._group_sizes[key] += 1
+
+    async def resolve(
+        self,
+        session: aiohttp.ClientSession,
+        filepath: str,
+        parsed: ParsedFilename,
+        *,
+        context: FetchContext | None = None,
+    ) -> dict | None:
+        key = _album_key(filepath, parsed)
+        if key is None or self._group_sizes[key] < _MIN_GROUP_SIZE:
+            return None
+
+        album_future = self._albums.get(key)
+        if album_future is None:
+            self.lookups += 1
+            _, artist, album = key
+            album_future = asyncio.ensure_future(
+                fetch_album_metadata_async(session, artist, album, context=context)
+            )
+            self._albums[key] = album_future
+            while len(self._albums) > _MAX_CACHED_ALBUMS:
+                self._albums.popitem(last=False)
+        else:
+            self._albums.move_to_end(key)
+
+        album_info = await asyncio.shield(album_future)
+        track = _match_track(album_info, parsed) if album_info else None
+        if album_info is None or track is None:
+            self.unmatched += 1
+            return None
+
+        self.matched += 1
+        logger.debug(
+            "track resolved from album",
+            extra={"file_path": filepath, "album": album_info.album, "track": track.name},
+        )
+        return {
+            "artist": album_info.artist,
+            "album": album_info.album,
+            "track": track.name,
+            "genre": album_info.genre,
+            "year": album_info.year,
+        }
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "album_lookups": self.lookups,
+            "album_matched": self.matched,
+            "album_unmatched": self.unmatched,
+        }
+
+
+def _match_track(album_info: AlbumInfo, parsed: ParsedFilename) -> AlbumTrack | None:
+    wanted = search_key(parsed.title)
+    for track in album_info.tracks:
+        if search_key(track.name) == wanted:
+            return track
+    if parsed.track_no is not None:
+        track_no = int(parsed.track_no)
+        for track in album_info.tracks:
+            if track.rank == track_no:
+                return track
+    return None
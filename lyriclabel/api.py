@@ -0,0 +1,102 @@
+import asyncio
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from contextlib import AsyncExitStack
+
+import aiohttp
+
+from lyriclabel.manifest import Manifest
+from lyriclabel.meta_fetcher import FetchContext, create_lastfm_session
+from lyriclabel.metrics import RunMetrics
+from lyriclabel.pipeline import DEFAULT_CONCURRENCY, WriterPool
+from lyriclabel.processing import FileProcessor, ProcessOutcome
+from lyriclabel.report import RunReport
+from lyriclabel.transport import HttpSettings
+
+__all__ = ["FetchContext", "ProcessOutcome", "create_lastfm_session", "tag_paths"]
+
+
+async def _aiter_paths(paths: Iterable[str] | AsyncIterable[str]) -> AsyncIterator[str]:
+    if isinstance(paths, AsyncIterable):
+        async for path in paths:
+            yield path
+    else:
+        for path in paths:
+            yield path
+
+
+async def tag_paths(
+    paths: Iterable[str] | AsyncIterable[str],
+    *,
+    session: aiohttp.ClientSession | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    dry_run: bool = False,
+    fill_missing_only: bool = False,
+    padding: int | None = None,
+    context: FetchContext | None = None,
+    writer: WriterPool | None = None,
+    manifest: Manifest | None = None,
+    report: RunReport | None = None,
+    metrics: RunMetrics | None = None,
+) -> AsyncIterator[ProcessOutcome]:
+    """Tag MP3 ``paths`` on the running loop, yielding each outcome as it completes.
+
+    For services that tag files in-process. Pass a long-lived ``session`` and
+    ``context`` (cache, throttle, key pool) to share them across calls;
+    without ``session`` one is opened for this call only. Writes go to
+    ``writer`` or the default executor. Outcomes arrive in completion order,
+    with the file's errors attached. At most ``concurrency`` files (plus the
+    writer's capacity) are in progress; new paths are taken from ``paths`` only as
+    outcomes are consumed. Logging is left as the caller configured it, and
+    per-file progress is not logged. Close the iterator early
+    (``contextlib.aclosing``) to cancel the files still in progress.
+    """
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+    if context is None:
+        context = FetchContext()
+    limit = concurrency + (writer.capacity if writer is not None else 0)
+    async with AsyncExitStack() as stack:
+        if session is None:
+            session = await stack.enter_async_context(
+                create_lastfm_session(
+                    settings=HttpSettings(pool_size=concurrency),
+                    connection_stats=context.connections,
+                )
+            )
+        processor = FileProcessor(
+            session=session,
+            semaphore=asyncio.Semaphore(concurrency),
+            quiet_mode=True,
+            dry_run=dry_run,
+            context=context,
+            manifest=manifest,
+            fill_missing_only=fill_missing_only,
+            writer=writer,
+            padding=padding,
+            metrics=metrics,
+            report=report,
+        )
+        pending = _aiter_paths(paths)
+        exhausted = False
+        running: set[asyncio.Task[ProcessOutcome]] = set()
+        try:
+            while True:
+                while not exhausted and len(running) < limit:
+                    path = await anext(pending, None)
+                    if path is None:
+                        exhausted = True
+                    else:
+                        running.add(
+                            asyncio.create_task(
+                                processor.handle(path, interactive_select=False)
+                            )
+                        )
+                if not running:
+                    break
+                done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
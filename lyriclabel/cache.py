@@ -0,0 +1,201 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from lyriclabel.logging_config import default_state_dir, get_logger
+
+_CACHE_FILENAME = "lastfm-cache.sqlite3"
+_EXCLUDED_PARAMS = frozenset({"api_key"})
+DEFAULT_CACHE_TTL_SECONDS = 30 * 24 * 60 * 60
+DEFAULT_NEGATIVE_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 500_000
+_FLUSH_BATCH_SIZE = 200
+
+logger = get_logger("cache")
+
+
+def default_cache_dir() -> Path:
+    return default_state_dir() / "cache"
+
+
+def cache_key(params: dict[str, str]) -> str:
+    """Build a stable cache key from request params, ignoring credentials."""
+    normalized = sorted(
+        (key, " ".join(str(value).split()).casefold())
+        for key, value in params.items()
+        if key not in _EXCLUDED_PARAMS
+    )
+    return json.dumps(normalized, ensure_ascii=False, separators=(",", ":"))
+
+
+class ResponseCache:
+    """SQLite-backed Last.fm response cache with separate hit/negative TTLs.
+
+    Reads use their own connection, so under WAL they never wait for a flush;
+    writes are buffered and committed in batches. ``put`` only buffers; when it
+    reports a full batch, async callers run ``flush`` in a worker thread so
+    commits and eviction stay off the loop.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path | None = None,
+        *,
+        ttl_seconds: float = DEFAULT_CACHE_TTL_SECONDS,
+        negative_ttl_seconds: float = DEFAULT_NEGATIVE_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        directory = Path(cache_dir).expanduser() if cache_dir else default_cache_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        self.path = directory / _CACHE_FILENAME
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._pending: dict[str, tuple[str, int, float]] = {}
+        # Entries taken by a flush still in progress; reads check them too.
+        self._flushing: dict[str, tuple[str, int, float]] = {}
+        self._flush_requested = False
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " payload TEXT NOT NULL,"
+            " negative INTEGER NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_expires_at ON responses (expires_at)"
+        )
+        self._conn.commit()
+        # Kept up to date by flush so eviction never needs a COUNT(*).
+        (self._rows,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        # Only used from the event loop by ``get``; the write lock does not cover it.
+        self._reader = sqlite3.connect(self.path, check_same_thread=False)
+
+    def get(self, params: dict[str, str]) -> dict[str, Any] | None:
+        key = cache_key(params)
+        row = self._pending.get(key) or self._flushing.get(key)
+        if row is None:
+            row = self._reader.execute(
+                "SELECT payload, negative, expires_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None or row[2] < time.time():
+            self.misses += 1
+            return None
+        if row[1]:
+            self.negative_hits += 1
+        else:
+            self.hits += 1
+        payload = json.loads(row[0])
+        return payload if isinstance(payload, dict) else None
+
+    def put(self, params: dict[str, str], payload: dict[str, Any], *, negative: bool) -> bool:
+        """Buffer a response; return True once a full batch is waiting for ``flush``."""
+        ttl = self.negative_ttl_seconds if negative else self.ttl_seconds
+        if ttl <= 0:
+            return False
+        self._pending[cache_key(params)] = (
+            json.dumps(payload, ensure_ascii=False, separators=(",", ":")),
+            int(negative),
+            time.time() + ttl,
+        )
+        self.stores += 1
+        # Ask for one flush at a time, not one per put while a flush is queued.
+        if self._flush_requested or len(self._pending) < _FLUSH_BATCH_SIZE:
+            return False
+        self._flush_requested = True
+        return True
+
+    def flush(self) -> None:
+        """Commit buffered writes and evict.
+
+        A failed commit (e.g. the database is locked by another ``--workers``
+        process) is logged, and the batch goes back into the buffer for the
+        next flush; callers never see the error.
+        """
+        with self._lock:
+            self._flush_requested = False
+            # Publish the batch as in flight before taking it, so reads never miss it.
+            self._flushing = self._pending
+            self._pending = {}
+            pending = self._flushing
+            try:
+                rows = self._rows + self._write(pending)
+                rows, evicted = self._evict(rows)
+                self._conn.commit()
+            except sqlite3.Error:
+                logger.warning(
+                    "cache flush failed",
+                    extra={"path": str(self.path), "entries": len(pending)},
+                    exc_info=True,
+                )
+                self._conn.rollback()
+                # Entries stored since the batch was taken are newer; keep them.
+                self._pending = {**pending, **self._pending}
+                return
+            finally:
+                self._flushing = {}
+            self._rows = rows
+            self.evictions += evicted
+
+    def _write(self, pending: dict[str, tuple[str, int, float]]) -> int:
+        """Store ``pending``; return how many rows were added."""
+        if not pending:
+            return 0
+        rows = [(key, *entry) for key, entry in pending.items()]
+        inserted = self._conn.executemany(
+            "INSERT OR IGNORE INTO responses (key, payload, negative, expires_at)"
+            " VALUES (?, ?, ?, ?)",
+            rows,
+        ).rowcount
+        if inserted < len(rows):
+            # Some keys were already stored (e.g. expired, not yet evicted).
+            self._conn.executemany(
+                "UPDATE responses SET payload = ?, negative = ?, expires_at = ?"
+                " WHERE key = ?",
+                [(*entry, key) for key, entry in pending.items()],
+            )
+        return inserted
+
+    def _evict(self, rows: int) -> tuple[int, int]:
+        """Purge expired entries and trim to ``max_entries``; return (rows, evicted)."""
+        rows -= self._conn.execute(
+            "DELETE FROM responses WHERE expires_at < ?", (time.time(),)
+        ).rowcount
+        overflow = rows - self.max_entries
+        if overflow <= 0:
+            return rows, 0
+        # Drop the entries closest to expiry first; they are the least valuable.
+        self._conn.execute(
+            "DELETE FROM responses WHERE key IN ("
+            " SELECT key FROM responses ORDER BY expires_at ASC LIMIT ?)",
+            (overflow,),
+        )
+        return rows - overflow, overflow
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self._conn.close()
+        self._reader.close()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "cache_hits": self.hits,
+            "cache_negative_hits": self.negative_hits,
+            "cache_misses": self.misses,
+            "cache_stores": self.stores,
+            "cache_evictions": self.evictions,
+        }
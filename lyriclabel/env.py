@@ -0,0 +1,23 @@
+import os
+
+DEFAULT_LASTFM_BASE_URL = "https://ws.audioscrobbler.com/2.0/"
+
+
+def load_environment() -> None:
+    """Read the project's ``.env`` file into ``os.environ``; variables already set win.
+
+    The CLI calls this once validation has passed. Importing lyriclabel never
+    reads ``.env``, so embedding applications stay in control of their environment.
+    """
+    # python-dotenv costs tens of milliseconds to import; only real runs pay it.
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+
+def lastfm_api_key() -> str | None:
+    return os.getenv("LASTFM_API_KEY")
+
+
+def lastfm_base_url() -> str:
+    return os.getenv("LASTFM_BASE_URL", DEFAULT_LASTFM_BASE_URL)
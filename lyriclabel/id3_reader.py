@@ -0,0 +1,122 @@
+import struct
+from typing import BinaryIO
+
+from mutagen.id3 import ID3TimeStamp
+
+_FIELD_BY_FRAME = {
+    "TIT2": "Title",
+    "TPE1": "Artist",
+    "TALB": "Album",
+    "TCON": "Genre",
+    "TDRC": "Year",
+    "TYER": "Year",
+}
+# v2.3 dates spread over these frames are merged into TDRC by mutagen.
+_V23_DATE_FRAMES = frozenset({b"TDAT", b"TIME", b"TRDA"})
+_TAG_FLAG_UNSYNC = 0x80
+_TAG_FLAG_EXTENDED = 0x40
+_V24_UNSUPPORTED_FRAME_FLAGS = 0x0E  # compression, encryption, unsynchronisation
+_V24_DATA_LENGTH_FLAG = 0x01
+_V23_UNSUPPORTED_FRAME_FLAGS = 0xE0  # compression, encryption, grouping
+_ENCODINGS = ("latin-1", "utf-16", "utf-16-be", "utf-8")
+
+
+class _Unsupported(Exception):
+    pass
+
+
+def _synchsafe(data: bytes) -> int:
+    if any(byte & 0x80 for byte in data):
+        raise _Unsupported("invalid synchsafe integer")
+    return (data[0] << 21) | (data[1] << 14) | (data[2] << 7) | data[3]
+
+
+def _decode_text(body: bytes) -> str | None:
+    if not body or body[0] >= len(_ENCODINGS):
+        raise _Unsupported("unknown text encoding")
+    encoding = _ENCODINGS[body[0]]
+    try:
+        text = body[1:].decode(encoding)
+    except UnicodeDecodeError as exc:
+        raise _Unsupported("undecodable text frame") from exc
+    # Multiple values are NUL-separated; like mutagen's ``frame.text[0]``, keep the first.
+    value = text.rstrip("\x00").split("\x00")[0].strip()
+    return value or None
+
+
+def _has_id3v1(fileobj: BinaryIO) -> bool:
+    try:
+        fileobj.seek(-128, 2)
+    except OSError:
+        return False
+    return fileobj.read(3) == b"TAG"
+
+
+def _read_frames(fileobj: BinaryIO) -> dict[str, str | None]:
+    header = fileobj.read(10)
+    fields: dict[str, str | None] = dict.fromkeys(
+        ("Title", "Artist", "Album", "Genre", "Year")
+    )
+    if len(header) < 10 or header[:3] != b"ID3":
+        if _has_id3v1(fileobj):
+            raise _Unsupported("ID3v1 tag present")
+        return fields
+
+    major = header[3]
+    flags = header[5]
+    if major not in (3, 4) or flags & (_TAG_FLAG_UNSYNC | _TAG_FLAG_EXTENDED):
+        raise _Unsupported("unsupported tag layout")
+    end = 10 + _synchsafe(header[6:10])
+
+    position = 10
+    while position + 10 <= end:
+        frame_header = fileobj.read(10)
+        if len(frame_header) < 10 or frame_header[0] == 0:
+            break  # padding or truncated tag
+        frame_id = frame_header[:4]
+        if not frame_id.isalnum():
+            raise _Unsupported("invalid frame id")
+        if major == 4:
+            size = _synchsafe(frame_header[4:8])
+            if frame_header[9] & _V24_UNSUPPORTED_FRAME_FLAGS:
+                raise _Unsupported("unsupported frame flags")
+        else:
+            (size,) = struct.unpack(">I", frame_header[4:8])
+            if frame_header[9] & _V23_UNSUPPORTED_FRAME_FLAGS:
+                raise _Unsupported("unsupported frame flags")
+            if frame_id in _V23_DATE_FRAMES:
+                raise _Unsupported("split v2.3 date frames")
+        position += 10 + size
+        if position > end:
+            raise _Unsupported("frame overruns tag")
+
+        field = _FIELD_BY_FRAME.get(frame_id.decode("ascii"))
+        if field is None or fields[field] is not None:
+            fileobj.seek(size, 1)
+            continue
+        body = fileobj.read(size)
+        if major == 4 and frame_header[9] & _V24_DATA_LENGTH_FLAG:
+            body = body[4:]
+        fields[field] = _decode_text(body)
+
+    if _has_id3v1(fileobj):
+        raise _Unsupported("ID3v1 tag present")
+    year = fields["Year"]
+    if year is not None:
+        # Match mutagen's timestamp normalisation so comparisons stay stable.
+        fields["Year"] = ID3TimeStamp(year).text.strip() or None
+    return fields
+
+
+def read_tag_fields(filepath: str) -> dict[str, str | None] | None:
+    """Read the managed ID3 fields by seeking frame headers, skipping artwork etc.
+
+    Handles plain ID3v2.3/2.4 tags only. Returns ``None`` for anything unusual
+    (unsynchronisation, compression, ID3v1 tails, split v2.3 dates) so callers
+    fall back to mutagen, which stays the reference parser.
+    """
+    try:
+        with open(filepath, "rb") as fileobj:
+            return _read_frames(fileobj)
+    except (_Unsupported, OSError, struct.error, ValueError):
+        return None
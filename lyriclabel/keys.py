@@ -0,0 +1,165 @@
+import asyncio
+import os
+import re
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+from lyriclabel.logging_config import get_logger
+
+# A key Last.fm rejects (invalid or suspended) is rarely fixed within a run.
+DEFAULT_REJECTED_PARK_SECONDS = 600.0
+_KEY_SEPARATORS = re.compile(r"[\s,]+")
+
+logger = get_logger("keys")
+
+
+def _split_keys(text: str) -> list[str]:
+    keys: list[str] = []
+    for line in text.splitlines():
+        line = line.split("#", 1)[0]
+        keys.extend(key for key in _KEY_SEPARATORS.split(line) if key)
+    return keys
+
+
+def load_api_keys(*, keys_file: str | None = None) -> list[str]:
+    """Collect Last.fm API keys, first source found wins.
+
+    Sources, in order: ``keys_file`` (one key per line, ``#`` comments),
+    ``LASTFM_API_KEYS`` (comma or whitespace separated), ``LASTFM_API_KEY``.
+    Duplicates are dropped, keeping the first occurrence.
+    """
+    if keys_file:
+        keys = _split_keys(Path(keys_file).expanduser().read_text(encoding="utf-8"))
+    elif os.getenv("LASTFM_API_KEYS"):
+        keys = _split_keys(os.environ["LASTFM_API_KEYS"])
+    else:
+        keys = _split_keys(os.getenv("LASTFM_API_KEY", ""))
+    return list(dict.fromkeys(keys))
+
+
+def mask_key(key: str) -> str:
+    return f"...{key[-4:]}" if len(key) > 8 else "..."
+
+
+@dataclass
+class _KeyState:
+    key: str
+    requests: int = 0
+    throttled: int = 0
+    rejected: int = 0
+    parked: int = 0
+    parked_until: float = 0.0
+    rejected_until: float = 0.0
+    tokens: float = 0.0
+    refilled_at: float = 0.0
+
+
+class KeyPool:
+    """Round-robin pool of Last.fm API keys with per-key rate accounting.
+
+    Each key has its own optional token bucket (``max_rps_per_key``). A key
+    that gets a 429 is parked for its ``Retry-After``; a key Last.fm rejects
+    is parked for ``rejected_park_seconds``, unless no other key could take
+    over. ``acquire`` hands out the next key that is neither parked nor out
+    of tokens, waiting only when every key is.
+    """
+
+    def __init__(
+        self,
+        keys: Sequence[str],
+        *,
+        max_rps_per_key: float | None = None,
+        rejected_park_seconds: float = DEFAULT_REJECTED_PARK_SECONDS,
+    ) -> None:
+        if not keys:
+            raise ValueError("KeyPool needs at least one API key")
+        self.max_rps_per_key = max_rps_per_key
+        self.rejected_park_seconds = rejected_park_seconds
+        self._capacity = max(1.0, max_rps_per_key) if max_rps_per_key else 0.0
+        now = time.monotonic()
+        self._states = [
+            _KeyState(key=key, tokens=self._capacity, refilled_at=now) for key in keys
+        ]
+        self._by_key = {state.key: state for state in self._states}
+        self._next = 0
+        self.wait_seconds = 0.0
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    async def acquire(self) -> str:
+        started = time.monotonic()
+        # The lock keeps key handout FIFO across waiting tasks.
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                ready_at = float("inf")
+                for offset in range(len(self._states)):
+                    index = (self._next + offset) % len(self._states)
+                    state = self._states[index]
+                    state_ready_at = self._ready_at(state, now)
+                    if state_ready_at <= now:
+                        if self.max_rps_per_key:
+                            state.tokens -= 1
+                        state.requests += 1
+                        self._next = index + 1
+                        self.wait_seconds += now - started
+                        return state.key
+                    ready_at = min(ready_at, state_ready_at)
+                await asyncio.sleep(ready_at - now)
+
+    def record_throttled(self, key: str, retry_after: float) -> None:
+        state = self._by_key[key]
+        state.throttled += 1
+        self._park(state, retry_after, reason="rate_limited")
+
+    def record_rejected(self, key: str) -> bool:
+        """Park a key Last.fm refused; False when it is the last usable key."""
+        state = self._by_key[key]
+        state.rejected += 1
+        now = time.monotonic()
+        if not any(
+            other.rejected_until <= now for other in self._states if other is not state
+        ):
+            return False
+        state.rejected_until = now + self.rejected_park_seconds
+        self._park(state, self.rejected_park_seconds, reason="rejected")
+        return True
+
+    def stats(self) -> dict[str, float]:
+        stats: dict[str, float] = {
+            "api_keys": len(self._states),
+            "api_key_wait_seconds": round(self.wait_seconds, 3),
+        }
+        for number, state in enumerate(self._states, start=1):
+            stats[f"api_key_{number}_requests"] = state.requests
+            stats[f"api_key_{number}_throttled"] = state.throttled
+            stats[f"api_key_{number}_rejected"] = state.rejected
+            stats[f"api_key_{number}_parked"] = state.parked
+        return stats
+
+    def _park(self, state: _KeyState, seconds: float, *, reason: str) -> None:
+        until = time.monotonic() + seconds
+        if until <= state.parked_until:
+            return
+        state.parked_until = until
+        state.parked += 1
+        logger.warning(
+            "api key parked",
+            extra={"api_key": mask_key(state.key), "reason": reason, "seconds": round(seconds, 3)},
+        )
+
+    def _ready_at(self, state: _KeyState, now: float) -> float:
+        ready_at = state.parked_until
+        if self.max_rps_per_key:
+            state.tokens = min(
+                self._capacity,
+                state.tokens + (now - state.refilled_at) * self.max_rps_per_key,
+            )
+            state.refilled_at = now
+            if state.tokens < 1:
+                ready_at = max(ready_at, now + (1 - state.tokens) / self.max_rps_per_key)
+        return ready_at
@@ -0,0 +1,215 @@
+import json
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional: pip install 'lyriclabel[fast]'
+    orjson = None  # type: ignore[assignment]
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+
+def loads(data: bytes) -> Any:
+    """Decode a JSON body with orjson when installed, else the stdlib."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@dataclass(frozen=True, slots=True)
+class TrackCandidate:
+    name: str
+    artist: str
+
+
+@dataclass(frozen=True, slots=True)
+class TrackInfo:
+    artist: str
+    album: str
+    name: str
+    genre: str
+    year: str
+
+
+@dataclass(frozen=True, slots=True)
+class AlbumTrack:
+    name: str
+    rank: int | None
+
+
+@dataclass(frozen=True, slots=True)
+class AlbumInfo:
+    artist: str
+    album: str
+    genre: str
+    year: str
+    tracks: tuple[AlbumTrack, ...]
+
+
+def _as_list(value: Any) -> list[dict[str, Any]]:
+    # Last.fm collapses single-element lists into a bare object.
+    if isinstance(value, dict):
+        return [value]
+    if isinstance(value, list):
+        return [item for item in value if isinstance(item, dict)]
+    return []
+
+
+def _get(value: Any, key: str) -> Any:
+    return value.get(key) if isinstance(value, dict) else None
+
+
+def _name(value: Any, key: str, default: str = "Unknown") -> str:
+    # Fields like ``artist`` are a string in search results, an object elsewhere.
+    if isinstance(value, dict):
+        return str(value.get(key) or default)
+    return str(value or default)
+
+
+def _first_tag(tags: Any) -> list[dict[str, Any]]:
+    return _as_list(_get(tags, "tag"))[:1]
+
+
+def _year_fields(details: dict[str, Any]) -> dict[str, Any]:
+    compact: dict[str, Any] = {}
+    if "release_date" in details:
+        compact["release_date"] = details["release_date"]
+    published = _get(details.get("wiki"), "published")
+    if published is not None:
+        compact["wiki"] = {"published": published}
+    return compact
+
+
+def _compact_search(payload: dict[str, Any]) -> dict[str, Any]:
+    tracks = _as_list(_get(_get(payload.get("results"), "trackmatches"), "track"))
+    return {
+        "results": {
+            "trackmatches": {
+                "track": [
+                    {"name": track.get("name"), "artist": track.get("artist")}
+                    for track in tracks
+                ]
+            }
+        }
+    }
+
+
+def _compact_track_info(payload: dict[str, Any]) -> dict[str, Any]:
+    details = payload.get("track")
+    if not isinstance(details, dict):
+        return {}
+    return {
+        "track": {
+            "name": details.get("name"),
+            "artist": {"name": _get(details.get("artist"), "name") or details.get("artist")},
+            "album": {"title": _get(details.get("album"), "title") or details.get("album")},
+            "toptags": {"tag": _first_tag(details.get("toptags"))},
+            **_year_fields(details),
+        }
+    }
+
+
+def _compact_album_info(payload: dict[str, Any]) -> dict[str, Any]:
+    details = payload.get("album")
+    if not isinstance(details, dict):
+        return {}
+    return {
+        "album": {
+            "name": details.get("name"),
+            "artist": details.get("artist"),
+            "tags": {"tag": _first_tag(details.get("tags"))},
+            "tracks": {
+                "track": [
+                    {"name": track.get("name"), "@attr": {"rank": _get(track.get("@attr"), "rank")}}
+                    for track in _as_list(_get(details.get("tracks"), "track"))
+                ]
+            },
+            **_year_fields(details),
+        }
+    }
+
+
+_COMPACTORS: dict[str, Callable[[dict[str, Any]], dict[str, Any]]] = {
+    "track.search": _compact_search,
+    "track.getInfo": _compact_track_info,
+    "album.getInfo": _compact_album_info,
+}
+
+
+def compact_payload(method: str, payload: dict[str, Any]) -> dict[str, Any]:
+    """Keep only the fields LyricLabel reads, in Last.fm's own shape.
+
+    Run right after decoding so wiki text, images and long tag lists are
+    released immediately and never reach the cache. Error payloads and
+    unknown methods pass through untouched.
+    """
+    compactor = _COMPACTORS.get(method)
+    if compactor is None or "error" in payload:
+        return payload
+    return compactor(payload)
+
+
+def parse_search(payload: dict[str, Any]) -> list[TrackCandidate]:
+    # Empty rather than "Unknown": candidates feed track.getInfo parameters.
+    tracks = _as_list(_get(_get(payload.get("results"), "trackmatches"), "track"))
+    return [
+        TrackCandidate(
+            name=_name(track.get("name"), "name", default=""),
+            artist=_name(track.get("artist"), "name", default=""),
+        )
+        for track in tracks
+    ]
+
+
+def _extract_year(details: dict[str, Any]) -> str:
+    release_date = str(details.get("release_date", "")).strip()
+    if len(release_date) >= 4 and release_date[:4].isdigit():
+        return release_date[:4]
+    published = str(_get(details.get("wiki"), "published") or "").strip()
+    if len(published) >= 4 and published[:4].isdigit():
+        return published[:4]
+    return "Unknown"
+
+
+def _extract_genre(details: dict[str, Any], tags_key: str = "toptags") -> str:
+    tags = _first_tag(details.get(tags_key))
+    if not tags:
+        return "Unknown"
+    return str(tags[0].get("name", "Unknown"))
+
+
+def parse_track_info(payload: dict[str, Any]) -> TrackInfo | None:
+    details = payload.get("track")
+    if not isinstance(details, dict):
+        return None
+    return TrackInfo(
+        artist=_name(details.get("artist"), "name"),
+        album=_name(details.get("album"), "title"),
+        name=str(details.get("name") or "Unknown"),
+        genre=_extract_genre(details),
+        year=_extract_year(details),
+    )
+
+
+def parse_album_info(payload: dict[str, Any], *, artist: str, album: str) -> AlbumInfo | None:
+    details = payload.get("album")
+    if not isinstance(details, dict):
+        return None
+    tracks = []
+    for track in _as_list(_get(details.get("tracks"), "track")):
+        rank = _get(track.get("@attr"), "rank")
+        tracks.append(
+            AlbumTrack(
+                name=str(track.get("name", "")),
+                rank=int(rank) if str(rank).isdigit() else None,
+            )
+        )
+    return AlbumInfo(
+        artist=str(details.get("artist", artist) or artist),
+        album=str(details.get("name", album) or album),
+        genre=_extract_genre(details, tags_key="tags"),
+        year=_extract_year(details),
+        tracks=tuple(tracks),
+    )
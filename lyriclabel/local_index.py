@@ -0,0 +1,226 @@
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import time
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any
+
+from lyriclabel.logging_config import configure_logging, get_logger
+from lyriclabel.parser import ParsedFilename, search_key
+
+_SCHEMA_VERSION = 1
+_INSERT_BATCH_SIZE = 10_000
+# Catalog exports disagree on the title column name.
+_TITLE_ALIASES = ("title", "track", "name")
+
+logger = get_logger("local_index")
+
+
+def _build_key(value: str) -> str:
+    # Builds see millions of distinct values once each; keep them out of the memo.
+    return search_key(value, memoize=False)
+
+
+def _text(row: dict[str, Any], *names: str) -> str:
+    for name in names:
+        value = row.get(name)
+        if value not in (None, ""):
+            return str(value).strip()
+    return ""
+
+
+def _read_rows(source: Path) -> Iterator[dict[str, Any]]:
+    with source.open(encoding="utf-8", newline="") as handle:
+        if source.suffix.lower() in (".jsonl", ".ndjson"):
+            for line_number, line in enumerate(handle, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(
+                        "skipping unreadable catalog line",
+                        extra={"source": str(source), "line": line_number},
+                    )
+                    continue
+                if isinstance(row, dict):
+                    yield {str(key).casefold(): value for key, value in row.items()}
+        else:
+            for csv_row in csv.DictReader(handle):
+                yield {key.strip().casefold(): value for key, value in csv_row.items() if key}
+
+
+def _index_rows(
+    rows: Iterable[dict[str, Any]], stats: dict[str, int]
+) -> Iterator[tuple[str, ...]]:
+    for row in rows:
+        artist = _text(row, "artist")
+        title = _text(row, *_TITLE_ALIASES)
+        if not artist or not title:
+            stats["skipped"] += 1
+            continue
+        stats["rows"] += 1
+        yield (
+            _build_key(title),
+            _build_key(artist),
+            artist,
+            title,
+            _text(row, "album") or "Unknown",
+            _text(row, "genre") or "Unknown",
+            _text(row, "year")[:4] or "Unknown",
+        )
+
+
+def build_index(sources: Iterable[str | Path], output: str | Path) -> dict[str, int]:
+    """Build a local index from CSV/JSONL catalog files; later rows win on duplicates.
+
+    The index is written next to ``output`` and renamed into place, so a
+    running tagger never sees a half-built file.
+    """
+    target = Path(output).expanduser()
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temporary = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    temporary.unlink(missing_ok=True)
+    stats = {"rows": 0, "skipped": 0}
+    conn = sqlite3.connect(temporary)
+    try:
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute(
+            "CREATE TABLE tracks ("
+            " title_key TEXT NOT NULL,"
+            " artist_key TEXT NOT NULL,"
+            " artist TEXT NOT NULL,"
+            " title TEXT NOT NULL,"
+            " album TEXT NOT NULL,"
+            " genre TEXT NOT NULL,"
+            " year TEXT NOT NULL,"
+            " PRIMARY KEY (title_key, artist_key)) WITHOUT ROWID"
+        )
+        conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        for source in sources:
+            rows = _index_rows(_read_rows(Path(source).expanduser()), stats)
+            while True:
+                batch = [row for _, row in zip(range(_INSERT_BATCH_SIZE), rows)]
+                if not batch:
+                    break
+                conn.executemany(
+                    "INSERT OR REPLACE INTO tracks VALUES (?, ?, ?, ?, ?, ?, ?)", batch
+                )
+        (stats["entries"],) = conn.execute("SELECT COUNT(*) FROM tracks").fetchone()
+        conn.executemany(
+            "INSERT INTO meta VALUES (?, ?)",
+            [
+                ("schema_version", str(_SCHEMA_VERSION)),
+                ("built_at", str(round(time.time(), 3))),
+                ("entries", str(stats["entries"])),
+            ],
+        )
+        conn.commit()
+        conn.execute("VACUUM")
+    except BaseException:
+        conn.close()
+        temporary.unlink(missing_ok=True)
+        raise
+    conn.close()
+    os.replace(temporary, target)
+    return stats
+
+
+class LocalIndex:
+    """Read-only artist/title -> metadata lookups against a built index file.
+
+    A filename with an artist is an exact ``(title, artist)`` primary-key
+    lookup. A title alone only counts as a hit when exactly one artist has
+    it; otherwise the file falls through to Last.fm.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path).expanduser().resolve()
+        if not self.path.is_file():
+            raise FileNotFoundError(f"local index not found: {self.path}")
+        self.hits = 0
+        self.misses = 0
+        self.ambiguous = 0
+        self._conn = sqlite3.connect(f"{self.path.as_uri()}?mode=ro", uri=True)
+        self._conn.execute("PRAGMA query_only=ON")
+        # Map the file instead of copying pages through SQLite's cache.
+        self._conn.execute("PRAGMA mmap_size=268435456")
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE key = 'schema_version'"
+        ).fetchone()
+        if row is None or int(row[0]) != _SCHEMA_VERSION:
+            self._conn.close()
+            raise ValueError(f"unsupported local index format: {self.path}")
+
+    def lookup(self, parsed: ParsedFilename) -> dict[str, str] | None:
+        title_key = parsed.search_title.casefold()
+        if parsed.artist:
+            rows = self._conn.execute(
+                "SELECT artist, title, album, genre, year FROM tracks"
+                " WHERE title_key = ? AND artist_key = ?",
+                (title_key, parsed.artist.casefold()),
+            ).fetchall()
+        else:
+            rows = self._conn.execute(
+                "SELECT artist, title, album, genre, year FROM tracks"
+                " WHERE title_key = ? LIMIT 2",
+                (title_key,),
+            ).fetchall()
+        if len(rows) != 1:
+            if rows:
+                self.ambiguous += 1
+            self.misses += 1
+            return None
+        self.hits += 1
+        artist, title, album, genre, year = rows[0]
+        return {"artist": artist, "album": album, "track": title, "genre": genre, "year": year}
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "local_index_hits": self.hits,
+            "local_index_misses": self.misses,
+            "local_index_ambiguous": self.ambiguous,
+        }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Build a LyricLabel local metadata index from catalog exports"
+    )
+    parser.add_argument(
+        "sources",
+        nargs="+",
+        help="CSV (header with artist,title,album,genre,year) or JSONL files",
+    )
+    parser.add_argument("--out", required=True, help="Path of the index file to write")
+    parser.add_argument("--quiet", action="store_true", help="Only log warnings and errors")
+    args = parser.parse_args()
+
+    configure_logging(quiet=args.quiet, log_file=None)
+    started = time.monotonic()
+    try:
+        stats = build_index(args.sources, args.out)
+    except (OSError, csv.Error, sqlite3.Error):
+        logger.error("local index build failed", extra={"out": args.out}, exc_info=True)
+        return 2
+    logger.info(
+        "local index built",
+        extra={
+            "out": args.out,
+            **stats,
+            "bytes": Path(args.out).expanduser().stat().st_size,
+            "seconds": round(time.monotonic() - started, 3),
+        },
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
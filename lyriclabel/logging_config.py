@@ -1,22 +1,39 @@
 import atexit
+import copy
 import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
 _LOGGER_NAMESPACE = "lyriclabel"
 _DEFAULT_LOG_FILENAME = "lyriclabel.log"
 _MAX_BYTES = 5 * 1024 * 1024
 _BACKUP_COUNT = 5
-_STANDARD_RECORD_KEYS = set(logging.makeLogRecord({}).__dict__.keys())
+_STANDARD_RECORD_KEYS = set(logging.makeLogRecord({}).__dict__.keys()) | {"message"}
+DEFAULT_LOG_QUEUE_SIZE = 10_000
+
+LogOverflowPolicy = Literal["block", "drop"]
+
+_listener: "_QueueListener | None" = None
+_queue_handler: "_BoundedQueueHandler | None" = None
+_forwarder: QueueListener | None = None
+
+# Embedded use (lyriclabel.api) never calls configure_logging: records then reach
+# the host application's handlers, and are not printed by logging's last resort.
+logging.getLogger(_LOGGER_NAMESPACE).addHandler(logging.NullHandler())
 
 
 class JsonFormatter(logging.Formatter):
     """Minimal JSON-lines formatter for file-based audit logs."""
 
     def format(self, record: logging.LogRecord) -> str:
+        # RotatingFileHandler formats each record twice (size check, then write).
+        cached: str | None = getattr(record, "_json_line", None)
+        if cached is not None:
+            return cached
         payload: dict[str, Any] = {
             "timestamp": self.formatTime(record, self.datefmt),
             "level": record.levelname,
@@ -32,14 +49,84 @@ class JsonFormatter(logging.Formatter):
             payload[key] = value
         if record.exc_info:
             payload["exc_info"] = self.formatException(record.exc_info)
-        return json.dumps(payload, ensure_ascii=False)
+        elif record.exc_text:
+            # Records forwarded from worker processes arrive with the traceback pre-rendered.
+            payload["exc_info"] = record.exc_text
+        line = json.dumps(payload, ensure_ascii=False)
+        record._json_line = line
+        return line
+
+
+class _BoundedQueueHandler(QueueHandler):
+    """Hands records to the listener thread; formatting and file I/O happen there.
+
+    When the queue is full, ``block`` waits for the listener to catch up and
+    ``drop`` discards the record (``ERROR`` and above always wait).
+    """
+
+    def __init__(self, log_queue: queue.Queue, *, overflow: LogOverflowPolicy) -> None:
+        super().__init__(log_queue)
+        self.log_queue = log_queue
+        self.overflow = overflow
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args now (they may be mutated later) but leave JSON formatting
+        # and exc_info rendering to the listener thread.
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.overflow == "block" or record.levelno >= logging.ERROR:
+            self.log_queue.put(record)
+            return
+        try:
+            self.log_queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
 
 
-def _default_log_dir() -> Path:
+class _WorkerQueueHandler(QueueHandler):
+    """Ships a ``--workers`` process's records to the parent, which writes them.
+
+    Records cross a process boundary, so tracebacks are rendered to text here
+    and each record is tagged with its worker number.
+    """
+
+    def __init__(self, log_queue: Any, *, worker: int) -> None:
+        super().__init__(log_queue)
+        self.worker = worker
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.worker = self.worker
+        return record
+
+
+class _QueueListener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # The base class uses put_nowait, which fails while the bounded queue is full.
+        self.queue.put(self._sentinel)  # type: ignore[attr-defined]
+
+
+def default_state_dir() -> Path:
     state_home = os.getenv("XDG_STATE_HOME")
     if state_home:
-        return Path(state_home) / "lyriclabel" / "logs"
-    return Path.home() / ".local" / "state" / "lyriclabel" / "logs"
+        return Path(state_home) / "lyriclabel"
+    return Path.home() / ".local" / "state" / "lyriclabel"
+
+
+def _default_log_dir() -> Path:
+    return default_state_dir() / "logs"
 
 
 def _resolve_log_path(log_file: str | None) -> Path:
@@ -54,17 +141,74 @@ def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(name)
 
 
+def shutdown_logging() -> None:
+    """Stop the listener thread after it has written every queued record."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def flush_logging() -> None:
+    """Block until the listener has handled everything queued so far."""
+    if _listener is not None and _queue_handler is not None:
+        _queue_handler.log_queue.join()
+
+
+def configure_worker_logging(log_queue: Any, *, worker: int, level: int) -> None:
+    """Send this worker process's ``lyriclabel`` logs to the parent over ``log_queue``."""
+    root = logging.getLogger(_LOGGER_NAMESPACE)
+    root.setLevel(level)
+    root.propagate = False
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(_WorkerQueueHandler(log_queue, worker=worker))
+
+
+def start_worker_log_forwarding(log_queue: Any) -> None:
+    """Feed records from worker processes into this process's log queue and handlers."""
+    global _forwarder
+    if _queue_handler is None:
+        raise RuntimeError("configure_logging() must be called before forwarding worker logs")
+    _forwarder = QueueListener(log_queue, _queue_handler)
+    _forwarder.start()
+
+
+def stop_worker_log_forwarding() -> None:
+    """Stop forwarding once every worker has exited and its records were handed over."""
+    global _forwarder
+    if _forwarder is not None:
+        _forwarder.stop()
+        _forwarder = None
+
+
+def logging_stats() -> dict[str, int]:
+    return {"log_records_dropped": _queue_handler.dropped if _queue_handler is not None else 0}
+
+
 def configure_logging(
     *,
     quiet: bool = False,
     log_file: str | None = None,
     file_level: int = logging.DEBUG,
+    queue_size: int = DEFAULT_LOG_QUEUE_SIZE,
+    overflow: LogOverflowPolicy = "block",
 ) -> Path:
+    """Route ``lyriclabel`` logs through a bounded queue to a listener thread.
+
+    Callers only copy the record onto the queue; JSON encoding and file writes
+    happen on the listener thread so they never stall the event loop.
+    """
+    global _listener, _queue_handler
     log_path = _resolve_log_path(log_file)
     log_path.parent.mkdir(parents=True, exist_ok=True)
+    console_level = logging.WARNING if quiet else logging.INFO
 
     root = logging.getLogger(_LOGGER_NAMESPACE)
-    root.setLevel(logging.DEBUG)
+    # Records below both handler levels are rejected before any work is done.
+    root.setLevel(min(file_level, console_level))
     root.propagate = False
 
     # Reset handlers so repeated setup in tests/interactive sessions stays deterministic.
@@ -74,6 +218,7 @@ def configure_logging(
             handler.close()
         except Exception:
             pass
+    shutdown_logging()
 
     file_handler = RotatingFileHandler(
         log_path,
@@ -86,7 +231,7 @@ def configure_logging(
     file_handler.setFormatter(JsonFormatter(datefmt="%Y-%m-%dT%H:%M:%S"))
 
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.WARNING if quiet else logging.INFO)
+    console_handler.setLevel(console_level)
     console_handler.setFormatter(
         logging.Formatter(
             fmt="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
@@ -94,9 +239,16 @@ def configure_logging(
         )
     )
 
-    root.addHandler(file_handler)
-    root.addHandler(console_handler)
+    _queue_handler = _BoundedQueueHandler(queue.Queue(maxsize=queue_size), overflow=overflow)
+    _listener = _QueueListener(
+        _queue_handler.log_queue,
+        file_handler,
+        console_handler,
+        respect_handler_level=True,
+    )
+    _listener.start()
+    root.addHandler(_queue_handler)
 
-    atexit.register(logging.shutdown)
+    atexit.register(shutdown_logging)
     root.debug("logging configured", extra={"log_path": str(log_path)})
     return log_path
@@ -1,89 +1,77 @@
 import asyncio
 import argparse
+import logging
 import os
+import signal
+import sqlite3
+import sys
 from collections import Counter
-from dataclasses import dataclass
+from collections.abc import Iterator
+from typing import TYPE_CHECKING, Any
 
-from lyriclabel.logging_config import configure_logging, get_logger
-from lyriclabel.meta_edit import edit_metadata
-from lyriclabel.meta_fetcher import create_lastfm_session, fetch_metadata_from_lastfm_async
-from lyriclabel.parser import parse_filename
+from lyriclabel.cache import (
+    DEFAULT_CACHE_TTL_SECONDS,
+    DEFAULT_NEGATIVE_TTL_SECONDS,
+    ResponseCache,
+)
+from lyriclabel.env import load_environment
+from lyriclabel.keys import KeyPool, load_api_keys
+from lyriclabel.local_index import LocalIndex
+from lyriclabel.logging_config import (
+    DEFAULT_LOG_QUEUE_SIZE,
+    configure_logging,
+    get_logger,
+    logging_stats,
+)
+from lyriclabel.manifest import Manifest
+from lyriclabel.metrics import RunMetrics
+from lyriclabel.pipeline import DEFAULT_CONCURRENCY, DEFAULT_WRITE_WORKERS, StageStats, WriterPool
+from lyriclabel.ratelimit import RequestThrottle, SharedRateBudget
+from lyriclabel.report import RunReport, read_failed_paths
+from lyriclabel.scanner import (
+    DEFAULT_SCAN_THREADS,
+    LibraryScanner,
+    ScannedFile,
+    normalize_extensions,
+)
+from lyriclabel.sharding import Shard, ShardFilter
+from lyriclabel.transport import (
+    DEFAULT_CONNECT_TIMEOUT_SECONDS,
+    DEFAULT_DNS_TTL_SECONDS,
+    DEFAULT_KEEPALIVE_SECONDS,
+    DEFAULT_READ_TIMEOUT_SECONDS,
+    HttpSettings,
+)
+from lyriclabel.watch import (
+    DEFAULT_DEBOUNCE_SECONDS,
+    DEFAULT_MAX_PENDING,
+    DEFAULT_POLL_INTERVAL_SECONDS,
+    DirectoryWatcher,
+)
 
+# aiohttp, mutagen and multiprocessing are imported by the stages that use them,
+# so --help, argument errors and bad paths return without paying for them.
+if TYPE_CHECKING:
+    from lyriclabel.album import AlbumResolver
+    from lyriclabel.meta_fetcher import FetchContext
+    from lyriclabel.workers import PartitionResult
 
 logger = get_logger("main")
 
+# Paths buffered between the directory walker and the workers, per worker.
+_QUEUE_DEPTH_PER_WORKER = 4
 
-@dataclass(frozen=True)
-class ProcessOutcome:
-    status: str
-    file_path: str
-
-
-def _discover_mp3_files(path: str) -> list[str]:
-    file_paths: list[str] = []
-    for root, _, files in os.walk(path):
-        for filename in files:
-            if filename.lower().endswith(".mp3"):
-                file_paths.append(os.path.abspath(os.path.join(root, filename)))
-    # De-duplicate defensively to avoid double writes in odd directory structures.
-    return list(dict.fromkeys(file_paths))
-
-
-async def process_file(
-    filepath: str,
-    *,
-    quiet_mode: bool = False,
-    error_list: list[str] | None = None,
-    semaphore: asyncio.Semaphore,
-    interactive_select: bool = False,
-    session,
-    dry_run: bool = False,
-) -> ProcessOutcome:
-    """Process a single file: fetch metadata and update it."""
-    async with semaphore:
-        if not quiet_mode:
-            logger.info("processing file", extra={"file_path": filepath})
-
-        # Extract title from the filename (we only need the basename).
-        filename = os.path.basename(filepath)
-        parsed = parse_filename(filename)
-
-        if error_list is None:
-            error_list = []
-
-        metadata = await fetch_metadata_from_lastfm_async(
-            session,
-            parsed,
-            quiet_mode,
-            filename,
-            error_list,
-            interactive_select=interactive_select,
-        )
-
-        if metadata:
-            # Keep the display title from the filename while using cleaned search terms.
-            metadata["track"] = parsed.title
-            # Mutagen writes are blocking; run on a thread to avoid stalling the event loop.
-            write_result = await asyncio.to_thread(
-                edit_metadata,
-                filepath,
-                metadata,
-                dry_run=dry_run,
-            )
-            if write_result.status == "failed":
-                if write_result.message:
-                    error_list.append(f"{filepath}: {write_result.message}")
-                return ProcessOutcome(status="write_failed", file_path=filepath)
-            if write_result.status == "updated" and not quiet_mode:
-                logger.info("metadata updated", extra={"file_path": filepath})
-            if write_result.status == "skipped_dry_run" and not quiet_mode:
-                logger.info("dry-run write skipped", extra={"file_path": filepath})
-            return ProcessOutcome(status=write_result.status, file_path=filepath)
-
-        if not quiet_mode:
-            logger.warning("metadata unavailable", extra={"file_path": filepath})
-        return ProcessOutcome(status="metadata_unavailable", file_path=filepath)
 
+def _iter_path_batches(file_paths: list[str]) -> Iterator[list[ScannedFile]]:
+    """Group explicit paths by directory, dropping files that no longer exist."""
+    by_directory: dict[str, list[ScannedFile]] = {}
+    for file_path in file_paths:
+        scanned = ScannedFile.from_path(file_path)
+        if scanned is not None:
+            by_directory.setdefault(os.path.dirname(file_path), []).append(scanned)
+        else:
+            logger.warning("file no longer exists", extra={"file_path": file_path})
+    yield from by_directory.values()
 
 
 async def run_async(
@@ -92,71 +80,306 @@ async def run_async(
     quiet_mode: bool,
     concurrency: int,
     dry_run: bool,
-) -> tuple[int, list[str], Counter[str]]:
-    error_list: list[str] = []
+    context: "FetchContext | None" = None,
+    manifest: Manifest | None = None,
+    fill_missing_only: bool = False,
+    writer: WriterPool | None = None,
+    network_stage: StageStats | None = None,
+    padding: int | None = None,
+    album_resolver: "AlbumResolver | None" = None,
+    metrics: RunMetrics | None = None,
+    report: RunReport | None = None,
+    file_paths: list[str] | None = None,
+    http_settings: HttpSettings | None = None,
+    shard: ShardFilter | None = None,
+    batch_source: Iterator[list[ScannedFile]] | None = None,
+    scanner: LibraryScanner | None = None,
+) -> tuple[int, Counter[str]]:
+    """Process ``absolute_path``, or exactly ``file_paths`` when given (retry mode).
+
+    Directories are walked by ``scanner`` (default: MP3 files, no filters).
+    With ``shard``, directory and retry runs only process the files it owns.
+    With ``batch_source`` (a ``--workers`` process), the batches come from it
+    and ``absolute_path`` is only the run root.
+    """
+    from lyriclabel.meta_fetcher import create_lastfm_session
+    from lyriclabel.processing import FileProcessor
+
     semaphore = asyncio.Semaphore(concurrency)
     status_counts: Counter[str] = Counter()
 
-    async with create_lastfm_session() as session:
-        if os.path.isdir(absolute_path):
-            if not quiet_mode:
-                logger.info(
-                    "processing directory",
-                    extra={
-                        "path": absolute_path,
-                        "concurrency": concurrency,
-                        "dry_run": dry_run,
-                    },
-                )
+    async with create_lastfm_session(
+        settings=http_settings,
+        connection_stats=context.connections if context is not None else None,
+    ) as session:
+        processor = FileProcessor(
+            session=session,
+            semaphore=semaphore,
+            quiet_mode=quiet_mode,
+            dry_run=dry_run,
+            context=context,
+            manifest=manifest,
+            fill_missing_only=fill_missing_only,
+            writer=writer,
+            network_stage=network_stage,
+            padding=padding,
+            album_resolver=album_resolver,
+            metrics=metrics,
+            report=report,
+            status_counts=status_counts,
+        )
 
-            file_paths = _discover_mp3_files(absolute_path)
-            tasks = [
-                process_file(
-                    file_path,
-                    quiet_mode=quiet_mode,
-                    error_list=error_list,
-                    semaphore=semaphore,
-                    interactive_select=False,
-                    session=session,
-                    dry_run=dry_run,
-                )
-                for file_path in file_paths
-            ]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            for result in results:
-                if isinstance(result, BaseException):
-                    error_list.append(
-                        f"Unexpected async processing error: {type(result).__name__}: {result}"
-                    )
-                    logger.error(
-                        "unexpected async processing error",
-                        exc_info=(type(result), result, result.__traceback__),
+        if batch_source is not None:
+            batches = batch_source
+        elif file_paths is not None:
+            batches = _iter_path_batches(file_paths)
+        elif os.path.isdir(absolute_path):
+            batches = (scanner or LibraryScanner(absolute_path)).batches()
+        elif os.path.isfile(absolute_path):
+            await processor.handle(absolute_path, interactive_select=not quiet_mode)
+            return 0, status_counts
+        else:
+            logger.error(
+                f"The path '{absolute_path}' is not a valid file or directory.",
+                extra={"path": absolute_path},
+            )
+            return 2, status_counts
+        if shard is not None:
+            batches = shard.apply(batches)
+
+        if not quiet_mode:
+            logger.info(
+                "processing directory",
+                extra={
+                    "path": absolute_path,
+                    "concurrency": concurrency,
+                    "dry_run": dry_run,
+                    "shard": str(shard.shard) if shard is not None else None,
+                },
+            )
+
+        queue: asyncio.Queue[ScannedFile | None] = asyncio.Queue(
+            maxsize=concurrency * _QUEUE_DEPTH_PER_WORKER
+        )
+
+        async def produce() -> None:
+            while True:
+                # The walk is blocking I/O; advance it one directory at a time off-loop.
+                batch = await asyncio.to_thread(next, batches, None)
+                if batch is None:
+                    break
+                if album_resolver is not None:
+                    album_resolver.register([scanned.path for scanned in batch])
+                for scanned in batch:
+                    await queue.put(scanned)
+            for _ in range(worker_count):
+                await queue.put(None)
+
+        async def consume() -> None:
+            while (scanned := await queue.get()) is not None:
+                try:
+                    await processor.handle(
+                        scanned.path, interactive_select=False, signature=scanned.signature
                     )
-                    continue
-                status_counts[result.status] += 1
-            return 0, error_list, status_counts
+                except Exception:
+                    # Only bookkeeping (report/manifest) can fail here.
+                    status_counts["errors"] += 1
+                    logger.error("unexpected async processing error", exc_info=True)
+
+        # Extra workers beyond the network limit keep lookups flowing while
+        # earlier files wait on the writer pool.
+        worker_count = concurrency + (writer.capacity if writer is not None else 0)
+        workers = [asyncio.create_task(consume()) for _ in range(worker_count)]
+        try:
+            await produce()
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+        return 0, status_counts
+
+
+def _http_settings(args: argparse.Namespace) -> HttpSettings:
+    return HttpSettings(
+        pool_size=args.http_pool_size or args.concurrency,
+        connect_timeout=args.connect_timeout,
+        read_timeout=args.read_timeout,
+        dns_ttl=args.dns_ttl,
+        keepalive_timeout=args.keepalive_timeout,
+    )
+
+
+def _build_context(
+    args: argparse.Namespace,
+    *,
+    api_keys: list[str],
+    metrics: RunMetrics | None,
+    rate_budget: SharedRateBudget | None = None,
+    workers: int = 1,
+) -> "FetchContext":
+    from lyriclabel.meta_fetcher import FetchContext
+
+    context = FetchContext(
+        throttle=RequestThrottle(
+            max_concurrency=args.concurrency,
+            max_rps=args.max_rps,
+            adaptive=args.adaptive_concurrency,
+            budget=rate_budget,
+        ),
+        metrics=metrics,
+        local_index=LocalIndex(args.local_index) if args.local_index is not None else None,
+        offline=args.offline,
+    )
+    if api_keys:
+        context.keys = KeyPool(
+            api_keys,
+            max_rps_per_key=args.max_rps_per_key / workers if args.max_rps_per_key else None,
+        )
+        logger.debug("api keys loaded", extra={"api_keys": len(context.keys)})
+    if not args.no_cache:
+        context.cache = ResponseCache(
+            args.cache_dir,
+            ttl_seconds=args.cache_ttl,
+            negative_ttl_seconds=args.cache_negative_ttl,
+        )
+        logger.debug("response cache enabled", extra={"cache_path": str(context.cache.path)})
+    return context
+
+
+def _close_context(context: "FetchContext") -> None:
+    if context.cache is not None:
+        context.cache.close()
+    if context.local_index is not None:
+        context.local_index.close()
+
+
+def run_partition(
+    args: argparse.Namespace,
+    *,
+    absolute_path: str,
+    api_keys: list[str],
+    run_id: int,
+    resumed: bool,
+    file_paths: list[str] | None = None,
+    shard: ShardFilter | None = None,
+    batch_source: Iterator[list[ScannedFile]] | None = None,
+    scanner: LibraryScanner | None = None,
+    rate_budget: SharedRateBudget | None = None,
+    workers: int = 1,
+) -> "PartitionResult":
+    """Build the run-scoped state from ``args``, run one event loop and tear it down.
 
-        if os.path.isfile(absolute_path):
-            result = await process_file(
+    This is the whole run in a single process, or one worker's share of it
+    with ``--workers``; ``workers`` splits the per-key rate cap between them.
+    """
+    from lyriclabel.album import AlbumResolver
+    from lyriclabel.workers import PartitionResult
+
+    metrics = RunMetrics() if args.metrics_out else None
+    context = _build_context(
+        args, api_keys=api_keys, metrics=metrics, rate_budget=rate_budget, workers=workers
+    )
+    report = RunReport(args.report_out) if args.report_out else None
+    manifest = Manifest(args.manifest, incremental=args.incremental)
+    manifest.join_run(run_id, resumed=resumed)
+    writer = WriterPool(args.write_workers, metrics=metrics)
+    album_resolver = AlbumResolver() if args.album_mode else None
+    network_stage = StageStats("network")
+
+    try:
+        status_code, status_counts = asyncio.run(
+            run_async(
                 absolute_path,
-                quiet_mode=quiet_mode,
-                error_list=error_list,
-                semaphore=semaphore,
-                interactive_select=not quiet_mode,
-                session=session,
-                dry_run=dry_run,
+                quiet_mode=args.quiet,
+                concurrency=args.concurrency,
+                dry_run=args.dry_run,
+                context=context,
+                manifest=manifest,
+                fill_missing_only=args.fill_missing_only,
+                writer=writer,
+                network_stage=network_stage,
+                padding=args.tag_padding,
+                album_resolver=album_resolver,
+                metrics=metrics,
+                report=report,
+                file_paths=file_paths,
+                http_settings=_http_settings(args),
+                shard=shard,
+                batch_source=batch_source,
+                scanner=scanner,
             )
-            status_counts[result.status] += 1
-            return 0, error_list, status_counts
+        )
+    finally:
+        writer.close()
+        if report is not None:
+            report.close()
+        manifest.close()
+        _close_context(context)
 
-    return 2, [f"The path '{absolute_path}' is not a valid file or directory."], status_counts
+    return PartitionResult(
+        status_code=status_code,
+        status_counts=status_counts,
+        stats={
+            **context.stats(),
+            **manifest.stats(),
+            **network_stage.stats(),
+            **writer.stage.stats(),
+            **(album_resolver.stats() if album_resolver is not None else {}),
+            **(report.stats() if report is not None else {}),
+        },
+        metrics=metrics,
+    )
 
 
-def main() -> int:
-    parser = argparse.ArgumentParser(
-        description="LyricLabel: Fetch and edit song metadata."
-    )
-    parser.add_argument("path", help="Path to the song file or folder")
+def _build_parser(*, watch: bool = False) -> argparse.ArgumentParser:
+    """Options for a run, or for ``lyriclabel watch``, which leaves out the run-only ones."""
+    if watch:
+        parser = argparse.ArgumentParser(
+            prog="lyriclabel watch",
+            description="LyricLabel: tag MP3 files as they land in a directory.",
+        )
+        parser.add_argument("path", help="Directory to watch (recursively)")
+        parser.add_argument(
+            "--debounce",
+            type=float,
+            default=DEFAULT_DEBOUNCE_SECONDS,
+            help="Seconds a file must go unmodified before it is tagged "
+            f"(default: {DEFAULT_DEBOUNCE_SECONDS:g})",
+        )
+        parser.add_argument(
+            "--max-pending",
+            type=int,
+            default=DEFAULT_MAX_PENDING,
+            help="Changed files held for debouncing; past this, their directories are "
+            f"rescanned once things calm down (default: {DEFAULT_MAX_PENDING})",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=DEFAULT_POLL_INTERVAL_SECONDS,
+            help="Seconds between scans when inotify is unavailable "
+            f"(default: {DEFAULT_POLL_INTERVAL_SECONDS:g})",
+        )
+        parser.add_argument(
+            "--force-polling",
+            action="store_true",
+            help="Poll even where inotify is available (e.g. NFS/SMB mounts)",
+        )
+        parser.add_argument(
+            "--scan-existing",
+            action="store_true",
+            help="Also tag files already in the directory that the manifest has not seen",
+        )
+    else:
+        parser = argparse.ArgumentParser(
+            description="LyricLabel: Fetch and edit song metadata.",
+            epilog="Run 'lyriclabel watch DIR' to tag files as they arrive.",
+        )
+        parser.add_argument(
+            "path",
+            nargs="?",
+            help="Path to the song file or folder (optional with --retry-failed)",
+        )
     parser.add_argument(
         "--quiet",
         action="store_true",
@@ -165,62 +388,655 @@ def main() -> int:
     parser.add_argument(
         "--concurrency",
         type=int,
-        default=5,
-        help="Maximum number of files to process concurrently (default: 5)",
+        default=DEFAULT_CONCURRENCY,
+        help=f"Maximum number of files to process concurrently (default: {DEFAULT_CONCURRENCY})",
     )
     parser.add_argument(
         "--log-file",
         default=None,
         help="Optional path for the rotating log file (JSON lines)",
     )
+    parser.add_argument(
+        "--log-level",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        default="DEBUG",
+        help="Minimum level written to the log file (default: DEBUG)",
+    )
+    parser.add_argument(
+        "--log-queue-size",
+        type=int,
+        default=DEFAULT_LOG_QUEUE_SIZE,
+        help=f"Log records buffered for the log writer thread (default: {DEFAULT_LOG_QUEUE_SIZE})",
+    )
+    parser.add_argument(
+        "--log-overflow",
+        choices=["block", "drop"],
+        default="block",
+        help="When the log buffer is full, wait for it (block) or discard records below ERROR (drop)",
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
         help="Preview metadata changes without writing to files",
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Directory for the persistent Last.fm response cache",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable the persistent Last.fm response cache",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=DEFAULT_CACHE_TTL_SECONDS,
+        help="Seconds to keep successful Last.fm responses (default: 30 days)",
+    )
+    parser.add_argument(
+        "--cache-negative-ttl",
+        type=float,
+        default=DEFAULT_NEGATIVE_TTL_SECONDS,
+        help="Seconds to keep 'no match' Last.fm responses (default: 1 day)",
+    )
+    parser.add_argument(
+        "--max-rps",
+        type=float,
+        default=None,
+        help="Global cap on Last.fm requests per second (default: unlimited)",
+    )
+    parser.add_argument(
+        "--max-rps-per-key",
+        type=float,
+        default=None,
+        help="Cap on requests per second for each API key (default: unlimited)",
+    )
+    parser.add_argument(
+        "--api-keys-file",
+        default=os.getenv("LASTFM_API_KEYS_FILE"),
+        help="File with one Last.fm API key per line; requests rotate across them "
+        "(default: $LASTFM_API_KEYS_FILE, else $LASTFM_API_KEYS, else $LASTFM_API_KEY)",
+    )
+    parser.add_argument(
+        "--adaptive-concurrency",
+        action="store_true",
+        help="Grow in-flight requests while Last.fm is healthy; back off on 429/5xx",
+    )
+    parser.add_argument(
+        "--manifest",
+        default=None,
+        help="Path of the per-file manifest database",
+    )
+    parser.add_argument(
+        "--fill-missing-only",
+        action="store_true",
+        help="Only fill empty tag fields; never overwrite existing values",
+    )
+    parser.add_argument(
+        "--write-workers",
+        type=int,
+        default=DEFAULT_WRITE_WORKERS,
+        help=f"Threads dedicated to tag writes (default: {DEFAULT_WRITE_WORKERS})",
+    )
+    parser.add_argument(
+        "--tag-padding",
+        type=int,
+        default=None,
+        help="Reuse existing ID3 padding and reserve this many bytes when a full rewrite is unavoidable",
+    )
+    parser.add_argument(
+        "--local-index",
+        default=None,
+        help="Index built with lyriclabel-index; consulted before Last.fm",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Use only --local-index; never contact Last.fm",
+    )
+    parser.add_argument(
+        "--extensions",
+        default="mp3",
+        help="Comma-separated file extensions to pick up in directories (default: mp3)",
+    )
+    parser.add_argument(
+        "--include",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="Only process files whose path relative to the root matches; repeatable",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="Skip files and directories whose path relative to the root matches; repeatable",
+    )
+    parser.add_argument(
+        "--scan-threads",
+        type=int,
+        default=DEFAULT_SCAN_THREADS,
+        help=f"Threads listing directories in parallel (default: {DEFAULT_SCAN_THREADS})",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        default=None,
+        help="Write per-stage timing histograms here (JSON, or Prometheus textfile for *.prom)",
+    )
+    parser.add_argument(
+        "--http-pool-size",
+        type=int,
+        default=None,
+        help="Maximum open connections to Last.fm (default: --concurrency)",
+    )
+    parser.add_argument(
+        "--connect-timeout",
+        type=float,
+        default=DEFAULT_CONNECT_TIMEOUT_SECONDS,
+        help=f"Seconds allowed for TCP/TLS connection setup (default: {DEFAULT_CONNECT_TIMEOUT_SECONDS:g})",
+    )
+    parser.add_argument(
+        "--read-timeout",
+        type=float,
+        default=DEFAULT_READ_TIMEOUT_SECONDS,
+        help=f"Seconds allowed between response reads (default: {DEFAULT_READ_TIMEOUT_SECONDS:g})",
+    )
+    parser.add_argument(
+        "--dns-ttl",
+        type=int,
+        default=DEFAULT_DNS_TTL_SECONDS,
+        help=f"Seconds to cache DNS lookups (default: {DEFAULT_DNS_TTL_SECONDS})",
+    )
+    parser.add_argument(
+        "--keepalive-timeout",
+        type=float,
+        default=DEFAULT_KEEPALIVE_SECONDS,
+        help=f"Seconds an idle connection stays open for reuse (default: {DEFAULT_KEEPALIVE_SECONDS:g})",
+    )
+    parser.add_argument(
+        "--report-out",
+        default=None,
+        help="Append one JSON line per processed file (outcome and error details) to this file",
+    )
+    if not watch:
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Processes to spread a directory or retry run across, each with its own "
+            "--concurrency and HTTP session; --max-rps stays global (default: 1)",
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Skip files unchanged since a previous run finished them",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue the last interrupted run over the same path",
+        )
+        parser.add_argument(
+            "--album-mode",
+            action="store_true",
+            help="Resolve Artist/Album/ directories with one album.getInfo call per album",
+        )
+        parser.add_argument(
+            "--shard",
+            default=None,
+            metavar="K/N",
+            help="Process only shard K of N (1-based), split by a stable hash of the path "
+            "relative to the root; run one invocation per shard",
+        )
+        parser.add_argument(
+            "--retry-failed",
+            default=None,
+            metavar="REPORT",
+            help="Reprocess only files whose latest outcome in REPORT failed",
+        )
+    return parser
+
 
-    log_path = configure_logging(quiet=args.quiet, log_file=args.log_file)
+def _check_arguments(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    if args.log_queue_size < 1:
+        parser.error("--log-queue-size must be at least 1")
+
+    if args.offline and args.local_index is None:
+        parser.error("--offline requires --local-index")
+
+
+def _start_logging(args: argparse.Namespace) -> None:
+    log_path = configure_logging(
+        quiet=args.quiet,
+        log_file=args.log_file,
+        file_level=logging.getLevelName(args.log_level),
+        queue_size=args.log_queue_size,
+        overflow=args.log_overflow,
+    )
     logger.info(
         "lyriclabel start",
         extra={"log_path": str(log_path), "dry_run": args.dry_run},
     )
 
+
+def _check_options(args: argparse.Namespace) -> bool:
+    """Log the first invalid option value; normalizes ``args.extensions`` on success."""
     if args.concurrency < 1:
         logger.error("invalid concurrency value", extra={"value": args.concurrency})
+        return False
+
+    if args.scan_threads < 1:
+        logger.error("invalid scan-threads value", extra={"value": args.scan_threads})
+        return False
+
+    try:
+        args.extensions = normalize_extensions(args.extensions.split(","))
+    except ValueError:
+        logger.error("invalid extensions value", extra={"value": args.extensions})
+        return False
+
+    if args.write_workers < 1:
+        logger.error("invalid write-workers value", extra={"value": args.write_workers})
+        return False
+
+    if args.tag_padding is not None and args.tag_padding < 0:
+        logger.error("invalid tag-padding value", extra={"value": args.tag_padding})
+        return False
+
+    if args.max_rps is not None and args.max_rps <= 0:
+        logger.error("invalid max-rps value", extra={"value": args.max_rps})
+        return False
+
+    if args.max_rps_per_key is not None and args.max_rps_per_key <= 0:
+        logger.error("invalid max-rps-per-key value", extra={"value": args.max_rps_per_key})
+        return False
+
+    if args.http_pool_size is not None and args.http_pool_size < 1:
+        logger.error("invalid http-pool-size value", extra={"value": args.http_pool_size})
+        return False
+
+    for option in ("connect_timeout", "read_timeout", "dns_ttl", "keepalive_timeout"):
+        if getattr(args, option) <= 0:
+            logger.error(
+                f"invalid {option.replace('_', '-')} value",
+                extra={"value": getattr(args, option)},
+            )
+            return False
+    return True
+
+
+def _load_api_keys(args: argparse.Namespace) -> list[str] | None:
+    try:
+        return load_api_keys(keys_file=args.api_keys_file)
+    except OSError:
+        logger.error("cannot read api keys file", extra={"path": args.api_keys_file}, exc_info=True)
+        return None
+
+
+def _check_local_index(args: argparse.Namespace) -> bool:
+    if args.local_index is None:
+        return True
+    # Fail before any work; each partition opens its own read-only handle.
+    try:
+        LocalIndex(args.local_index).close()
+    except (OSError, ValueError, sqlite3.Error):
+        logger.error("cannot open local index", extra={"path": args.local_index}, exc_info=True)
+        return False
+    return True
+
+
+def _status_summary(status_counts: Counter[str]) -> dict[str, int]:
+    return {
+        "updated": status_counts.get("updated", 0),
+        "would_have_updated": status_counts.get("skipped_dry_run", 0),
+        "no_changes": status_counts.get("no_changes", 0),
+        "already_tagged": status_counts.get("already_tagged", 0),
+        "metadata_unavailable": status_counts.get("metadata_unavailable", 0),
+        "write_failed": status_counts.get("write_failed", 0),
+        "skipped_unchanged": status_counts.get("skipped_unchanged", 0),
+        "saves_in_place": status_counts.get("save_in_place", 0),
+        "saves_rewritten": status_counts.get("save_rewrite", 0),
+        "rewritten_bytes": status_counts.get("rewrite_bytes", 0),
+        "in_place_bytes": status_counts.get("in_place_bytes", 0),
+        "errors": status_counts.get("errors", 0),
+    }
+
+
+def _write_metrics(metrics: RunMetrics | None, path: str | None, summary: dict[str, Any]) -> None:
+    if metrics is None or path is None:
+        return
+    try:
+        metrics_path = metrics.write(path, summary)
+    except OSError:
+        logger.error("metrics report failed", extra={"path": path}, exc_info=True)
+    else:
+        logger.info("metrics report written", extra={"path": str(metrics_path)})
+
+
+async def watch_async(
+    watcher: DirectoryWatcher,
+    processor_options: dict[str, Any],
+    *,
+    concurrency: int,
+    http_settings: HttpSettings | None = None,
+    scan_existing: bool = False,
+) -> None:
+    """Tag the files ``watcher`` settles until SIGINT or SIGTERM.
+
+    One session, cache and throttle serve every event for the daemon's
+    lifetime. The queue to the workers is bounded, so when tagging falls
+    behind the watcher waits and events accumulate in its bounded debouncer.
+    """
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    from lyriclabel.meta_fetcher import create_lastfm_session
+    from lyriclabel.processing import FileProcessor
+
+    context: FetchContext | None = processor_options.get("context")
+    writer: WriterPool | None = processor_options.get("writer")
+    report: RunReport | None = processor_options.get("report")
+
+    try:
+        async with create_lastfm_session(
+            settings=http_settings,
+            connection_stats=context.connections if context is not None else None,
+        ) as session:
+            processor = FileProcessor(
+                session=session, semaphore=asyncio.Semaphore(concurrency), **processor_options
+            )
+            queue: asyncio.Queue[ScannedFile | None] = asyncio.Queue(
+                maxsize=concurrency * _QUEUE_DEPTH_PER_WORKER
+            )
+
+            async def consume() -> None:
+                while (scanned := await queue.get()) is not None:
+                    try:
+                        await processor.handle(
+                            scanned.path, interactive_select=False, signature=scanned.signature
+                        )
+                    except Exception:
+                        processor.status_counts["errors"] += 1
+                        logger.error("unexpected async processing error", exc_info=True)
+                    finally:
+                        watcher.finished(scanned.path)
+
+            worker_count = concurrency + (writer.capacity if writer is not None else 0)
+            workers = [asyncio.create_task(consume()) for _ in range(worker_count)]
+            try:
+                await watcher.run(
+                    queue.put,
+                    stop=stop,
+                    scan_existing=scan_existing,
+                    # Keep the report current for anyone tailing it.
+                    on_tick=report.flush if report is not None else None,
+                )
+                logger.info("watch stopping", extra={"queued": queue.qsize()})
+                # Files already queued are finished; pending events are dropped.
+                for _ in workers:
+                    await queue.put(None)
+                await asyncio.gather(*workers)
+            finally:
+                for worker in workers:
+                    worker.cancel()
+    finally:
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.remove_signal_handler(signum)
+
+
+def watch_main(argv: list[str]) -> int:
+    parser = _build_parser(watch=True)
+    args = parser.parse_args(argv)
+    _check_arguments(parser, args)
+    _start_logging(args)
+
+    if not _check_options(args):
+        return 2
+
+    if args.debounce < 0:
+        logger.error("invalid debounce value", extra={"value": args.debounce})
+        return 2
+
+    if args.max_pending < 1:
+        logger.error("invalid max-pending value", extra={"value": args.max_pending})
+        return 2
+
+    if args.poll_interval <= 0:
+        logger.error("invalid poll-interval value", extra={"value": args.poll_interval})
+        return 2
+
+    root = os.path.abspath(args.path)
+    if not os.path.isdir(root):
+        logger.error(f"The path '{root}' is not a directory.", extra={"path": root})
         return 2
 
-    absolute_path = os.path.abspath(args.path)
+    load_environment()
+    api_keys = _load_api_keys(args)
+    if api_keys is None or not _check_local_index(args):
+        return 2
+
+    metrics = RunMetrics() if args.metrics_out else None
+    context = _build_context(args, api_keys=api_keys, metrics=metrics)
+    report = RunReport(args.report_out) if args.report_out else None
+    # Always incremental: the manifest is how our own tag writes are told apart
+    # from new files, and how a restart skips what was already done.
+    manifest = Manifest(args.manifest, incremental=True)
+    writer = WriterPool(args.write_workers, metrics=metrics)
+    network_stage = StageStats("network")
+    scanner = LibraryScanner(
+        root,
+        extensions=args.extensions,
+        include=args.include,
+        exclude=args.exclude,
+        threads=args.scan_threads,
+    )
+    watcher = DirectoryWatcher(
+        scanner,
+        manifest=manifest,
+        debounce=args.debounce,
+        max_pending=args.max_pending,
+        poll_interval=args.poll_interval,
+        force_polling=args.force_polling,
+    )
+    status_counts: Counter[str] = Counter()
+
+    try:
+        manifest.begin_run(root)
+        asyncio.run(
+            watch_async(
+                watcher,
+                {
+                    "quiet_mode": args.quiet,
+                    "dry_run": args.dry_run,
+                    "context": context,
+                    "manifest": manifest,
+                    "fill_missing_only": args.fill_missing_only,
+                    "writer": writer,
+                    "network_stage": network_stage,
+                    "padding": args.tag_padding,
+                    "metrics": metrics,
+                    "report": report,
+                    "status_counts": status_counts,
+                },
+                concurrency=args.concurrency,
+                http_settings=_http_settings(args),
+                scan_existing=args.scan_existing,
+            )
+        )
+        manifest.finish_run()
+    finally:
+        writer.close()
+        if report is not None:
+            report.close()
+        manifest.close()
+        _close_context(context)
+
+    summary = {
+        "dry_run": args.dry_run,
+        **_status_summary(status_counts),
+        **context.stats(),
+        **manifest.stats(),
+        **network_stage.stats(),
+        **writer.stage.stats(),
+        **(report.stats() if report is not None else {}),
+        **watcher.stats(),
+        **scanner.stats(),
+        **logging_stats(),
+    }
+    logger.info("watch summary", extra=summary)
+    _write_metrics(metrics, args.metrics_out, summary)
+    logger.info("lyriclabel complete", extra={"errors": summary["errors"]})
+    return 0
+
 
-    status_code, error_list, status_counts = asyncio.run(
-        run_async(
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["watch"]:
+        return watch_main(argv[1:])
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+
+    if args.path is None and args.retry_failed is None:
+        parser.error("a path is required unless --retry-failed is given")
+
+    _check_arguments(parser, args)
+
+    shard: Shard | None = None
+    if args.shard is not None:
+        try:
+            shard = Shard.parse(args.shard)
+        except ValueError as exc:
+            parser.error(f"--shard: {exc}")
+        if args.retry_failed and args.path is None:
+            # Shard ownership is relative to the root, so every shard must agree on it.
+            parser.error("--shard with --retry-failed needs the library root as path")
+
+    _start_logging(args)
+
+    if not _check_options(args):
+        return 2
+
+    if args.workers < 1:
+        logger.error("invalid workers value", extra={"value": args.workers})
+        return 2
+
+    file_paths: list[str] | None = None
+    if args.retry_failed:
+        try:
+            file_paths = read_failed_paths(args.retry_failed)
+        except OSError:
+            logger.error(
+                "cannot read retry report", extra={"path": args.retry_failed}, exc_info=True
+            )
+            return 2
+        if args.path is not None:
+            # A path narrows the retry to failures beneath it.
+            root = os.path.abspath(args.path)
+            file_paths = [
+                file_path
+                for file_path in file_paths
+                if file_path == root or file_path.startswith(root.rstrip(os.sep) + os.sep)
+            ]
+        logger.info(
+            "retrying failed files",
+            extra={"report": args.retry_failed, "files": len(file_paths)},
+        )
+        absolute_path = (
+            os.path.abspath(args.path)
+            if args.path is not None
+            else os.path.commonpath(file_paths) if file_paths else os.getcwd()
+        )
+    else:
+        absolute_path = os.path.abspath(args.path)
+        # Checked here as well as in run_async, before anything slow is loaded.
+        if not os.path.isfile(absolute_path) and not os.path.isdir(absolute_path):
+            logger.error(
+                f"The path '{absolute_path}' is not a valid file or directory.",
+                extra={"path": absolute_path},
+            )
+            return 2
+    load_environment()
+    api_keys = _load_api_keys(args)
+    if api_keys is None or not _check_local_index(args):
+        return 2
+
+    # Album mode shards whole directories so each album is resolved by one shard.
+    shard_filter = (
+        ShardFilter(shard, root=absolute_path, by_directory=args.album_mode)
+        if shard is not None
+        else None
+    )
+    scanner = (
+        LibraryScanner(
             absolute_path,
-            quiet_mode=args.quiet,
-            concurrency=args.concurrency,
-            dry_run=args.dry_run,
+            extensions=args.extensions,
+            include=args.include,
+            exclude=args.exclude,
+            threads=args.scan_threads,
         )
+        if file_paths is None and os.path.isdir(absolute_path)
+        else None
     )
+    # Single files and invalid paths gain nothing from extra processes.
+    use_workers = args.workers > 1 and (file_paths is not None or scanner is not None)
+
+    manifest = Manifest(args.manifest, incremental=args.incremental)
+    try:
+        run_id = manifest.begin_run(absolute_path, resume=args.resume)
+        options: dict[str, Any] = {
+            "args": args,
+            "absolute_path": absolute_path,
+            "api_keys": api_keys,
+            "run_id": run_id,
+            "resumed": manifest.resumed,
+        }
+        if use_workers:
+            from lyriclabel.workers import run_workers
+
+            batches = (
+                scanner.batches() if scanner is not None else _iter_path_batches(file_paths or [])
+            )
+            result = run_workers(
+                run_partition,
+                {**options, "workers": args.workers},
+                workers=args.workers,
+                batches=shard_filter.apply(batches) if shard_filter is not None else batches,
+                max_rps=args.max_rps,
+            )
+        else:
+            result = run_partition(
+                **options, file_paths=file_paths, shard=shard_filter, scanner=scanner
+            )
+        if result.status_code == 0:
+            manifest.finish_run()
+    finally:
+        manifest.close()
+    status_code, status_counts, metrics = result.status_code, result.status_counts, result.metrics
 
     if status_code == 2:
-        logger.error(error_list[0])
         return 2
 
-    if error_list:
-        logger.warning("errors encountered during processing")
-        for error in error_list:
-            logger.error(error)
+    error_count = status_counts.get("errors", 0)
+    if error_count:
+        logger.warning(
+            "errors encountered during processing",
+            extra={"errors": error_count, "report": args.report_out},
+        )
 
-    logger.info(
-        "run summary",
-        extra={
-            "dry_run": args.dry_run,
-            "updated": status_counts.get("updated", 0),
-            "would_have_updated": status_counts.get("skipped_dry_run", 0),
-            "no_changes": status_counts.get("no_changes", 0),
-            "metadata_unavailable": status_counts.get("metadata_unavailable", 0),
-            "write_failed": status_counts.get("write_failed", 0),
-            "errors": len(error_list),
-        },
-    )
-    logger.info("lyriclabel complete", extra={"errors": len(error_list)})
+    summary = {
+        "dry_run": args.dry_run,
+        **_status_summary(status_counts),
+        "workers": args.workers if use_workers else 1,
+        **result.stats,
+        **(scanner.stats() if scanner is not None else {}),
+        **(shard_filter.stats() if shard_filter is not None else {}),
+        **logging_stats(),
+    }
+    logger.info("run summary", extra=summary)
+    _write_metrics(metrics, args.metrics_out, summary)
+    logger.info("lyriclabel complete", extra={"errors": error_count})
     return 0
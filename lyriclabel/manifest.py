@@ -0,0 +1,200 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Sequence
+from pathlib import Path
+
+from lyriclabel.logging_config import default_state_dir, get_logger
+from lyriclabel.report import FileError
+
+_MANIFEST_FILENAME = "manifest.sqlite3"
+_FLUSH_BATCH_SIZE = 500
+# Outcomes that need no further work while the file stays unchanged on disk.
+TERMINAL_STATUSES = frozenset({"updated", "no_changes", "already_tagged", "no_match"})
+# Lookup stages whose plain (non-exception) errors mean Last.fm answered without a match.
+_NO_MATCH_STAGES = frozenset({"search", "getinfo"})
+
+logger = get_logger("manifest")
+
+
+def default_manifest_path() -> Path:
+    return default_state_dir() / _MANIFEST_FILENAME
+
+
+def _manifest_status(status: str, errors: Sequence[FileError]) -> str:
+    # Only a clean "not found" (Last.fm error 6 or an empty search, which carry no
+    # error_class) is final; timeouts, exhausted retries, 429/5xx, other Last.fm
+    # error codes, a missing key or an offline index miss leave the file retryable.
+    if status == "metadata_unavailable" and errors and all(
+        error.error_class is None and error.stage in _NO_MATCH_STAGES for error in errors
+    ):
+        return "no_match"
+    return status
+
+
+def _file_signature(filepath: str) -> tuple[int, int, int] | None:
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+
+class Manifest:
+    """Per-file record of processed paths, used for incremental and resumed runs.
+
+    Entries are keyed by path and store size, mtime and inode as seen *after*
+    processing, so a file we just rewrote is still recognised as unchanged.
+    Writes are buffered and committed in batches.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        *,
+        incremental: bool = False,
+    ) -> None:
+        self.path = Path(path).expanduser() if path else default_manifest_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.incremental = incremental
+        self.run_id: int | None = None
+        self.resumed = False
+        self.recorded = 0
+        self._pending: list[tuple[str, int, int, int, str, str | None, int | None, float]] = []
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " root TEXT NOT NULL,"
+            " started_at REAL NOT NULL,"
+            " completed INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " inode INTEGER NOT NULL,"
+            " status TEXT NOT NULL,"
+            " metadata TEXT,"
+            " run_id INTEGER,"
+            " recorded_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def begin_run(self, root: str, *, resume: bool = False) -> int:
+        with self._lock:
+            row = None
+            if resume:
+                row = self._conn.execute(
+                    "SELECT id FROM runs WHERE root = ? AND completed = 0"
+                    " ORDER BY id DESC LIMIT 1",
+                    (root,),
+                ).fetchone()
+            if row is not None:
+                self.run_id = int(row[0])
+                self.resumed = True
+            else:
+                cursor = self._conn.execute(
+                    "INSERT INTO runs (root, started_at) VALUES (?, ?)",
+                    (root, time.time()),
+                )
+                self.run_id = cursor.lastrowid
+            self._conn.commit()
+        logger.info(
+            "manifest run started",
+            extra={"run_id": self.run_id, "resumed": self.resumed, "root": root},
+        )
+        return int(self.run_id or 0)
+
+    def join_run(self, run_id: int, *, resumed: bool) -> None:
+        """Record into a run another connection began (``--workers`` processes)."""
+        self.run_id = run_id
+        self.resumed = resumed
+
+    def should_skip(
+        self, filepath: str, *, signature: tuple[int, int, int] | None = None
+    ) -> bool:
+        """Return True when ``filepath`` is unchanged since it was last handled.
+
+        ``signature`` is ``(size, mtime_ns, inode)`` from a stat taken while
+        scanning; without it the file is stat-ed again.
+        """
+        if not self.incremental and not self.resumed:
+            return False
+        if signature is None:
+            signature = _file_signature(filepath)
+        if signature is None:
+            return False
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, inode, status, run_id FROM files WHERE path = ?",
+                (filepath,),
+            ).fetchone()
+        if row is None or tuple(row[:3]) != signature:
+            return False
+        return bool(
+            (self.incremental and row[3] in TERMINAL_STATUSES)
+            or (self.resumed and row[4] == self.run_id)
+        )
+
+    def record(
+        self,
+        filepath: str,
+        status: str,
+        metadata: dict[str, str] | None = None,
+        *,
+        errors: Sequence[FileError] = (),
+    ) -> None:
+        """Store ``status`` for ``filepath``; ``errors`` decide whether a miss is final."""
+        signature = _file_signature(filepath)
+        if signature is None:
+            return
+        entry = (
+            filepath,
+            *signature,
+            _manifest_status(status, errors),
+            json.dumps(metadata, ensure_ascii=False) if metadata else None,
+            self.run_id,
+            time.time(),
+        )
+        with self._lock:
+            self._pending.append(entry)
+            self.recorded += 1
+            should_flush = len(self._pending) >= _FLUSH_BATCH_SIZE
+        if should_flush:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if pending:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO files"
+                    " (path, size, mtime_ns, inode, status, metadata, run_id, recorded_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    pending,
+                )
+                self._conn.commit()
+
+    def finish_run(self) -> None:
+        self.flush()
+        with self._lock:
+            self._conn.execute("UPDATE runs SET completed = 1 WHERE id = ?", (self.run_id,))
+            self._conn.commit()
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        except sqlite3.Error:
+            logger.warning("manifest flush failed", extra={"path": str(self.path)}, exc_info=True)
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> dict[str, int]:
+        return {"manifest_recorded": self.recorded}
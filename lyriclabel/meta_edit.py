@@ -1,21 +1,31 @@
+import os
 from dataclasses import dataclass
 from typing import Literal
 
 from mutagen.mp3 import MP3
-from mutagen.id3 import ID3, TIT2, TPE1, TALB, TCON, TDRC
+from mutagen.id3 import ID3, BitPaddedInt, ID3NoHeaderError, TIT2, TPE1, TALB, TCON, TDRC
 import mutagen.mp3
+from mutagen import PaddingInfo
 
+from lyriclabel.id3_reader import read_tag_fields
 from lyriclabel.logging_config import get_logger
 
 
 logger = get_logger("editor")
 
+SaveMode = Literal["in_place", "rewrite"]
+
+# Values the fetcher writes when Last.fm has nothing better; treated as empty.
+_PLACEHOLDER_VALUES = frozenset({"unknown"})
+
 
 @dataclass(frozen=True)
 class MetadataWriteResult:
     status: Literal["updated", "skipped_dry_run", "no_changes", "failed"]
     planned_changes: dict[str, dict[str, str | None]]
     message: str | None = None
+    save_mode: SaveMode | None = None
+    bytes_written: int = 0
 
 
 def _normalize_value(value: str | None) -> str | None:
@@ -38,7 +48,7 @@ def _first_text_value(frame: object) -> str | None:
     return None
 
 
-def _extract_existing_tags(audio: MP3) -> dict[str, str | None]:
+def _extract_existing_tags(audio: MP3 | ID3) -> dict[str, str | None]:
     return {
         "Title": _first_text_value(audio.get("TIT2")),
         "Artist": _first_text_value(audio.get("TPE1")),
@@ -48,6 +58,33 @@ def _extract_existing_tags(audio: MP3) -> dict[str, str | None]:
     }
 
 
+def read_existing_tags(filepath: str) -> dict[str, str | None] | None:
+    """Read the managed ID3 fields without parsing MPEG frame data.
+
+    Returns ``None`` when the tag cannot be read, so callers fall back to the
+    full fetch-and-write path and its error reporting.
+    """
+    fields = read_tag_fields(filepath)
+    if fields is not None:
+        return fields
+    try:
+        tags = ID3(filepath)
+    except ID3NoHeaderError:
+        return {field: None for field in ("Title", "Artist", "Album", "Genre", "Year")}
+    except Exception:
+        logger.debug("pre-flight tag read failed", extra={"file_path": filepath}, exc_info=True)
+        return None
+    return _extract_existing_tags(tags)
+
+
+def missing_fields(existing: dict[str, str | None]) -> list[str]:
+    return [
+        field
+        for field, value in existing.items()
+        if value is None or value.casefold() in _PLACEHOLDER_VALUES
+    ]
+
+
 def _target_tags(metadata: dict[str, str]) -> dict[str, str | None]:
     return {
         "Title": _normalize_value(metadata.get("track")),
@@ -61,11 +98,16 @@ def _target_tags(metadata: dict[str, str]) -> dict[str, str | None]:
 def _planned_changes(
     existing: dict[str, str | None],
     target: dict[str, str | None],
+    *,
+    fill_missing_only: bool = False,
 ) -> dict[str, dict[str, str | None]]:
     changes: dict[str, dict[str, str | None]] = {}
+    fillable = set(missing_fields(existing)) if fill_missing_only else None
     for field, new_value in target.items():
         if new_value is None:
             continue
+        if fillable is not None and field not in fillable:
+            continue
         old_value = existing.get(field)
         if old_value != new_value:
             changes[field] = {"old": old_value, "new": new_value}
@@ -85,19 +127,64 @@ def _apply_target_tags(audio: MP3, target: dict[str, str | None]) -> None:
         audio["TDRC"] = TDRC(encoding=3, text=target["Year"])
 
 
+def _tag_size(filepath: str) -> int:
+    """Bytes taken by the ID3v2 tag at the start of ``filepath``: header, frames and padding."""
+    with open(filepath, "rb") as fileobj:
+        header = fileobj.read(10)
+    if len(header) < 10 or header[:3] != b"ID3":
+        return 0
+    footer = 10 if header[5] & 0x10 else 0
+    return 10 + BitPaddedInt(header[6:10]) + footer
+
+
+def _save_tags(audio: MP3, filepath: str, padding: int | None) -> tuple[SaveMode, int]:
+    """Save tags, preferring to reuse existing padding so the audio is not moved.
+
+    With ``padding`` set, any non-negative leftover padding is kept as-is (an
+    in-place write) and a forced rewrite reserves ``padding`` bytes so later
+    re-tags fit. Returns the save mode and the number of bytes written.
+    """
+    decisions: list[tuple[PaddingInfo, int]] = []
+
+    def choose(info: PaddingInfo) -> int:
+        if padding is None:
+            chosen = info.get_default_padding()
+        else:
+            chosen = info.padding if info.padding >= 0 else padding
+        decisions.append((info, chosen))
+        return chosen
+
+    audio.save(padding=choose)
+    if decisions:
+        info, chosen = decisions[-1]
+        # Mutagen writes in place only when the tag keeps its exact previous size;
+        # then only the tag itself is rewritten.
+        if info.padding >= 0 and chosen == info.padding:
+            return "in_place", _tag_size(filepath)
+    return "rewrite", os.path.getsize(filepath)
+
+
 def edit_metadata(
     filepath: str,
     metadata: dict[str, str],
     *,
     dry_run: bool = False,
+    fill_missing_only: bool = False,
+    padding: int | None = None,
 ) -> MetadataWriteResult:
     try:
-        # Open the MP3 file
-        audio = MP3(filepath, ID3=ID3)
+        audio: MP3 | None = None
+        # Dry runs never save, so the fast tag reader is enough when it can parse the file.
+        existing_tags = read_tag_fields(filepath) if dry_run else None
+        if existing_tags is None:
+            # Open the MP3 file
+            audio = MP3(filepath, ID3=ID3)
+            existing_tags = _extract_existing_tags(audio)
 
-        existing_tags = _extract_existing_tags(audio)
         target = _target_tags(metadata)
-        planned_changes = _planned_changes(existing_tags, target)
+        planned_changes = _planned_changes(
+            existing_tags, target, fill_missing_only=fill_missing_only
+        )
 
         if not planned_changes:
             logger.info("no metadata changes required", extra={"file_path": filepath})
@@ -107,9 +194,6 @@ def edit_metadata(
                 message="No metadata differences detected.",
             )
 
-        # Edit the ID3 tags
-        _apply_target_tags(audio, target)
-
         if dry_run:
             for field, delta in planned_changes.items():
                 logger.warning(
@@ -137,20 +221,31 @@ def edit_metadata(
                 message="Dry run enabled; no changes written.",
             )
 
+        if audio is None:
+            audio = MP3(filepath, ID3=ID3)
+        # Edit the ID3 tags; only planned fields so fill-missing mode keeps existing values.
+        _apply_target_tags(
+            audio, {field: delta["new"] for field, delta in planned_changes.items()}
+        )
+
         # Save changes
-        audio.save()
+        save_mode, bytes_written = _save_tags(audio, filepath, padding)
         logger.info(
             "metadata write complete",
             extra={
                 "file_path": filepath,
                 "dry_run": False,
                 "planned_changes": planned_changes,
+                "save_mode": save_mode,
+                "bytes_written": bytes_written,
             },
         )
         return MetadataWriteResult(
             status="updated",
             planned_changes=planned_changes,
             message="Metadata updated.",
+            save_mode=save_mode,
+            bytes_written=bytes_written,
         )
 
     except mutagen.mp3.HeaderNotFoundError:
@@ -1,47 +1,232 @@
 import asyncio
-import os
+import logging
 import random
+import time
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
-from typing import Any, cast
+from dataclasses import dataclass, field
+from typing import Any
 
 import aiohttp
-from dotenv import load_dotenv
 
-from lyriclabel.logging_config import get_logger
+from lyriclabel.cache import ResponseCache, cache_key
+from lyriclabel.env import lastfm_api_key, lastfm_base_url
+from lyriclabel.keys import KeyPool, mask_key
+from lyriclabel.lastfm_records import (
+    AlbumInfo,
+    TrackCandidate,
+    compact_payload,
+    loads,
+    parse_album_info,
+    parse_search,
+    parse_track_info,
+)
+from lyriclabel.local_index import LocalIndex
+from lyriclabel.logging_config import flush_logging, get_logger
+from lyriclabel.metrics import RunMetrics, timed
 from lyriclabel.parser import ParsedFilename
+from lyriclabel.ratelimit import RequestThrottle
+from lyriclabel.report import FileError
+from lyriclabel.transport import DEFAULT_TIMEOUT_SECONDS, ConnectionStats, HttpSettings
 
-load_dotenv()
-
-LASTFM_API_KEY = os.getenv("LASTFM_API_KEY")
-LASTFM_BASE_URL = "https://ws.audioscrobbler.com/2.0/"
 DEFAULT_USER_AGENT = "LyricLabel/0.1 (+https://codex.atlassian.net)"
-DEFAULT_TIMEOUT_SECONDS = 20
 DEFAULT_MAX_RETRIES = 4
+# Candidates shown for interactive selection; Last.fm defaults to 30 per page.
+SEARCH_RESULT_LIMIT = 10
+# HTTP statuses and Last.fm error codes (invalid key, suspended key) that
+# condemn the API key rather than the request.
+_REJECTED_KEY_STATUSES = frozenset({401, 403})
+_REJECTED_KEY_ERRORS = frozenset({10, 26})
+_RATE_LIMIT_ERROR = 29
+# Metric stage names for each Last.fm method, as seen by the waiting file.
+_STAGE_BY_METHOD = {
+    "track.search": "search",
+    "track.getInfo": "getinfo",
+    "album.getInfo": "album_info",
+}
 
 logger = get_logger("fetcher")
 
 
+class LastfmRequestError(Exception):
+    """A Last.fm request that still failed after all retries."""
+
+    def __init__(self, message: str, *, attempts: int) -> None:
+        super().__init__(message)
+        self.attempts = attempts
+
+
+@dataclass
+class FetchContext:
+    """Run-scoped state shared by every Last.fm request in a run."""
+
+    cache: ResponseCache | None = None
+    throttle: RequestThrottle | None = None
+    inflight: dict[str, asyncio.Future[dict[str, Any]]] = field(default_factory=dict)
+    deduplicated: int = 0
+    metrics: RunMetrics | None = None
+    connections: ConnectionStats = field(default_factory=ConnectionStats)
+    keys: KeyPool | None = None
+    local_index: LocalIndex | None = None
+    # Never go to the network; files missing from the local index are unavailable.
+    offline: bool = False
+
+    def stats(self) -> dict[str, float]:
+        stats: dict[str, float] = {
+            "requests_deduplicated": self.deduplicated,
+            **self.connections.stats(),
+        }
+        if self.cache is not None:
+            stats.update(self.cache.stats())
+        if self.throttle is not None:
+            stats.update(self.throttle.stats())
+        if self.keys is not None:
+            stats.update(self.keys.stats())
+        if self.local_index is not None:
+            stats.update(self.local_index.stats())
+        return stats
+
+
+def _has_api_key(context: FetchContext | None) -> bool:
+    return bool(lastfm_api_key()) or (context is not None and context.keys is not None)
+
+
 @asynccontextmanager
 async def create_lastfm_session(
     user_agent: str = DEFAULT_USER_AGENT,
-    timeout_seconds: int = DEFAULT_TIMEOUT_SECONDS,
+    timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+    *,
+    settings: HttpSettings | None = None,
+    connection_stats: ConnectionStats | None = None,
 ) -> AsyncIterator[aiohttp.ClientSession]:
-    timeout = aiohttp.ClientTimeout(total=timeout_seconds)
-    headers = {"User-Agent": user_agent}
-    async with aiohttp.ClientSession(timeout=timeout, headers=headers) as session:
+    if settings is None:
+        settings = HttpSettings(total_timeout=timeout_seconds)
+    headers = {"User-Agent": user_agent, "Accept-Encoding": "gzip, deflate"}
+    async with aiohttp.ClientSession(
+        connector=settings.connector(),
+        timeout=settings.timeout(),
+        headers=headers,
+        trace_configs=[connection_stats.trace_config()] if connection_stats else None,
+    ) as session:
         yield session
 
 
+def _lastfm_error_class(payload: dict[str, Any]) -> str | None:
+    """``FileError.error_class`` for a lookup that returned no result.
+
+    None means Last.fm answered "not found" (error 6, or no error at all), which
+    is final; any other error code is transient and names the code instead.
+    """
+    code = payload.get("error")
+    if code is None or code == 6:
+        return None
+    return f"LastfmError{code}"
+
+
+def _cacheable_as_negative(params: dict[str, str], payload: dict[str, Any]) -> bool | None:
+    """Classify a payload for caching: True for "not found", None when uncacheable."""
+    if "error" in payload:
+        # Last.fm error 6 is "not found"; anything else (bad key, rate limit) is transient.
+        return True if payload.get("error") == 6 else None
+    if params.get("method") == "track.search":
+        return not parse_search(payload)
+    return False
+
+
 async def _request_json(
     session: aiohttp.ClientSession,
     params: dict[str, str],
     *,
     max_retries: int = DEFAULT_MAX_RETRIES,
+    context: FetchContext | None = None,
+) -> dict[str, Any]:
+    if context is None:
+        return await _fetch_json(session, params, max_retries=max_retries)
+
+    method = params.get("method", "")
+    with timed(context.metrics, _STAGE_BY_METHOD.get(method, method)):
+        return await _shared_request(session, params, max_retries=max_retries, context=context)
+
+
+async def _shared_request(
+    session: aiohttp.ClientSession,
+    params: dict[str, str],
+    *,
+    max_retries: int,
+    context: FetchContext,
+) -> dict[str, Any]:
+    if context.cache is not None:
+        cached = context.cache.get(params)
+        if cached is not None:
+            return cached
+
+    # Single-flight: identical concurrent requests share one in-flight future.
+    key = cache_key(params)
+    shared = context.inflight.get(key)
+    if shared is None:
+        shared = asyncio.ensure_future(
+            _fetch_and_cache(session, params, max_retries=max_retries, context=context)
+        )
+        context.inflight[key] = shared
+        shared.add_done_callback(lambda _: context.inflight.pop(key, None))
+    else:
+        context.deduplicated += 1
+    # Shield so a cancelled waiter does not cancel the request for everyone else.
+    return await asyncio.shield(shared)
+
+
+async def _fetch_and_cache(
+    session: aiohttp.ClientSession,
+    params: dict[str, str],
+    *,
+    max_retries: int,
+    context: FetchContext,
+) -> dict[str, Any]:
+    payload = await _fetch_json(
+        session,
+        params,
+        max_retries=max_retries,
+        throttle=context.throttle,
+        metrics=context.metrics,
+        keys=context.keys,
+    )
+    if context.cache is not None:
+        negative = _cacheable_as_negative(params, payload)
+        if negative is not None and context.cache.put(params, payload, negative=negative):
+            await asyncio.to_thread(context.cache.flush)
+    return payload
+
+
+def _describe_error(exc: Exception) -> str:
+    if isinstance(exc, aiohttp.ClientResponseError):
+        # str() of a response error includes the request URL, and with it the API key.
+        return f"{type(exc).__name__}: HTTP {exc.status} {exc.message}"
+    return f"{type(exc).__name__}: {exc}"
+
+
+async def _fetch_json(
+    session: aiohttp.ClientSession,
+    params: dict[str, str],
+    *,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    throttle: RequestThrottle | None = None,
+    metrics: RunMetrics | None = None,
+    keys: KeyPool | None = None,
 ) -> dict[str, Any]:
     for attempt in range(max_retries + 1):
+        api_key = lastfm_api_key() or ""
+        if keys is not None or throttle is not None:
+            with timed(metrics, "ratelimit_wait"):
+                # Key first: waiting for a parked key must not hold a limiter slot.
+                if keys is not None:
+                    api_key = await keys.acquire()
+                if throttle is not None:
+                    await throttle.acquire()
+        started = time.monotonic()
         try:
-            async with session.get(LASTFM_BASE_URL, params=params) as response:
+            async with session.get(
+                lastfm_base_url(), params={**params, "api_key": api_key}
+            ) as response:
                 if response.status == 429 and attempt < max_retries:
                     retry_after = response.headers.get("Retry-After")
                     if retry_after is not None:
@@ -53,112 +238,173 @@ async def _request_json(
                         "lastfm rate limited, backing off",
                         extra={"attempt": attempt + 1, "sleep_seconds": sleep_seconds},
                     )
-                    await asyncio.sleep(sleep_seconds)
-                    continue
-
-                if response.status >= 500 and attempt < max_retries:
+                    sleep_seconds = _record_throttled(
+                        sleep_seconds, api_key=api_key, keys=keys, throttle=throttle
+                    )
+                elif response.status >= 500 and attempt < max_retries:
                     logger.warning(
                         "lastfm server error, retrying",
                         extra={"status": response.status, "attempt": attempt + 1},
                     )
-                    await asyncio.sleep((2 ** attempt) + random.uniform(0, 0.25))
-                    continue
-
-                response.raise_for_status()
-                payload = await response.json(content_type=None)
-                if not isinstance(payload, dict):
-                    raise ValueError("Unexpected non-dict JSON payload from Last.fm")
-                return cast(dict[str, Any], payload)
-        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                    sleep_seconds = (2 ** attempt) + random.uniform(0, 0.25)
+                    if throttle is not None:
+                        throttle.record_server_error()
+                elif (
+                    keys is not None
+                    and attempt < max_retries
+                    and response.status in _REJECTED_KEY_STATUSES
+                    and keys.record_rejected(api_key)
+                ):
+                    sleep_seconds = 0.0
+                else:
+                    response.raise_for_status()
+                    payload = loads(await response.read())
+                    if not isinstance(payload, dict):
+                        raise ValueError("Unexpected non-dict JSON payload from Last.fm")
+                    error_code = payload.get("error")
+                    if keys is not None and attempt < max_retries and error_code == _RATE_LIMIT_ERROR:
+                        logger.warning(
+                            "lastfm key rate limited",
+                            extra={"api_key": mask_key(api_key), "attempt": attempt + 1},
+                        )
+                        sleep_seconds = _record_throttled(
+                            (2 ** attempt) + random.uniform(0, 0.25),
+                            api_key=api_key,
+                            keys=keys,
+                            throttle=throttle,
+                        )
+                    elif (
+                        keys is not None
+                        and attempt < max_retries
+                        and error_code in _REJECTED_KEY_ERRORS
+                        and keys.record_rejected(api_key)
+                    ):
+                        sleep_seconds = 0.0
+                    else:
+                        if throttle is not None:
+                            throttle.record_success(time.monotonic() - started)
+                        # Drop wiki text, images and long tag lists before anything holds them.
+                        return compact_payload(params.get("method", ""), payload)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as exc:
             if attempt >= max_retries:
-                raise
+                raise LastfmRequestError(_describe_error(exc), attempts=attempt + 1) from exc
             logger.warning("request failed, retrying", extra={"attempt": attempt + 1})
-            await asyncio.sleep((2 ** attempt) + random.uniform(0, 0.25))
-
-    raise RuntimeError("Failed to get JSON response from Last.fm")
-
-
-def _coerce_tracks(search_data: dict) -> list[dict]:
-    tracks = search_data.get("results", {}).get("trackmatches", {}).get("track", [])
-    if isinstance(tracks, dict):
-        return [tracks]
-    if isinstance(tracks, list):
-        return [track for track in tracks if isinstance(track, dict)]
-    return []
+            sleep_seconds = (2 ** attempt) + random.uniform(0, 0.25)
+        finally:
+            # Never hold a limiter slot while backing off.
+            if throttle is not None:
+                throttle.release()
+        await asyncio.sleep(sleep_seconds)
 
+    raise LastfmRequestError("Failed to get JSON response from Last.fm", attempts=max_retries + 1)
 
-def _extract_year(track_details: dict) -> str:
-    release_date = str(track_details.get("release_date", "")).strip()
-    if len(release_date) >= 4 and release_date[:4].isdigit():
-        return release_date[:4]
 
-    published = str(track_details.get("wiki", {}).get("published", "")).strip()
-    if len(published) >= 4 and published[:4].isdigit():
-        return published[:4]
-    return "Unknown"
-
-
-def _extract_genre(track_details: dict) -> str:
-    tags = track_details.get("toptags", {}).get("tag", [])
-    if isinstance(tags, dict):
-        tags = [tags]
-    if not isinstance(tags, list) or not tags:
-        return "Unknown"
-    first_tag = tags[0]
-    if not isinstance(first_tag, dict):
-        return "Unknown"
-    return str(first_tag.get("name", "Unknown"))
+def _record_throttled(
+    sleep_seconds: float,
+    *,
+    api_key: str,
+    keys: KeyPool | None,
+    throttle: RequestThrottle | None,
+) -> float:
+    """Account for a rate limit and return how long this caller should sleep."""
+    if throttle is not None:
+        throttle.record_throttled(sleep_seconds, pause=keys is None)
+    if keys is None:
+        return sleep_seconds
+    # Only the throttled key is parked; acquire() moves to another key or waits for it.
+    keys.record_throttled(api_key, sleep_seconds)
+    return 0.0
 
 
 async def fetch_detailed_metadata_async(
     session: aiohttp.ClientSession,
-    track: dict,
+    track: TrackCandidate,
     filename: str | None = None,
-    error_list: list[str] | None = None,
+    error_list: list[FileError] | None = None,
     *,
     max_retries: int = DEFAULT_MAX_RETRIES,
+    context: FetchContext | None = None,
 ) -> dict | None:
     if error_list is None:
         error_list = []
 
     params = {
         "method": "track.getInfo",
-        "artist": str(track.get("artist", "")),
-        "track": str(track.get("name", "")),
-        "api_key": LASTFM_API_KEY or "",
+        "artist": track.artist,
+        "track": track.name,
         "format": "json",
     }
 
     try:
-        track_info_data = await _request_json(session, params, max_retries=max_retries)
+        track_info_data = await _request_json(
+            session, params, max_retries=max_retries, context=context
+        )
     except Exception as exc:
-        error_list.append(f"Error fetching detailed info for '{filename}': {exc}")
+        error_list.append(
+            FileError.from_exception(
+                "getinfo", f"Error fetching detailed info for '{filename}': {exc}", exc
+            )
+        )
         return None
 
-    track_details = track_info_data.get("track")
-    if not isinstance(track_details, dict):
-        error_list.append(f"Detailed info could not be fetched for {filename}")
+    info = parse_track_info(track_info_data)
+    if info is None:
+        error_list.append(
+            FileError(
+                "getinfo",
+                f"Detailed info could not be fetched for {filename}",
+                error_class=_lastfm_error_class(track_info_data),
+            )
+        )
         return None
 
-    artist_data = track_details.get("artist", {})
-    if isinstance(artist_data, dict):
-        artist_name = str(artist_data.get("name", "Unknown"))
-    else:
-        artist_name = str(artist_data or "Unknown")
+    return {
+        "artist": info.artist,
+        "album": info.album,
+        "track": info.name,
+        "genre": info.genre,
+        "year": info.year,
+    }
 
-    album_data = track_details.get("album", {})
-    if isinstance(album_data, dict):
-        album_title = str(album_data.get("title", "Unknown"))
-    else:
-        album_title = str(album_data or "Unknown")
 
-    return {
-        "artist": artist_name,
-        "album": album_title,
-        "track": str(track_details.get("name", "Unknown")),
-        "genre": _extract_genre(track_details),
-        "year": _extract_year(track_details),
+async def fetch_album_metadata_async(
+    session: aiohttp.ClientSession,
+    artist: str,
+    album: str,
+    *,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    context: FetchContext | None = None,
+) -> AlbumInfo | None:
+    """Resolve an album with one ``album.getInfo`` call.
+
+    Returns album-level fields plus the track list (name and rank), or
+    ``None`` when the album is unknown or the request fails.
+    """
+    if not _has_api_key(context) or (context is not None and context.offline):
+        return None
+
+    params = {
+        "method": "album.getInfo",
+        "artist": artist,
+        "album": album,
+        "format": "json",
     }
+    try:
+        album_data = await _request_json(
+            session, params, max_retries=max_retries, context=context
+        )
+    except Exception:
+        logger.warning(
+            "album lookup failed",
+            extra={"artist": artist, "album": album},
+            exc_info=True,
+        )
+        return None
+
+    info = parse_album_info(album_data, artist=artist, album=album)
+    if info is None:
+        logger.debug("album not found", extra={"artist": artist, "album": album})
+    return info
 
 
 async def fetch_metadata_from_lastfm_async(
@@ -166,17 +412,37 @@ async def fetch_metadata_from_lastfm_async(
     parsed: ParsedFilename,
     quiet_mode: bool = False,
     filename: str | None = None,
-    error_list: list[str] | None = None,
+    error_list: list[FileError] | None = None,
     *,
     interactive_select: bool = False,
     max_retries: int = DEFAULT_MAX_RETRIES,
+    context: FetchContext | None = None,
 ) -> dict | None:
     if error_list is None:
         error_list = []
 
-    if not LASTFM_API_KEY:
+    if context is not None and context.local_index is not None:
+        metadata = context.local_index.lookup(parsed)
+        if metadata is not None:
+            logger.debug("local index hit", extra={"raw_filename": parsed.raw_filename})
+            return metadata
+        if context.offline:
+            error_list.append(
+                FileError(
+                    "local_index",
+                    f"No local index entry for '{parsed.raw_filename}' (offline).",
+                )
+            )
+            return None
+
+    if not _has_api_key(context):
         logger.error("missing LASTFM_API_KEY")
-        error_list.append("LASTFM_API_KEY is missing. Add it to your .env file.")
+        error_list.append(
+            FileError(
+                "config",
+                "LASTFM_API_KEY is missing. Add it (or LASTFM_API_KEYS) to your .env file.",
+            )
+        )
         return None
 
     if not quiet_mode:
@@ -201,27 +467,39 @@ async def fetch_metadata_from_lastfm_async(
     params = {
         "method": "track.search",
         "track": parsed.search_title,
-        "api_key": LASTFM_API_KEY,
         "format": "json",
+        "limit": str(SEARCH_RESULT_LIMIT),
     }
     if parsed.artist:
         params["artist"] = parsed.artist
 
     try:
-        search_data = await _request_json(session, params, max_retries=max_retries)
+        search_data = await _request_json(
+            session, params, max_retries=max_retries, context=context
+        )
     except Exception as exc:
         logger.error(
             "network error during search",
             extra={"raw_filename": parsed.raw_filename},
             exc_info=True,
         )
-        error_list.append(f"Network error occurred for '{parsed.raw_filename}': {exc}")
+        error_list.append(
+            FileError.from_exception(
+                "search", f"Network error occurred for '{parsed.raw_filename}': {exc}", exc
+            )
+        )
         return None
 
-    tracks = _coerce_tracks(search_data)
+    tracks = parse_search(search_data)
     if not tracks:
         logger.warning("no track matches", extra={"raw_filename": parsed.raw_filename})
-        error_list.append(f"No matching tracks found for '{parsed.raw_filename}'.")
+        error_list.append(
+            FileError(
+                "search",
+                f"No matching tracks found for '{parsed.raw_filename}'.",
+                error_class=_lastfm_error_class(search_data),
+            )
+        )
         return None
 
     if not quiet_mode:
@@ -229,31 +507,38 @@ async def fetch_metadata_from_lastfm_async(
             "search results found",
             extra={"raw_filename": parsed.raw_filename, "result_count": len(tracks)},
         )
-        for i, track in enumerate(tracks[:10], start=1):
-            artist = track.get("artist", "Unknown")
-            name = track.get("name", "Unknown")
-            logger.debug(
-                "search result candidate",
-                extra={"index": i, "artist": artist, "track": name},
-            )
+        if logger.isEnabledFor(logging.DEBUG):
+            for i, track in enumerate(tracks[:SEARCH_RESULT_LIMIT], start=1):
+                logger.debug(
+                    "search result candidate",
+                    extra={"index": i, "artist": track.artist, "track": track.name},
+                )
 
     selected_track = tracks[0]
     if interactive_select and not quiet_mode:
+        # Let queued log lines reach the console before prompting.
+        flush_logging()
         try:
             choice = int(input("\nPlease select the track number (or 0 to cancel): "))
             if choice == 0:
                 logger.info("search cancelled by user", extra={"raw_filename": parsed.raw_filename})
-                error_list.append(f"Search cancelled for '{parsed.raw_filename}'.")
+                error_list.append(
+                    FileError("select", f"Search cancelled for '{parsed.raw_filename}'.")
+                )
                 return None
             if 1 <= choice <= len(tracks):
                 selected_track = tracks[choice - 1]
             else:
                 logger.warning("invalid search choice", extra={"raw_filename": parsed.raw_filename})
-                error_list.append(f"Invalid choice for '{parsed.raw_filename}'.")
+                error_list.append(
+                    FileError("select", f"Invalid choice for '{parsed.raw_filename}'.")
+                )
                 return None
         except ValueError:
             logger.warning("non-numeric search choice", extra={"raw_filename": parsed.raw_filename})
-            error_list.append(f"Invalid choice for '{parsed.raw_filename}'.")
+            error_list.append(
+                FileError("select", f"Invalid choice for '{parsed.raw_filename}'.")
+            )
             return None
 
     return await fetch_detailed_metadata_async(
@@ -262,4 +547,5 @@ async def fetch_metadata_from_lastfm_async(
         filename,
         error_list,
         max_retries=max_retries,
+        context=context,
     )
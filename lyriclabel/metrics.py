@@ -0,0 +1,163 @@
+import json
+import os
+import time
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+# Upper bounds in seconds, roughly log-spaced from a cached lookup to a stalled request.
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+_QUANTILES = (0.5, 0.95, 0.99)
+_METRIC_PREFIX = "lyriclabel"
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; quantiles are bucket upper-bound estimates."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        index = len(self.buckets)
+        for position, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                index = position
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def merge(self, other: "Histogram") -> None:
+        if other.buckets != self.buckets:
+            raise ValueError("cannot merge histograms with different buckets")
+        self.counts = [mine + theirs for mine, theirs in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def quantile(self, fraction: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        cumulative = 0
+        for position, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                bound = self.buckets[position] if position < len(self.buckets) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def cumulative(self) -> Iterator[tuple[str, int]]:
+        cumulative = 0
+        for position, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            bound = repr(self.buckets[position]) if position < len(self.buckets) else "+Inf"
+            yield bound, cumulative
+
+
+class RunMetrics:
+    """Per-stage latency histograms for one run.
+
+    Stages are recorded per file (``read_tags``, ``parse``, ``semaphore_wait``,
+    ``search``, ``getinfo``, ``ratelimit_wait``, ``write_wait``, ``write`` ...) so
+    a report shows whether time went to the network, the rate limiter or the disk.
+    """
+
+    def __init__(self) -> None:
+        self.started_at = time.time()
+        self._started = time.monotonic()
+        self.stages: dict[str, Histogram] = {}
+
+    def observe(self, stage: str, seconds: float) -> None:
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages[stage] = Histogram()
+        histogram.observe(seconds)
+
+    def merge(self, other: "RunMetrics") -> None:
+        """Fold in another partition's histograms (one per ``--workers`` process)."""
+        self.started_at = min(self.started_at, other.started_at)
+        for stage, histogram in other.stages.items():
+            target = self.stages.get(stage)
+            if target is None:
+                target = self.stages[stage] = Histogram(histogram.buckets)
+            target.merge(histogram)
+
+    def report(self, counters: Mapping[str, Any] | None = None) -> dict[str, Any]:
+        stages = {
+            stage: {
+                "count": histogram.count,
+                "sum_seconds": round(histogram.sum, 6),
+                "max_seconds": round(histogram.max, 6),
+                **{
+                    f"p{int(fraction * 100)}_seconds": round(histogram.quantile(fraction), 6)
+                    for fraction in _QUANTILES
+                },
+                "buckets": dict(histogram.cumulative()),
+            }
+            for stage, histogram in sorted(self.stages.items())
+        }
+        return {
+            "started_at": self.started_at,
+            "elapsed_seconds": round(time.monotonic() - self._started, 3),
+            "stages": stages,
+            "counters": dict(counters or {}),
+        }
+
+    def write(self, path: str | Path, counters: Mapping[str, Any] | None = None) -> Path:
+        """Write the report as JSON, or as a Prometheus textfile when ``path`` ends in ``.prom``."""
+        target = Path(path).expanduser()
+        target.parent.mkdir(parents=True, exist_ok=True)
+        report = self.report(counters)
+        if target.suffix == ".prom":
+            content = _prometheus_text(report, self.stages)
+        else:
+            content = json.dumps(report, ensure_ascii=False, indent=2) + "\n"
+        # Write-then-rename so textfile collectors never read a partial file.
+        temporary = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        temporary.write_text(content, encoding="utf-8")
+        os.replace(temporary, target)
+        return target
+
+
+def _prometheus_text(report: dict[str, Any], stages: dict[str, Histogram]) -> str:
+    name = f"{_METRIC_PREFIX}_stage_duration_seconds"
+    lines = [
+        f"# HELP {name} Time spent per file in each pipeline stage.",
+        f"# TYPE {name} histogram",
+    ]
+    for stage, histogram in sorted(stages.items()):
+        for bound, cumulative in histogram.cumulative():
+            lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.sum:.6f}')
+        lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+    for key, value in sorted(report["counters"].items()):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        metric = f"{_METRIC_PREFIX}_{key}"
+        lines.append(f"# TYPE {metric} gauge")
+        lines.append(f"{metric} {value}")
+    lines.append(f"# TYPE {_METRIC_PREFIX}_run_elapsed_seconds gauge")
+    lines.append(f"{_METRIC_PREFIX}_run_elapsed_seconds {report['elapsed_seconds']}")
+    return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def timed(metrics: RunMetrics | None, stage: str) -> Iterator[None]:
+    """Record the duration of the ``with`` block under ``stage``; no-op without metrics."""
+    if metrics is None:
+        yield
+        return
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        metrics.observe(stage, time.monotonic() - started)
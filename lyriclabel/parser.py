@@ -1,9 +1,16 @@
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
+from functools import lru_cache
 import re
 
 
 DELIMITER_PATTERN = re.compile(r"\s*[-_~|]\s*")
 TRACK_NUMBER_PATTERN = re.compile(r"^\s*(\d{1,3})(?:[.\-_\s]+)(.+)$")
+# A delimiter with whitespace around it, or one right before a non-digit, so
+# numbers such as "10.000 Maniacs", "20-20" or "4.0" are never cut apart.
+TRACK_INDEX_PATTERN = re.compile(
+    r"^(\d{1,3})(?:\s*[-_~|.]\s+|\s+[-_~|.]\s*|[-_~|.](?=\D))(.+)$"
+)
 WHITESPACE_PATTERN = re.compile(r"\s+")
 FEAT_PATTERN = re.compile(
     r"\s*[\[(]\s*(?:feat|ft)\.?\s+[^\])]+[\])]\s*",
@@ -11,6 +18,8 @@ FEAT_PATTERN = re.compile(
 )
 DOUBLE_MP3_PATTERN = re.compile(r"(?:\.mp3)+$", re.IGNORECASE)
 AND_PATTERN = re.compile(r"\b(and|&)\b", re.IGNORECASE)
+# Artist names repeat across a library; memoize their search normalization.
+_NORMALIZE_CACHE_SIZE = 65536
 
 
 @dataclass(frozen=True)
@@ -32,33 +41,57 @@ def _strip_mp3_extensions(filename: str) -> str:
     return stripped.strip()
 
 
-def _normalize_for_search(value: str) -> str:
+def _normalize(value: str) -> str:
     # Remove featuring segments that often reduce Last.fm search relevance.
     without_feat = FEAT_PATTERN.sub(" ", value)
     without_feat = _normalize_spaces(without_feat)
     return _normalize_spaces(AND_PATTERN.sub("and", without_feat))
 
 
-def _find_artist_title_split_candidates(stem: str) -> list[tuple[str, str]]:
-    candidates: list[tuple[str, str]] = []
-    for match in DELIMITER_PATTERN.finditer(stem):
-        left = _normalize_spaces(stem[: match.start()])
-        right = _normalize_spaces(stem[match.end() :])
-        if left and right:
-            candidates.append((left, right))
-    return candidates
+normalize_for_search = lru_cache(maxsize=_NORMALIZE_CACHE_SIZE)(_normalize)
 
 
-def _pick_best_candidate(candidates: list[tuple[str, str]]) -> tuple[str, str] | None:
-    if not candidates:
-        return None
+def search_key(value: str, *, memoize: bool = True) -> str:
+    """Casefolded search normalization, for matching titles and artists across sources.
+
+    Pass ``memoize=False`` for values seen once (index builds) so they do not
+    evict the names a tagging run is about to reuse.
+    """
+    return (normalize_for_search(value) if memoize else _normalize(value)).casefold()
+
+
+def _split_track_index(stem: str) -> tuple[str | None, str]:
+    """Split a leading track index off ``stem`` ("01 - Title", "3 - Artist - Title").
+
+    A bare number is only an index when it has a leading zero or more fields
+    follow it, so numeric artists ("311 - Amber") are left alone.
+    """
+    match = TRACK_INDEX_PATTERN.match(stem)
+    if match is None:
+        return None, stem
+    number, rest = match.groups()
+    if number.startswith("0") or DELIMITER_PATTERN.search(rest):
+        return number, rest
+    return None, stem
 
-    # Ranked heuristic: prefer balanced splits; preserve earliest split for ties.
-    ranked = sorted(
-        enumerate(candidates),
-        key=lambda item: (abs(len(item[1][0]) - len(item[1][1])), item[0]),
-    )
-    return ranked[0][1]
+
+def _best_artist_title_split(stem: str) -> tuple[str, str] | None:
+    """Pick the most balanced Artist/Title split in one pass; earliest wins ties.
+
+    ``stem`` must already be space-normalized, so stripping the halves is enough.
+    """
+    best: tuple[str, str] | None = None
+    best_score = -1
+    for match in DELIMITER_PATTERN.finditer(stem):
+        left = stem[: match.start()].strip()
+        right = stem[match.end() :].strip()
+        if not left or not right:
+            continue
+        score = abs(len(left) - len(right))
+        if best is None or score < best_score:
+            best = (left, right)
+            best_score = score
+    return best
 
 
 def parse_filename(filename: str) -> ParsedFilename:
@@ -66,16 +99,17 @@ def parse_filename(filename: str) -> ParsedFilename:
     stem = _strip_mp3_extensions(filename)
     stem = _normalize_spaces(stem)
 
-    # First, try the most common structured pattern: Artist - Title.
-    candidate = _pick_best_candidate(_find_artist_title_split_candidates(stem))
+    # First, try the most common structured pattern: [TrackNo -] Artist - Title.
+    track_no, rest = _split_track_index(stem)
+    candidate = _best_artist_title_split(rest)
     if candidate is not None:
         artist, title = candidate
         return ParsedFilename(
             raw_filename=raw,
             title=title,
-            search_title=_normalize_for_search(title),
-            artist=_normalize_for_search(artist),
-            track_no=None,
+            search_title=normalize_for_search(title),
+            artist=normalize_for_search(artist),
+            track_no=track_no,
             is_structured=True,
         )
 
@@ -87,7 +121,7 @@ def parse_filename(filename: str) -> ParsedFilename:
         return ParsedFilename(
             raw_filename=raw,
             title=title,
-            search_title=_normalize_for_search(title),
+            search_title=normalize_for_search(title),
             artist=None,
             track_no=track_no,
             is_structured=True,
@@ -97,8 +131,14 @@ def parse_filename(filename: str) -> ParsedFilename:
     return ParsedFilename(
         raw_filename=raw,
         title=stem,
-        search_title=_normalize_for_search(stem),
+        search_title=normalize_for_search(stem),
         artist=None,
         track_no=None,
         is_structured=False,
-    )
\ No newline at end of file
+    )
+
+
+def parse_filenames(filenames: Iterable[str]) -> Iterator[ParsedFilename]:
+    """Lazily parse many filenames, sharing the normalization memo across them."""
+    for filename in filenames:
+        yield parse_filename(filename)
@@ -0,0 +1,107 @@
+import asyncio
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from lyriclabel.logging_config import get_logger
+from lyriclabel.metrics import RunMetrics
+
+# Files processed at once (lookups in flight), unless the caller says otherwise.
+DEFAULT_CONCURRENCY = 5
+DEFAULT_WRITE_WORKERS = 2
+# Writes allowed to queue behind the busy writer threads, per writer thread.
+_WRITE_QUEUE_DEPTH_PER_WORKER = 4
+
+logger = get_logger("pipeline")
+
+T = TypeVar("T")
+
+
+class StageStats:
+    """Queue depth and wait time for one pipeline stage."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.depth = 0
+        self.max_depth = 0
+        self.completed = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.busy_seconds = 0.0
+
+    def enter(self) -> None:
+        self.depth += 1
+        self.max_depth = max(self.max_depth, self.depth)
+
+    def started(self, wait_seconds: float) -> None:
+        self.wait_seconds += wait_seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+
+    def exit(self, busy_seconds: float = 0.0) -> None:
+        self.depth -= 1
+        self.completed += 1
+        self.busy_seconds += busy_seconds
+
+    def stats(self) -> dict[str, float]:
+        return {
+            f"{self.name}_max_queue_depth": self.max_depth,
+            f"{self.name}_wait_seconds": round(self.wait_seconds, 3),
+            f"{self.name}_max_wait_seconds": round(self.max_wait_seconds, 3),
+            f"{self.name}_busy_seconds": round(self.busy_seconds, 3),
+        }
+
+
+def _timed_call(func: Callable[..., T], args: tuple, kwargs: dict[str, Any]) -> tuple[float, T]:
+    started = time.monotonic()
+    return started, func(*args, **kwargs)
+
+
+class WriterPool:
+    """Dedicated, bounded thread pool for blocking tag writes.
+
+    Disk writes are kept off the default executor and out of the network
+    semaphore, so a slow disk cannot stall HTTP work. At most ``capacity``
+    writes are queued or running; further callers wait for a slot. With
+    ``metrics`` each call records ``write_wait`` and ``write`` durations.
+    """
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WRITE_WORKERS,
+        *,
+        metrics: RunMetrics | None = None,
+    ) -> None:
+        self.workers = workers
+        self.metrics = metrics
+        self.capacity = workers * _WRITE_QUEUE_DEPTH_PER_WORKER
+        self.stage = StageStats("write")
+        self._slots = asyncio.Semaphore(self.capacity)
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="lyriclabel-writer",
+        )
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        queued_at = time.monotonic()
+        self.stage.enter()
+        try:
+            async with self._slots:
+                loop = asyncio.get_running_loop()
+                started_at, result = await loop.run_in_executor(
+                    self._executor, _timed_call, func, args, kwargs
+                )
+        except BaseException:
+            self.stage.exit()
+            raise
+        wait_seconds = started_at - queued_at
+        busy_seconds = time.monotonic() - started_at
+        self.stage.started(wait_seconds)
+        self.stage.exit(busy_seconds)
+        if self.metrics is not None:
+            self.metrics.observe("write_wait", wait_seconds)
+            self.metrics.observe("write", busy_seconds)
+        return result
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
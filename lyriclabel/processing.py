@@ -0,0 +1,253 @@
+import asyncio
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass, field, replace
+
+import aiohttp
+
+from lyriclabel.album import AlbumResolver
+from lyriclabel.logging_config import get_logger
+from lyriclabel.manifest import Manifest
+from lyriclabel.meta_edit import edit_metadata, missing_fields, read_existing_tags
+from lyriclabel.meta_fetcher import FetchContext, fetch_metadata_from_lastfm_async
+from lyriclabel.metrics import RunMetrics, timed
+from lyriclabel.parser import parse_filename
+from lyriclabel.pipeline import StageStats, WriterPool
+from lyriclabel.report import FileError, RunReport
+
+logger = get_logger("processing")
+
+
+@dataclass(frozen=True)
+class ProcessOutcome:
+    status: str
+    file_path: str
+    metadata: dict[str, str] | None = None
+    save_mode: str | None = None
+    bytes_written: int = 0
+    # Field -> {"old", "new"} as planned by the write (also set on dry runs).
+    planned_changes: dict[str, dict[str, str | None]] | None = None
+    errors: tuple[FileError, ...] = ()
+
+
+async def process_file(
+    filepath: str,
+    *,
+    quiet_mode: bool = False,
+    error_list: list[FileError] | None = None,
+    semaphore: asyncio.Semaphore,
+    interactive_select: bool = False,
+    session,
+    dry_run: bool = False,
+    context: FetchContext | None = None,
+    fill_missing_only: bool = False,
+    writer: WriterPool | None = None,
+    network_stage: StageStats | None = None,
+    padding: int | None = None,
+    album_resolver: AlbumResolver | None = None,
+    metrics: RunMetrics | None = None,
+) -> ProcessOutcome:
+    """Process a single file: fetch metadata and update it."""
+    if error_list is None:
+        error_list = []
+
+    if not quiet_mode:
+        logger.info("processing file", extra={"file_path": filepath})
+
+    # Pre-flight: when only empty fields may be written, files whose managed tags
+    # are all filled never need a lookup, so they are read before taking a network
+    # slot. Otherwise Last.fm may still correct them; a file the user picks a match
+    # for interactively is always looked up.
+    if fill_missing_only and not interactive_select:
+        with timed(metrics, "read_tags"):
+            existing_tags = await asyncio.to_thread(read_existing_tags, filepath)
+        if existing_tags is not None and not missing_fields(existing_tags):
+            logger.debug("tags already complete", extra={"file_path": filepath})
+            return ProcessOutcome(status="already_tagged", file_path=filepath)
+
+    if network_stage is not None:
+        network_stage.enter()
+    queued_at = time.monotonic()
+    async with semaphore:
+        semaphore_wait = time.monotonic() - queued_at
+        if network_stage is not None:
+            network_stage.started(semaphore_wait)
+        if metrics is not None:
+            metrics.observe("semaphore_wait", semaphore_wait)
+        started_at = time.monotonic()
+        try:
+            # Extract title from the filename (we only need the basename).
+            filename = os.path.basename(filepath)
+            with timed(metrics, "parse"):
+                parsed = parse_filename(filename)
+
+            metadata = None
+            if album_resolver is not None:
+                metadata = await album_resolver.resolve(
+                    session, filepath, parsed, context=context
+                )
+            if metadata is None:
+                metadata = await fetch_metadata_from_lastfm_async(
+                    session,
+                    parsed,
+                    quiet_mode,
+                    filename,
+                    error_list,
+                    interactive_select=interactive_select,
+                    context=context,
+                )
+        finally:
+            if network_stage is not None:
+                network_stage.exit(time.monotonic() - started_at)
+
+    # The network slot is released before writing so a slow disk cannot stall lookups.
+    if metadata:
+        # Keep the display title from the filename while using cleaned search terms.
+        metadata["track"] = parsed.title
+        if writer is not None:
+            write_result = await writer.run(
+                edit_metadata,
+                filepath,
+                metadata,
+                dry_run=dry_run,
+                fill_missing_only=fill_missing_only,
+                padding=padding,
+            )
+        else:
+            # Mutagen writes are blocking; run on a thread to avoid stalling the event loop.
+            with timed(metrics, "write"):
+                write_result = await asyncio.to_thread(
+                    edit_metadata,
+                    filepath,
+                    metadata,
+                    dry_run=dry_run,
+                    fill_missing_only=fill_missing_only,
+                    padding=padding,
+                )
+        if write_result.status == "failed":
+            if write_result.message:
+                error_list.append(FileError("write", f"{filepath}: {write_result.message}"))
+            return ProcessOutcome(
+                status="write_failed", file_path=filepath, metadata=metadata
+            )
+        if write_result.status == "updated" and not quiet_mode:
+            logger.info("metadata updated", extra={"file_path": filepath})
+        if write_result.status == "skipped_dry_run" and not quiet_mode:
+            logger.info("dry-run write skipped", extra={"file_path": filepath})
+        return ProcessOutcome(
+            status=write_result.status,
+            file_path=filepath,
+            metadata=metadata,
+            save_mode=write_result.save_mode,
+            bytes_written=write_result.bytes_written,
+            planned_changes=write_result.planned_changes,
+        )
+
+    if not quiet_mode:
+        logger.warning("metadata unavailable", extra={"file_path": filepath})
+    return ProcessOutcome(status="metadata_unavailable", file_path=filepath)
+
+
+@dataclass
+class FileProcessor:
+    """Runs ``process_file`` for one path and folds the outcome into the run's bookkeeping.
+
+    Holds everything a run shares across files (session, limits, manifest,
+    report, counters), so the directory pipeline, ``watch`` and ``tag_paths``
+    handle files the same way.
+    """
+
+    session: aiohttp.ClientSession
+    semaphore: asyncio.Semaphore
+    quiet_mode: bool
+    dry_run: bool
+    context: FetchContext | None = None
+    manifest: Manifest | None = None
+    fill_missing_only: bool = False
+    writer: WriterPool | None = None
+    network_stage: StageStats | None = None
+    padding: int | None = None
+    album_resolver: AlbumResolver | None = None
+    metrics: RunMetrics | None = None
+    report: RunReport | None = None
+    status_counts: Counter[str] = field(default_factory=Counter)
+
+    async def handle(
+        self,
+        file_path: str,
+        *,
+        interactive_select: bool,
+        signature: tuple[int, int, int] | None = None,
+    ) -> ProcessOutcome:
+        status_counts = self.status_counts
+        # Skip unchanged files before any parsing or network work.
+        if self.manifest is not None and await asyncio.to_thread(
+            self.manifest.should_skip, file_path, signature=signature
+        ):
+            status_counts["skipped_unchanged"] += 1
+            if self.report is not None:
+                self.report.record(file_path, "skipped_unchanged")
+            return ProcessOutcome(status="skipped_unchanged", file_path=file_path)
+        errors: list[FileError] = []
+        try:
+            with timed(self.metrics, "file"):
+                result = await process_file(
+                    file_path,
+                    quiet_mode=self.quiet_mode,
+                    error_list=errors,
+                    semaphore=self.semaphore,
+                    interactive_select=interactive_select,
+                    session=self.session,
+                    dry_run=self.dry_run,
+                    context=self.context,
+                    fill_missing_only=self.fill_missing_only,
+                    writer=self.writer,
+                    network_stage=self.network_stage,
+                    padding=self.padding,
+                    album_resolver=self.album_resolver,
+                    metrics=self.metrics,
+                )
+        except Exception as exc:
+            logger.error(
+                "unexpected async processing error",
+                extra={"file_path": file_path},
+                exc_info=True,
+            )
+            errors.append(
+                FileError.from_exception(
+                    "pipeline",
+                    f"Unexpected async processing error: {type(exc).__name__}: {exc}",
+                    exc,
+                )
+            )
+            result = ProcessOutcome(status="error", file_path=file_path)
+        # Errors are logged and reported as they happen instead of held until exit.
+        for error in errors:
+            logger.error(
+                error.message,
+                extra={
+                    "file_path": file_path,
+                    "stage": error.stage,
+                    "error_class": error.error_class,
+                    "attempts": error.attempts,
+                },
+            )
+        status_counts["errors"] += len(errors)
+        status_counts[result.status] += 1
+        if result.save_mode is not None:
+            status_counts[f"save_{result.save_mode}"] += 1
+            status_counts[f"{result.save_mode}_bytes"] += result.bytes_written
+        if self.report is not None:
+            self.report.record(
+                result.file_path, result.status, errors=errors, metadata=result.metadata
+            )
+        if self.manifest is not None:
+            await asyncio.to_thread(
+                self.manifest.record,
+                result.file_path,
+                result.status,
+                result.metadata,
+                errors=errors,
+            )
+        return replace(result, errors=tuple(errors)) if errors else result
@@ -0,0 +1,215 @@
+import asyncio
+import time
+from collections import deque
+from typing import TYPE_CHECKING
+
+from lyriclabel.logging_config import get_logger
+
+if TYPE_CHECKING:
+    from multiprocessing.context import BaseContext
+
+_INITIAL_ADAPTIVE_LIMIT = 2
+_LATENCY_EWMA_WEIGHT = 0.2
+# Latency above this multiple of the best observed EWMA counts as congestion.
+_LATENCY_TOLERANCE = 2.0
+_DECREASE_FACTOR = 0.5
+
+logger = get_logger("ratelimit")
+
+
+class SharedRateBudget:
+    """Token bucket and ``Retry-After`` pause shared by ``--workers`` processes.
+
+    The state is three doubles in shared memory (tokens, last refill, paused
+    until), read and updated under a process lock that is never held across
+    a sleep. ``time.monotonic`` is system-wide, so every process agrees on it.
+    """
+
+    def __init__(self, max_rps: float | None, *, mp_context: "BaseContext") -> None:
+        self.max_rps = max_rps
+        self._capacity = max(1.0, max_rps) if max_rps else 0.0
+        self._state = mp_context.Array("d", [self._capacity, time.monotonic(), 0.0], lock=False)
+        self._lock = mp_context.Lock()
+
+    async def wait(self) -> None:
+        while (delay := self._reserve()) > 0:
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._state[2] = max(self._state[2], time.monotonic() + seconds)
+
+    def _reserve(self) -> float:
+        """Take a token and return 0, or return how long to wait before retrying."""
+        with self._lock:
+            now = time.monotonic()
+            tokens, refilled_at, paused_until = (float(value) for value in self._state[:])
+            if paused_until > now:
+                return paused_until - now
+            if not self.max_rps:
+                return 0.0
+            tokens = min(self._capacity, tokens + (now - refilled_at) * self.max_rps)
+            self._state[1] = now
+            if tokens >= 1:
+                self._state[0] = tokens - 1
+                return 0.0
+            self._state[0] = tokens
+            return (1 - tokens) / self.max_rps
+
+
+class RequestThrottle:
+    """Shared token-bucket rate limit plus an AIMD in-flight request limit.
+
+    Every Last.fm request acquires a slot before going over the wire. With
+    ``adaptive`` enabled the slot limit grows by roughly one per round of
+    healthy responses and halves on 429/5xx, bounded by ``max_concurrency``.
+    A ``Retry-After`` pauses all callers, not just the one that saw it,
+    unless a key pool parks just the throttled key instead. With ``budget``
+    the rate and pauses are shared with other processes and ``max_rps`` is
+    taken from it.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int,
+        max_rps: float | None = None,
+        adaptive: bool = False,
+        budget: SharedRateBudget | None = None,
+    ) -> None:
+        if budget is not None:
+            max_rps = budget.max_rps
+        self.budget = budget
+        self.max_rps = max_rps
+        self.max_concurrency = max_concurrency
+        self.adaptive = adaptive
+        initial_limit = min(max_concurrency, _INITIAL_ADAPTIVE_LIMIT) if adaptive else max_concurrency
+        self.limit = float(initial_limit)
+        self.in_flight = 0
+        self.requests = 0
+        self.throttled = 0
+        self.server_errors = 0
+        self.decreases = 0
+        self.wait_seconds = 0.0
+        self.latency_ewma: float | None = None
+        self._baseline_latency: float | None = None
+        self._last_decrease = 0.0
+        self._capacity = max(1.0, max_rps) if max_rps else 0.0
+        self._tokens = self._capacity
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._token_lock = asyncio.Lock()
+        self._waiters: deque[asyncio.Future[None]] = deque()
+
+    async def acquire(self) -> None:
+        started = time.monotonic()
+        await self._acquire_slot()
+        try:
+            await self._wait_for_token()
+        except BaseException:
+            self.release()
+            raise
+        self.requests += 1
+        self.wait_seconds += time.monotonic() - started
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def record_success(self, latency: float) -> None:
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma += _LATENCY_EWMA_WEIGHT * (latency - self.latency_ewma)
+        if self._baseline_latency is None or self.latency_ewma < self._baseline_latency:
+            self._baseline_latency = self.latency_ewma
+
+        if not self.adaptive or self.limit >= self.max_concurrency:
+            return
+        if self.latency_ewma <= _LATENCY_TOLERANCE * self._baseline_latency:
+            self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+            self._wake()
+
+    def record_throttled(self, retry_after: float, *, pause: bool = True) -> None:
+        self.throttled += 1
+        if pause and self.budget is not None:
+            self.budget.pause(retry_after)
+        elif pause:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        self._decrease()
+
+    def record_server_error(self) -> None:
+        self.server_errors += 1
+        self._decrease()
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "limiter_max_rps": self.max_rps or 0,
+            "limiter_concurrency_limit": round(self.limit, 2),
+            "limiter_requests": self.requests,
+            "limiter_throttled": self.throttled,
+            "limiter_server_errors": self.server_errors,
+            "limiter_decreases": self.decreases,
+            "limiter_wait_seconds": round(self.wait_seconds, 3),
+        }
+
+    def _decrease(self) -> None:
+        if not self.adaptive:
+            return
+        now = time.monotonic()
+        # React at most once per latency window so one burst of 429s halves once.
+        if now - self._last_decrease < (self.latency_ewma or 1.0):
+            return
+        self._last_decrease = now
+        self.limit = max(1.0, self.limit * _DECREASE_FACTOR)
+        self.decreases += 1
+        logger.info(
+            "adaptive concurrency reduced",
+            extra={"concurrency_limit": round(self.limit, 2)},
+        )
+
+    async def _acquire_slot(self) -> None:
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before cancellation; give it back.
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    async def _wait_for_token(self) -> None:
+        # The lock keeps token handout FIFO across waiting tasks.
+        async with self._token_lock:
+            if self.budget is not None:
+                await self.budget.wait()
+                return
+            while True:
+                now = time.monotonic()
+                if self._paused_until > now:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                if not self.max_rps:
+                    return
+                self._tokens = min(
+                    self._capacity,
+                    self._tokens + (now - self._refilled_at) * self.max_rps,
+                )
+                self._refilled_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.max_rps)
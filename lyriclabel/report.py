@@ -0,0 +1,210 @@
+import argparse
+import json
+import os
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from lyriclabel.logging_config import configure_logging, get_logger
+
+# Outcomes worth another attempt with --retry-failed.
+RETRYABLE_STATUSES = frozenset({"metadata_unavailable", "write_failed", "error"})
+_FLUSH_INTERVAL_SECONDS = 1.0
+_BUFFER_BYTES = 64 * 1024
+
+logger = get_logger("report")
+
+
+@dataclass(frozen=True)
+class FileError:
+    """One failure while processing a file, kept structured for the run report."""
+
+    stage: str
+    message: str
+    error_class: str | None = None
+    attempts: int = 0
+
+    @classmethod
+    def from_exception(cls, stage: str, message: str, exc: BaseException) -> "FileError":
+        # Request errors wrap the transport exception; report the underlying class.
+        root = exc.__cause__ or exc
+        return cls(
+            stage=stage,
+            message=message,
+            error_class=type(root).__name__,
+            attempts=int(getattr(exc, "attempts", 1)),
+        )
+
+
+class RunReport:
+    """JSONL stream with one line per processed file, written as outcomes arrive.
+
+    The file is appended to, so a report can be retried and extended in place;
+    the latest line for a path wins. Lines are flushed at most once per second,
+    so an interrupted run loses at most the last second of outcomes. Each
+    flush is a single write to an ``O_APPEND`` descriptor, so ``--workers``
+    processes can share one report without interleaving lines.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.records = 0
+        self.failures = 0
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._pending: list[str] = []
+        self._pending_chars = 0
+        self._flushed_at = time.monotonic()
+
+    def record(
+        self,
+        file_path: str,
+        status: str,
+        *,
+        errors: list[FileError] | None = None,
+        metadata: dict[str, str] | None = None,
+    ) -> None:
+        entry: dict[str, Any] = {"path": file_path, "status": status, "time": round(time.time(), 3)}
+        if errors:
+            # The last error is the one that ended processing for this file.
+            error = errors[-1]
+            entry.update(
+                stage=error.stage,
+                error_class=error.error_class,
+                error=error.message,
+                attempts=error.attempts,
+            )
+        if metadata:
+            entry["metadata"] = metadata
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        self._pending.append(line)
+        self._pending_chars += len(line)
+        self.records += 1
+        if status in RETRYABLE_STATUSES:
+            self.failures += 1
+        if (
+            self._pending_chars >= _BUFFER_BYTES
+            or time.monotonic() - self._flushed_at >= _FLUSH_INTERVAL_SECONDS
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        data = "".join(self._pending).encode("utf-8")
+        self._pending.clear()
+        self._pending_chars = 0
+        self._flushed_at = time.monotonic()
+        while data:
+            data = data[os.write(self._fd, data):]
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            os.close(self._fd)
+
+    def stats(self) -> dict[str, int]:
+        return {"report_records": self.records, "report_failures": self.failures}
+
+
+def _iter_entries(path: str | Path) -> Iterator[dict[str, Any]]:
+    with Path(path).expanduser().open(encoding="utf-8") as report:
+        for line_number, line in enumerate(report, start=1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # A run killed mid-write can leave a truncated last line.
+                logger.warning(
+                    "skipping unreadable report line",
+                    extra={"report": str(path), "line": line_number},
+                )
+                continue
+            if isinstance(entry, dict) and isinstance(entry.get("path"), str):
+                yield entry
+
+
+def read_failed_paths(path: str | Path) -> list[str]:
+    """Return paths whose latest outcome in the report is a retryable failure."""
+    failed: dict[str, None] = {}
+    for entry in _iter_entries(path):
+        if entry.get("status") in RETRYABLE_STATUSES:
+            failed[entry["path"]] = None
+        else:
+            failed.pop(entry["path"], None)
+    return list(failed)
+
+
+def merge_reports(
+    paths: Iterable[str | Path], *, out: str | Path | None = None
+) -> dict[str, Any]:
+    """Combine several reports (e.g. one per shard) into one summary.
+
+    The latest entry per path wins, by its ``time`` field, so re-runs and
+    retries supersede earlier failures. ``overlapping_paths`` counts files
+    that appear in more than one report, which disjoint shards never do.
+    With ``out`` the winning entries are also written as one report, usable
+    with ``--retry-failed``.
+    """
+    latest: dict[str, dict[str, Any]] = {}
+    sources: dict[str, int] = {}
+    overlapping: set[str] = set()
+    reports = 0
+    for report_number, path in enumerate(paths):
+        reports += 1
+        for entry in _iter_entries(path):
+            file_path = entry["path"]
+            if sources.setdefault(file_path, report_number) != report_number:
+                overlapping.add(file_path)
+            previous = latest.get(file_path)
+            if previous is None or entry.get("time", 0) >= previous.get("time", 0):
+                latest[file_path] = entry
+
+    statuses = Counter(entry.get("status", "unknown") for entry in latest.values())
+    failed_stages = Counter(
+        entry.get("stage") or "unknown"
+        for entry in latest.values()
+        if entry.get("status") in RETRYABLE_STATUSES
+    )
+    if out is not None:
+        target = Path(out).expanduser()
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temporary = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        with temporary.open("w", encoding="utf-8") as merged:
+            for entry in sorted(latest.values(), key=lambda entry: entry.get("time", 0)):
+                merged.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(temporary, target)
+    return {
+        "reports": reports,
+        "files": len(latest),
+        "statuses": dict(statuses.most_common()),
+        "failures": sum(failed_stages.values()),
+        "failures_by_stage": dict(failed_stages.most_common()),
+        "overlapping_paths": len(overlapping),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Merge LyricLabel run reports (e.g. one per --shard) into one summary"
+    )
+    parser.add_argument("reports", nargs="+", help="Report files written with --report-out")
+    parser.add_argument("--out", default=None, help="Also write the merged report here")
+    args = parser.parse_args()
+
+    configure_logging(quiet=True, log_file=None)
+    try:
+        summary = merge_reports(args.reports, out=args.out)
+    except OSError:
+        logger.error("report merge failed", extra={"reports": args.reports}, exc_info=True)
+        return 2
+    logger.info("merged report summary", extra={"out": args.out, **summary})
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
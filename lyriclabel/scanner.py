@@ -0,0 +1,243 @@
+import fnmatch
+import os
+import re
+import stat
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+from lyriclabel.logging_config import get_logger
+
+DEFAULT_EXTENSIONS = (".mp3",)
+# Directory listings are mostly waiting on the filesystem (NFS/SMB round trips).
+DEFAULT_SCAN_THREADS = 8
+# Directories being listed or waiting to be consumed, per scan thread.
+_DIRECTORIES_PER_THREAD = 2
+
+logger = get_logger("scanner")
+
+
+@dataclass(frozen=True, slots=True)
+class ScannedFile:
+    """A discovered file with the stat signature taken while scanning it."""
+
+    path: str
+    size: int
+    mtime_ns: int
+    inode: int
+    # Other paths may reach the same file (hardlinks, outside symlink targets), so
+    # the path kept by deduplication depends on scan order; see ``ShardFilter``.
+    linked: bool = False
+
+    @property
+    def signature(self) -> tuple[int, int, int]:
+        # Same shape as the manifest's signature, so the scan's stat can be reused.
+        return self.size, self.mtime_ns, self.inode
+
+    @classmethod
+    def from_path(cls, path: str) -> "ScannedFile | None":
+        try:
+            result = os.stat(path)
+        except OSError:
+            return None
+        if not stat.S_ISREG(result.st_mode):
+            return None
+        return cls(
+            path, result.st_size, result.st_mtime_ns, result.st_ino, result.st_nlink > 1
+        )
+
+
+@dataclass
+class _DirectoryScan:
+    # (file, st_dev, st_nlink) so hardlinks can be deduplicated after the fact.
+    files: list[tuple[ScannedFile, int, int]] = field(default_factory=list)
+    subdirectories: list[str] = field(default_factory=list)
+    excluded: int = 0
+    links_inside_root: int = 0
+    errors: int = 0
+
+
+def normalize_extensions(extensions: Iterable[str]) -> tuple[str, ...]:
+    """``["MP3", ".m4a"]`` -> ``(".mp3", ".m4a")``; raises ValueError when empty."""
+    stripped = (extension.strip().lstrip(".").lower() for extension in extensions)
+    normalized = tuple(dict.fromkeys(f".{extension}" for extension in stripped if extension))
+    if not normalized:
+        raise ValueError("at least one file extension is required")
+    return normalized
+
+
+def _compile_globs(patterns: Sequence[str]) -> re.Pattern[str] | None:
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{fnmatch.translate(pattern)})" for pattern in patterns))
+
+
+class LibraryScanner:
+    """Parallel ``os.scandir`` walk yielding the matching files of one directory at a time.
+
+    Directories are listed on ``threads`` threads, at most a few ahead of the
+    consumer, and each file keeps the stat taken during the scan. Directory
+    symlinks are not followed. A file symlink whose target is inside the root
+    is skipped, since the walk reaches the target itself. Hardlinks and
+    symlinks from outside the root are deduplicated on ``(st_dev, st_ino)``:
+    the first path seen wins, which with several threads depends on timing, so
+    such files are marked ``linked``.
+
+    ``include`` and ``exclude`` are fnmatch patterns matched against the path
+    relative to the root, with ``/`` separators; ``*`` also matches ``/``.
+    An excluded directory is not descended into. When ``include`` is given,
+    only files matching one of its patterns are kept.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        *,
+        extensions: Sequence[str] = DEFAULT_EXTENSIONS,
+        include: Sequence[str] = (),
+        exclude: Sequence[str] = (),
+        threads: int = DEFAULT_SCAN_THREADS,
+    ) -> None:
+        self.root = os.path.abspath(root)
+        self.extensions = normalize_extensions(extensions)
+        self.threads = threads
+        self._include = _compile_globs(include)
+        self._exclude = _compile_globs(exclude)
+        self._real_root = os.path.realpath(self.root)
+        # Only multiply-linked files and outside symlink targets can reappear,
+        # so memory grows with links rather than with the library.
+        self._seen: set[tuple[int, int]] = set()
+        self.directories = 0
+        self.files = 0
+        self.duplicates = 0
+        self.excluded = 0
+        self.errors = 0
+
+    def batches(self, start: str | None = None) -> Iterator[list[ScannedFile]]:
+        """Walk the root, or only the ``start`` directory beneath it (filters still
+        apply relative to the root)."""
+        # Depth first, like os.walk, keeps the pending list short.
+        pending = [start or self.root]
+        if self.threads == 1:
+            # No pool: handing each directory to a thread only adds switches.
+            while pending:
+                batch = self._collect(self._scan_directory(pending.pop()), pending)
+                if batch:
+                    yield batch
+            return
+        running: set[Future[_DirectoryScan]] = set()
+        with ThreadPoolExecutor(
+            max_workers=self.threads, thread_name_prefix="lyriclabel-scan"
+        ) as pool:
+            while pending or running:
+                while pending and len(running) < self.threads * _DIRECTORIES_PER_THREAD:
+                    running.add(pool.submit(self._scan_directory, pending.pop()))
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch = self._collect(future.result(), pending)
+                    if batch:
+                        yield batch
+
+    def wants_directory(self, path: str) -> bool:
+        return self._exclude is None or not self._exclude.match(self._relative(path))
+
+    def wants_file(self, path: str) -> bool:
+        """Whether ``path`` passes the extension and include/exclude filters."""
+        return path.lower().endswith(self.extensions) and self._passes_globs(path)
+
+    def forget_links(self) -> None:
+        """Start hardlink deduplication afresh, before another full walk."""
+        self._seen.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "scan_directories": self.directories,
+            "scan_files": self.files,
+            "scan_duplicates": self.duplicates,
+            "scan_excluded": self.excluded,
+            "scan_errors": self.errors,
+        }
+
+    def _collect(self, scan: _DirectoryScan, pending: list[str]) -> list[ScannedFile]:
+        """Fold one directory's scan into the totals; return its files not seen before."""
+        pending.extend(scan.subdirectories)
+        self.directories += 1
+        self.excluded += scan.excluded
+        self.duplicates += scan.links_inside_root
+        self.errors += scan.errors
+        batch = []
+        for scanned, device, links in scan.files:
+            # Inode 0 means the filesystem has no stable inode numbers.
+            if links > 1 and scanned.inode:
+                key = (device, scanned.inode)
+                if key in self._seen:
+                    self.duplicates += 1
+                    continue
+                self._seen.add(key)
+            batch.append(scanned)
+        self.files += len(batch)
+        return batch
+
+    def _passes_globs(self, path: str) -> bool:
+        if self._exclude is None and self._include is None:
+            return True
+        relative = self._relative(path)
+        if self._exclude is not None and self._exclude.match(relative):
+            return False
+        return self._include is None or bool(self._include.match(relative))
+
+    def _relative(self, path: str) -> str:
+        relative = path[len(self.root) + 1:]
+        return relative if os.sep == "/" else relative.replace(os.sep, "/")
+
+    def _scan_directory(self, directory: str) -> _DirectoryScan:
+        scan = _DirectoryScan()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if self.wants_directory(entry.path):
+                                scan.subdirectories.append(entry.path)
+                            else:
+                                scan.excluded += 1
+                        elif entry.name.lower().endswith(self.extensions):
+                            self._scan_file(entry, scan)
+                    except OSError as exc:
+                        scan.errors += 1
+                        logger.warning(
+                            "cannot stat file",
+                            extra={"file_path": entry.path, "error": str(exc)},
+                        )
+        except OSError as exc:
+            scan.errors += 1
+            logger.warning(
+                "cannot list directory", extra={"path": directory, "error": str(exc)}
+            )
+        return scan
+
+    def _scan_file(self, entry: os.DirEntry[str], scan: _DirectoryScan) -> None:
+        if not self._passes_globs(entry.path):
+            scan.excluded += 1
+            return
+        links_outside = False
+        if entry.is_symlink():
+            target = os.path.realpath(entry.path)
+            if target.startswith(self._real_root + os.sep):
+                scan.links_inside_root += 1
+                return
+            links_outside = True
+        result = entry.stat()
+        if not stat.S_ISREG(result.st_mode):
+            return
+        # An outside symlink target may be linked again; always deduplicate it.
+        links = max(result.st_nlink, 2) if links_outside else result.st_nlink
+        scan.files.append(
+            (
+                ScannedFile(
+                    entry.path, result.st_size, result.st_mtime_ns, result.st_ino, links > 1
+                ),
+                result.st_dev,
+                links,
+            )
+        )
@@ -0,0 +1,90 @@
+import hashlib
+import os
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+from lyriclabel.scanner import ScannedFile
+
+
+@dataclass(frozen=True)
+class Shard:
+    """One of ``count`` disjoint slices of a library, numbered from 1.
+
+    Files are assigned by a hash of their path relative to the run root, with
+    ``/`` separators, so hosts that mount the library at different places
+    still agree on who owns which file. Linked files are assigned by inode
+    instead, since which of their paths the scan keeps is not deterministic.
+    """
+
+    index: int
+    count: int
+
+    @classmethod
+    def parse(cls, text: str) -> "Shard":
+        index_text, separator, count_text = text.partition("/")
+        if not separator or not index_text.isdigit() or not count_text.isdigit():
+            raise ValueError(f"shard must look like K/N, got {text!r}")
+        shard = cls(int(index_text), int(count_text))
+        if shard.count < 1:
+            raise ValueError(f"shard count must be at least 1, got {text!r}")
+        if not 1 <= shard.index <= shard.count:
+            raise ValueError(f"shard index must be between 1 and {shard.count}, got {text!r}")
+        return shard
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+    def owns(self, relative_path: str) -> bool:
+        return self._owns_key(relative_path.replace(os.sep, "/"))
+
+    def owns_inode(self, inode: int) -> bool:
+        # st_dev differs between hosts mounting the same share; the inode does not.
+        return self._owns_key(f"inode:{inode}")
+
+    def _owns_key(self, key: str) -> bool:
+        # blake2b, unlike hash(), is stable across processes, hosts and Python versions.
+        data = key.encode("utf-8", "surrogateescape")
+        digest = hashlib.blake2b(data, digest_size=8).digest()
+        return int.from_bytes(digest, "big") % self.count == self.index - 1
+
+
+class ShardFilter:
+    """Narrows directory batches to one shard's files, counting kept and skipped.
+
+    With ``by_directory`` whole directories are assigned, so an album is
+    never split across shards. Linked files always follow their inode, so one
+    file reached through several paths is handled by exactly one shard.
+    """
+
+    def __init__(self, shard: Shard, *, root: str, by_directory: bool = False) -> None:
+        self.shard = shard
+        self.root = root
+        self.by_directory = by_directory
+        self.owned = 0
+        self.skipped = 0
+
+    def apply(self, batches: Iterator[list[ScannedFile]]) -> Iterator[list[ScannedFile]]:
+        for batch in batches:
+            owns_directory = self.by_directory and self.shard.owns(
+                os.path.relpath(os.path.dirname(batch[0].path), self.root)
+            )
+            owned = [scanned for scanned in batch if self._owns(scanned, owns_directory)]
+            self.owned += len(owned)
+            self.skipped += len(batch) - len(owned)
+            if owned:
+                yield owned
+
+    def _owns(self, scanned: ScannedFile, owns_directory: bool) -> bool:
+        if scanned.linked and scanned.inode:
+            return self.shard.owns_inode(scanned.inode)
+        if self.by_directory:
+            return owns_directory
+        return self.shard.owns(os.path.relpath(scanned.path, self.root))
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "shard_index": self.shard.index,
+            "shard_count": self.shard.count,
+            "shard_files": self.owned,
+            "shard_skipped": self.skipped,
+        }
@@ -0,0 +1,109 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import aiohttp
+
+DEFAULT_TIMEOUT_SECONDS = 20
+DEFAULT_CONNECT_TIMEOUT_SECONDS = 5.0
+DEFAULT_READ_TIMEOUT_SECONDS = 15.0
+# Last.fm sits behind a CDN; re-resolve every few minutes, not per connection.
+DEFAULT_DNS_TTL_SECONDS = 300
+# Longer than the gap between requests in a paced run, so sockets stay warm.
+DEFAULT_KEEPALIVE_SECONDS = 60.0
+
+
+@dataclass(frozen=True)
+class HttpSettings:
+    """Connector and timeout settings for the shared Last.fm session.
+
+    ``pool_size`` caps open connections; ``None`` keeps aiohttp's default.
+    The CLI derives it from ``--concurrency``, since no more requests than
+    that are ever in flight.
+    """
+
+    pool_size: int | None = None
+    total_timeout: float = DEFAULT_TIMEOUT_SECONDS
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT_SECONDS
+    read_timeout: float = DEFAULT_READ_TIMEOUT_SECONDS
+    dns_ttl: int = DEFAULT_DNS_TTL_SECONDS
+    keepalive_timeout: float = DEFAULT_KEEPALIVE_SECONDS
+
+    # aiohttp is imported on first use so that CLI startup (--help, argument
+    # errors) does not pay for it.
+    def connector(self) -> "aiohttp.TCPConnector":
+        import aiohttp
+
+        pool_size = self.pool_size or 100
+        return aiohttp.TCPConnector(
+            limit=pool_size,
+            # Every request goes to one host, so the per-host cap is the pool.
+            limit_per_host=pool_size,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+
+    def timeout(self) -> "aiohttp.ClientTimeout":
+        import aiohttp
+
+        # sock_connect covers TCP+TLS setup only, not waiting for a pooled connection.
+        return aiohttp.ClientTimeout(
+            total=self.total_timeout,
+            sock_connect=self.connect_timeout,
+            sock_read=self.read_timeout,
+        )
+
+
+class ConnectionStats:
+    """Connection reuse and DNS counters collected through aiohttp tracing."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.connections_opened = 0
+        self.connections_reused = 0
+        self.pool_waits = 0
+        self.dns_cache_hits = 0
+        self.dns_cache_misses = 0
+
+    def trace_config(self) -> "aiohttp.TraceConfig":
+        import aiohttp
+
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(self._on_request_start)
+        trace.on_connection_create_end.append(self._on_connection_create_end)
+        trace.on_connection_reuseconn.append(self._on_connection_reuseconn)
+        trace.on_connection_queued_start.append(self._on_connection_queued_start)
+        trace.on_dns_cache_hit.append(self._on_dns_cache_hit)
+        trace.on_dns_cache_miss.append(self._on_dns_cache_miss)
+        return trace
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "http_requests": self.requests,
+            # Each new connection costs a TCP (and, over https, TLS) handshake.
+            "http_connections_opened": self.connections_opened,
+            "http_connections_reused": self.connections_reused,
+            "http_pool_waits": self.pool_waits,
+            "http_dns_cache_hits": self.dns_cache_hits,
+            "http_dns_cache_misses": self.dns_cache_misses,
+        }
+
+    async def _on_request_start(self, *_: Any) -> None:
+        self.requests += 1
+
+    async def _on_connection_create_end(self, *_: Any) -> None:
+        self.connections_opened += 1
+
+    async def _on_connection_reuseconn(self, *_: Any) -> None:
+        self.connections_reused += 1
+
+    async def _on_connection_queued_start(self, *_: Any) -> None:
+        self.pool_waits += 1
+
+    async def _on_dns_cache_hit(self, *_: Any) -> None:
+        self.dns_cache_hits += 1
+
+    async def _on_dns_cache_miss(self, *_: Any) -> None:
+        self.dns_cache_misses += 1
+
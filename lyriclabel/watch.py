@@ -0,0 +1,355 @@
+import asyncio
+import ctypes
+import ctypes.util
+import errno
+import os
+import struct
+import sys
+import time
+from collections.abc import Awaitable, Callable
+
+from lyriclabel.logging_config import get_logger
+from lyriclabel.manifest import Manifest
+from lyriclabel.scanner import LibraryScanner, ScannedFile
+
+DEFAULT_DEBOUNCE_SECONDS = 2.0
+DEFAULT_MAX_PENDING = 10_000
+DEFAULT_POLL_INTERVAL_SECONDS = 30.0
+_TICK_SECONDS = 0.25
+
+# inotify(7) event bits.
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+# No IN_MODIFY: it fires on every write() of a file being copied in.
+_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_ONLYDIR
+_EVENT_HEADER = struct.Struct("iIII")
+_READ_BYTES = 64 * 1024
+
+logger = get_logger("watch")
+
+
+class _Inotify:
+    """Minimal ctypes binding for inotify(7), so watching needs no extra dependency."""
+
+    def __init__(self) -> None:
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise self._error("inotify_init1")
+        self._directories: dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._directories)
+
+    def add_watch(self, directory: str) -> None:
+        descriptor = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), _WATCH_MASK)
+        if descriptor < 0:
+            raise self._error(directory)
+        # A renamed directory keeps its descriptor; re-adding it updates the path.
+        self._directories[descriptor] = directory
+
+    def read(self) -> list[tuple[str, str, int]]:
+        """Return pending ``(directory, name, mask)`` events without blocking."""
+        try:
+            data = os.read(self.fd, _READ_BYTES)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(data):
+            descriptor, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & _IN_IGNORED:
+                self._directories.pop(descriptor, None)
+            elif mask & _IN_Q_OVERFLOW:
+                events.append(("", "", mask))
+            elif descriptor in self._directories:
+                events.append((self._directories[descriptor], name, mask))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+    @staticmethod
+    def _error(what: str) -> OSError:
+        code = ctypes.get_errno()
+        return OSError(code, os.strerror(code), what)
+
+
+class Debouncer:
+    """Changed paths waiting to go quiet, bounded by ``max_pending``.
+
+    A path comes due ``delay`` seconds after its last event. Past
+    ``max_pending`` paths, an event only records its directory for a rescan,
+    and past that many directories, one rescan of everything. An event storm
+    therefore costs bounded memory and ends in a rescan, not a backlog.
+    """
+
+    def __init__(self, *, delay: float, max_pending: int) -> None:
+        self.delay = delay
+        self.max_pending = max_pending
+        self.rescan_directories: set[str] = set()
+        self.rescan_all = False
+        self.events = 0
+        self.coalesced = 0
+        self.overflowed = 0
+        self._due: dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def touch(self, path: str, now: float, *, delay: float | None = None) -> None:
+        self.events += 1
+        if path in self._due:
+            self.coalesced += 1
+        elif len(self._due) >= self.max_pending:
+            self.overflowed += 1
+            self.request_rescan(os.path.dirname(path))
+            return
+        self._due[path] = now + (self.delay if delay is None else delay)
+
+    def request_rescan(self, directory: str) -> None:
+        if self.rescan_all:
+            return
+        if len(self.rescan_directories) >= self.max_pending:
+            self.rescan_all = True
+            self.rescan_directories.clear()
+        else:
+            self.rescan_directories.add(directory)
+
+    def pop_due(self, now: float) -> list[str]:
+        due = [path for path, deadline in self._due.items() if deadline <= now]
+        for path in due:
+            del self._due[path]
+        return due
+
+    def pop_rescans(self, root: str) -> list[str]:
+        """Directories to rescan, without any that a listed ancestor already covers."""
+        if self.rescan_all:
+            directories = [root]
+        else:
+            directories = []
+            for directory in sorted(self.rescan_directories):
+                if not directories or not directory.startswith(directories[-1] + os.sep):
+                    directories.append(directory)
+        self.rescan_all = False
+        self.rescan_directories.clear()
+        return directories
+
+
+class DirectoryWatcher:
+    """Turns changes under ``scanner.root`` into settled files that need tagging.
+
+    Uses inotify where available (one watch per directory) and otherwise
+    polls with ``scanner`` every ``poll_interval`` seconds, comparing stat
+    signatures. A changed file is held until its mtime is ``debounce``
+    seconds old, so files still being copied in are not read half-written.
+    Settled files the manifest already recorded as done with the same
+    signature, including the ones we just tagged, are dropped. ``submit``
+    may block; events keep being debounced meanwhile. Call ``finished`` once
+    a submitted file is processed; until then, its events are held back.
+    """
+
+    def __init__(
+        self,
+        scanner: LibraryScanner,
+        *,
+        manifest: Manifest | None = None,
+        debounce: float = DEFAULT_DEBOUNCE_SECONDS,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        poll_interval: float = DEFAULT_POLL_INTERVAL_SECONDS,
+        force_polling: bool = False,
+    ) -> None:
+        self.scanner = scanner
+        self.manifest = manifest
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.force_polling = force_polling
+        self.debouncer = Debouncer(delay=debounce, max_pending=max_pending)
+        self.mode = "polling"
+        self.watches = 0
+        self.rescans = 0
+        self.submitted = 0
+        self.unchanged = 0
+        self.vanished = 0
+        self._in_flight: set[str] = set()
+        # Polling only: path -> stat signature as of the last scan.
+        self._snapshot: dict[str, tuple[int, int, int]] = {}
+
+    async def run(
+        self,
+        submit: Callable[[ScannedFile], Awaitable[None]],
+        *,
+        stop: asyncio.Event,
+        scan_existing: bool = False,
+        on_tick: Callable[[], None] | None = None,
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        inotify = None if self.force_polling else await self._start_inotify()
+        if inotify is not None:
+            loop.add_reader(inotify.fd, self._read_events, inotify)
+            self.mode = "inotify"
+        if inotify is None:
+            await self._poll(submit, baseline=not scan_existing)
+        elif scan_existing:
+            self.debouncer.rescan_all = True
+        logger.info(
+            "watching directory",
+            extra={"path": self.scanner.root, "mode": self.mode, "watches": self.watches},
+        )
+        next_poll = time.monotonic() + self.poll_interval
+        try:
+            while not stop.is_set():
+                for path in self.debouncer.pop_due(time.monotonic()):
+                    scanned = await asyncio.to_thread(ScannedFile.from_path, path)
+                    if scanned is None:
+                        self.vanished += 1
+                    else:
+                        await self._settle(scanned, submit)
+                if self.debouncer.rescan_all or self.debouncer.rescan_directories:
+                    await self._rescan(inotify, submit, stop)
+                if inotify is None and time.monotonic() >= next_poll:
+                    await self._poll(submit)
+                    next_poll = time.monotonic() + self.poll_interval
+                if on_tick is not None:
+                    on_tick()
+                try:
+                    await asyncio.wait_for(stop.wait(), _TICK_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if inotify is not None:
+                loop.remove_reader(inotify.fd)
+                inotify.close()
+
+    def finished(self, path: str) -> None:
+        self._in_flight.discard(path)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "watch_events": self.debouncer.events,
+            "watch_coalesced": self.debouncer.coalesced,
+            "watch_overflowed": self.debouncer.overflowed,
+            "watch_rescans": self.rescans,
+            "watch_submitted": self.submitted,
+            "watch_unchanged": self.unchanged,
+            "watch_vanished": self.vanished,
+            "watch_directories": self.watches,
+        }
+
+    async def _start_inotify(self) -> _Inotify | None:
+        try:
+            inotify = _Inotify()
+        except OSError as exc:
+            logger.warning("inotify unavailable; polling", extra={"error": str(exc)})
+            return None
+        try:
+            await asyncio.to_thread(self._watch_tree, inotify, self.scanner.root)
+        except OSError as exc:
+            # ENOSPC: fs.inotify.max_user_watches is lower than the directory count.
+            logger.warning(
+                "cannot watch every directory; polling",
+                extra={"error": str(exc), "watches": len(inotify)},
+            )
+            inotify.close()
+            return None
+        return inotify
+
+    def _watch_tree(self, inotify: _Inotify, top: str) -> None:
+        for directory, subdirectories, _ in os.walk(top):
+            subdirectories[:] = [
+                name
+                for name in subdirectories
+                if self.scanner.wants_directory(os.path.join(directory, name))
+            ]
+            try:
+                inotify.add_watch(directory)
+            except FileNotFoundError:
+                continue
+        self.watches = len(inotify)
+
+    def _read_events(self, inotify: _Inotify) -> None:
+        now = time.monotonic()
+        for directory, name, mask in inotify.read():
+            if mask & _IN_Q_OVERFLOW:
+                logger.warning("inotify event queue overflowed; rescanning")
+                self.debouncer.rescan_all = True
+                continue
+            path = os.path.join(directory, name)
+            if mask & _IN_ISDIR:
+                # Files may land before the new directory is watched; rescan it.
+                if self.scanner.wants_directory(path):
+                    self.debouncer.request_rescan(path)
+            elif self.scanner.wants_file(path):
+                self.debouncer.touch(path, now)
+
+    async def _settle(
+        self, scanned: ScannedFile, submit: Callable[[ScannedFile], Awaitable[None]]
+    ) -> None:
+        age = time.time() - scanned.mtime_ns / 1e9
+        if age < self.debounce:
+            self.debouncer.touch(scanned.path, time.monotonic(), delay=self.debounce - age)
+            return
+        if scanned.path in self._in_flight:
+            # Usually our own tag write; look again once the manifest has it.
+            self.debouncer.touch(scanned.path, time.monotonic())
+            return
+        if self.manifest is not None and await asyncio.to_thread(self._unchanged, scanned):
+            self.unchanged += 1
+            return
+        self.submitted += 1
+        self._in_flight.add(scanned.path)
+        await submit(scanned)
+
+    def _unchanged(self, scanned: ScannedFile) -> bool:
+        assert self.manifest is not None
+        # Our own writes are recorded in batches; commit them before comparing.
+        self.manifest.flush()
+        return self.manifest.should_skip(scanned.path, signature=scanned.signature)
+
+    async def _rescan(
+        self,
+        inotify: _Inotify | None,
+        submit: Callable[[ScannedFile], Awaitable[None]],
+        stop: asyncio.Event,
+    ) -> None:
+        for directory in self.debouncer.pop_rescans(self.scanner.root):
+            self.rescans += 1
+            if inotify is not None:
+                try:
+                    await asyncio.to_thread(self._watch_tree, inotify, directory)
+                except OSError as exc:
+                    logger.warning(
+                        "cannot watch directory", extra={"path": directory, "error": str(exc)}
+                    )
+            # Links seen by an earlier walk are not duplicates of this one.
+            self.scanner.forget_links()
+            batches = self.scanner.batches(start=directory)
+            while not stop.is_set():
+                batch = await asyncio.to_thread(next, batches, None)
+                if batch is None:
+                    break
+                for scanned in batch:
+                    await self._settle(scanned, submit)
+
+    async def _poll(
+        self, submit: Callable[[ScannedFile], Awaitable[None]], *, baseline: bool = False
+    ) -> None:
+        self.scanner.forget_links()
+        batches = self.scanner.batches()
+        snapshot: dict[str, tuple[int, int, int]] = {}
+        while (batch := await asyncio.to_thread(next, batches, None)) is not None:
+            for scanned in batch:
+                snapshot[scanned.path] = scanned.signature
+                if not baseline and self._snapshot.get(scanned.path) != scanned.signature:
+                    await self._settle(scanned, submit)
+        self._snapshot = snapshot
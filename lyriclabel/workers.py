@@ -0,0 +1,195 @@
+import logging
+import multiprocessing
+import queue
+from collections import Counter
+from collections.abc import Callable, Iterator, Sequence
+from dataclasses import dataclass, field
+from multiprocessing.process import BaseProcess
+from typing import Any
+
+from lyriclabel.logging_config import (
+    configure_worker_logging,
+    get_logger,
+    start_worker_log_forwarding,
+    stop_worker_log_forwarding,
+)
+from lyriclabel.metrics import RunMetrics
+from lyriclabel.ratelimit import SharedRateBudget
+from lyriclabel.scanner import ScannedFile
+
+# Directory batches buffered between the parent's walk and the workers, per worker.
+_BATCHES_PER_WORKER = 4
+_POLL_SECONDS = 1.0
+# Summary values that describe the run's configuration rather than add up.
+_CONFIGURATION_STATS = frozenset({"limiter_max_rps", "api_keys"})
+
+logger = get_logger("workers")
+
+
+@dataclass
+class PartitionResult:
+    """Outcome of one ``run_async`` pass: the whole run, or one worker's share of it."""
+
+    status_code: int
+    status_counts: Counter[str] = field(default_factory=Counter)
+    stats: dict[str, float] = field(default_factory=dict)
+    metrics: RunMetrics | None = None
+
+
+def _merge_stats(merged: dict[str, float], stats: dict[str, float]) -> None:
+    for key, value in stats.items():
+        if key not in merged:
+            merged[key] = value
+        elif key in _CONFIGURATION_STATS:
+            continue
+        elif "_max_" in key:
+            merged[key] = max(merged[key], value)
+        else:
+            merged[key] = round(merged[key] + value, 3)
+
+
+def _worker_main(
+    number: int,
+    partition: Callable[..., PartitionResult],
+    options: dict[str, Any],
+    batch_queue: Any,
+    result_queue: Any,
+    log_queue: Any,
+    log_level: int,
+    rate_budget: SharedRateBudget,
+) -> None:
+    configure_worker_logging(log_queue, worker=number, level=log_level)
+    result: PartitionResult | None
+    try:
+        result = partition(
+            **options, batch_source=iter(batch_queue.get, None), rate_budget=rate_budget
+        )
+    except Exception:
+        logger.error("worker failed", exc_info=True)
+        result = None
+    result_queue.put((number, result))
+
+
+def _put(batch_queue: Any, item: list[ScannedFile] | None, processes: Sequence[BaseProcess]) -> bool:
+    """Queue ``item`` for the next free worker; False once no worker is left to take it."""
+    while True:
+        try:
+            batch_queue.put(item, timeout=_POLL_SECONDS)
+            return True
+        except queue.Full:
+            if not any(process.is_alive() for process in processes):
+                return False
+
+
+def _collect(
+    result_queue: Any, processes: Sequence[BaseProcess]
+) -> dict[int, PartitionResult | None]:
+    results: dict[int, PartitionResult | None] = {}
+    while len(results) < len(processes):
+        try:
+            number, result = result_queue.get(timeout=_POLL_SECONDS)
+            results[number] = result
+            continue
+        except queue.Empty:
+            pass
+        exited = [
+            number
+            for number, process in enumerate(processes, start=1)
+            if number not in results and process.exitcode is not None
+        ]
+        if not exited:
+            continue
+        # A worker may have posted its result just before exiting; drain first.
+        try:
+            while True:
+                number, result = result_queue.get(timeout=0.1)
+                results[number] = result
+        except queue.Empty:
+            pass
+        for number in exited:
+            if number not in results:
+                logger.error(
+                    "worker exited without a result",
+                    extra={"worker": number, "exitcode": processes[number - 1].exitcode},
+                )
+                results[number] = None
+    return results
+
+
+def run_workers(
+    partition: Callable[..., PartitionResult],
+    options: dict[str, Any],
+    *,
+    workers: int,
+    batches: Iterator[list[ScannedFile]],
+    max_rps: float | None,
+) -> PartitionResult:
+    """Run ``partition(**options)`` in ``workers`` processes and merge what they report.
+
+    The parent walks ``batches`` and hands whole directories to whichever
+    worker is free, so a slow directory never stalls the others and an album
+    stays in one process. Workers share one ``max_rps`` budget and send their
+    logs back to the parent's handlers. ``partition`` must be importable by
+    name, since workers are spawned rather than forked.
+    """
+    mp_context = multiprocessing.get_context("spawn")
+    batch_queue = mp_context.Queue(maxsize=workers * _BATCHES_PER_WORKER)
+    result_queue = mp_context.Queue()
+    log_queue = mp_context.Queue()
+    rate_budget = SharedRateBudget(max_rps, mp_context=mp_context)
+    log_level = logging.getLogger("lyriclabel").getEffectiveLevel()
+    metrics = RunMetrics()
+    processes = [
+        mp_context.Process(
+            target=_worker_main,
+            args=(
+                number,
+                partition,
+                options,
+                batch_queue,
+                result_queue,
+                log_queue,
+                log_level,
+                rate_budget,
+            ),
+            name=f"lyriclabel-worker-{number}",
+            daemon=True,
+        )
+        for number in range(1, workers + 1)
+    ]
+    start_worker_log_forwarding(log_queue)
+    try:
+        for process in processes:
+            process.start()
+        logger.info("workers started", extra={"workers": workers})
+        for batch in batches:
+            if not _put(batch_queue, batch, processes):
+                break
+        for _ in processes:
+            if not _put(batch_queue, None, processes):
+                break
+        results = _collect(result_queue, processes)
+        for process in processes:
+            process.join()
+    finally:
+        for process in processes:
+            if process.pid is None:
+                continue
+            if process.is_alive():
+                process.terminate()
+            process.join()
+        stop_worker_log_forwarding()
+
+    merged = PartitionResult(status_code=0)
+    for number in sorted(results):
+        result = results[number]
+        if result is None:
+            merged.status_code = 2
+            continue
+        merged.status_code = max(merged.status_code, result.status_code)
+        merged.status_counts.update(result.status_counts)
+        _merge_stats(merged.stats, result.stats)
+        if result.metrics is not None:
+            metrics.merge(result.metrics)
+            merged.metrics = metrics
+    return merged